@@ -0,0 +1,108 @@
+# Measures the cost the request lifecycle hooks add to every HTTP exchange.
+# Requires Python 3.6+
+#
+# The request is sent over an in-memory transport, so the numbers isolate the
+# SDK side of the request path from network latency.
+#
+# Usage:
+#   python3 benchmarks/bench_hooks.py [--number 200000] [--max-overhead 0.05]
+
+import argparse
+import sys
+import timeit
+from http.client import HTTPException, HTTPMessage
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+
+from privx_api.exceptions import InternalAPIException  # noqa: E402
+from privx_api.hooks import HookEnum  # noqa: E402
+from privx_api.privx_api import PrivXAPI  # noqa: E402
+from privx_api.transport import Transport  # noqa: E402
+
+
+class InMemoryResponse:
+    status = 200
+
+    def __init__(self):
+        self.headers = HTTPMessage()
+        self.headers["Content-Type"] = "application/json"
+
+    def read(self, *args):
+        return b"{}"
+
+
+class InMemoryTransport(Transport):
+    response = InMemoryResponse()
+
+    def send(self, request, on_retry=None):
+        return self.response, self.response.read()
+
+
+def send_without_hook_support(api, request, stream=False):
+    # BasePrivXAPI._send_request with the hook lines removed and nothing else
+    # changed, keep it in step with that method
+    try:
+        if stream:
+            response, data = api._transport.stream(request), None
+        else:
+            response, data = api._transport.send(request)
+    except (OSError, HTTPException) as e:
+        raise InternalAPIException(e)
+    headers = api._collect_headers(response)
+    api._store_response_headers(headers)
+    api._store_response_cookies(response, request["url"])
+    return response, data
+
+
+def noop(*args):
+    return None
+
+
+def best_of(stmts, number, repeat=20):
+    # ns per call of each statement, the best of `repeat` rounds; the rounds
+    # alternate between the statements so that a noisy stretch of the machine
+    # does not fall on one of them only
+    best = [float("inf")] * len(stmts)
+    batch = max(1, number // repeat)
+    for _ in range(repeat):
+        for i, stmt in enumerate(stmts):
+            best[i] = min(best[i], timeit.timeit(stmt, number=batch))
+    return [seconds / batch * 1e9 for seconds in best]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--max-overhead", type=float, default=0.05)
+    args = parser.parse_args()
+
+    transport = InMemoryTransport()
+    api = PrivXAPI("privx.example.com", 443, "", "", "", transport=transport)
+    request = {"method": "GET", "url": "/host-store/api/v1/hosts", "headers": {}}
+
+    hooked = PrivXAPI("privx.example.com", 443, "", "", "", transport=transport)
+    for event in (HookEnum.BEFORE_REQUEST, HookEnum.AFTER_RESPONSE):
+        hooked.add_hook(event, noop)
+
+    baseline, no_hooks, with_hooks = best_of(
+        [
+            lambda: send_without_hook_support(api, request),
+            lambda: api._send_request(request),
+            lambda: hooked._send_request(request),
+        ],
+        args.number,
+    )
+
+    overhead = (no_hooks - baseline) / baseline
+    print(f"without hook support : {baseline:8.1f} ns/request")
+    print(f"no hooks registered  : {no_hooks:8.1f} ns/request ({overhead:+.1%})")
+    print(f"two no-op hooks      : {with_hooks:8.1f} ns/request")
+
+    if overhead > args.max_overhead:
+        print(f"FAIL: overhead above {args.max_overhead:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Compare the local whitelist evaluator against the answers of a live PrivX
+# for the whitelist and commands of privx_api/tests/test_whitelist.py.
+# Requires Python 3.6+
+#
+# The config module holds the usual examples/config.py settings. The API
+# client needs permission to evaluate command restriction whitelists. Exits
+# with status 1 when a command is evaluated differently.
+#
+# Usage:
+#   python3 benchmarks/check_whitelist_evaluator.py --config config
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+
+from privx_api.privx_api import PrivXAPI  # noqa: E402
+from privx_api.tests.test_whitelist import COMMANDS, WHITELIST  # noqa: E402
+from privx_api.whitelist import CompiledWhitelist  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the whitelist evaluator")
+    parser.add_argument("--config", required=True, help="config module of a PrivX")
+    args = parser.parse_args()
+
+    config = importlib.import_module(args.config)
+    api = PrivXAPI(
+        config.HOSTNAME,
+        config.HOSTPORT,
+        config.CA_CERT,
+        config.OAUTH_CLIENT_ID,
+        config.OAUTH_CLIENT_SECRET,
+    )
+    api.authenticate(config.API_CLIENT_ID, config.API_CLIENT_SECRET)
+    response = api.eval_commands_against_whitelist(WHITELIST, "bash", COMMANDS)
+    if not response.ok:
+        raise SystemExit(f"evaluation failed: {response.data}")
+
+    local = CompiledWhitelist(WHITELIST).evaluate(COMMANDS)
+    mismatches = 0
+    for server_item, local_item in zip(response.data["items"], local):
+        same = server_item["allowed"] == local_item["allowed"]
+        mismatches += not same
+        print(
+            f"{'ok' if same else 'DIFF':4}  server {server_item['allowed']!s:5}  "
+            f"local {local_item['allowed']!s:5}  {server_item['command']}"
+        )
+    if mismatches:
+        raise SystemExit(f"{mismatches} commands evaluated differently")
+
+
+if __name__ == "__main__":
+    main()
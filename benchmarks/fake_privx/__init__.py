@@ -0,0 +1,11 @@
+#
+# Fake PrivX server package, see fake_privx_server.py.
+#
+# The modules import privx_api from the repository checkout this benchmarks
+# directory belongs to.
+#
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent.absolute()))
@@ -0,0 +1,47 @@
+#
+# Command line entry point of the fake server.
+#
+
+import argparse
+import time
+
+from fake_privx.config import FakeServerConfig
+from fake_privx.server import FakePrivXServer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake PrivX server")
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--cert", help="PEM certificate, generated if omitted")
+    parser.add_argument("--key", help="PEM private key for --cert")
+    parser.add_argument("--ca-out", help="write the CA certificate to this file")
+    defaults = FakeServerConfig()
+    for name, value in vars(defaults).items():
+        option = "--" + name.replace("_", "-")
+        if isinstance(value, bool):
+            parser.add_argument(option, action="store_true")
+        else:
+            parser.add_argument(option, type=type(value), default=value)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = FakeServerConfig(
+        **{k: getattr(args, k) for k in vars(FakeServerConfig()).keys()}
+    )
+    server = FakePrivXServer(config, args.bind, args.port, args.cert, args.key)
+    if args.ca_out:
+        with open(args.ca_out, "w") as f:
+            f.write(server.ca_cert)
+    print(f"Fake PrivX listening on https://{server.host}:{server.port}")
+    print(f"CA certificate: {args.ca_out or server.certfile}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
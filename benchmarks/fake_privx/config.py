@@ -0,0 +1,51 @@
+#
+# Data set sizes and load shaping knobs of the fake server.
+#
+
+from http import HTTPStatus
+
+
+class FakeServerConfig:
+    """
+    Data set sizes and load shaping knobs of the fake server.
+    """
+
+    def __init__(
+        self,
+        hosts: int = 1000,
+        roles: int = 20,
+        users: int = 200,
+        connections: int = 1000,
+        secrets: int = 100,
+        audit_events: int = 1000,
+        trail_bytes: int = 1024 * 1024,
+        payload_padding: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = int(HTTPStatus.SERVICE_UNAVAILABLE),
+        max_limit: int = 1000,
+        nodes: int = 0,
+        token_ttl: int = 300,
+        seed: int = 1,
+        verbose: bool = False,
+    ) -> None:
+        self.hosts = hosts
+        self.roles = roles
+        self.users = users
+        self.connections = connections
+        self.secrets = secrets
+        self.audit_events = audit_events
+        self.trail_bytes = trail_bytes
+        # extra bytes of filler added to every generated record
+        self.payload_padding = payload_padding
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_limit = max_limit
+        # number of simulated backend nodes, 0 disables Set-Cookie affinity
+        self.nodes = nodes
+        self.token_ttl = token_ttl
+        self.seed = seed
+        self.verbose = verbose
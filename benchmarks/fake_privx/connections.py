@@ -0,0 +1,53 @@
+#
+# Connection manager routes of the fake server.
+#
+
+import json
+import uuid
+from http import HTTPStatus
+
+from fake_privx.routing import FakeRequest, StreamBody, paginate
+
+
+class ConnectionManagerHandlers:
+    """
+    Route handlers over the data of FakePrivXState.
+    """
+
+    def list_connections(self, request: FakeRequest):
+        with self.lock:
+            connections = list(self.connections.values())
+        return HTTPStatus.OK, paginate(connections, request, self.config.max_limit)
+
+    def search_connections(self, request: FakeRequest):
+        keywords = (request.json().get("keywords") or "").lower()
+        with self.lock:
+            connections = list(self.connections.values())
+        if keywords:
+            connections = [c for c in connections if keywords in json.dumps(c).lower()]
+        return HTTPStatus.OK, paginate(connections, request, self.config.max_limit)
+
+    def get_connection(self, request: FakeRequest):
+        with self.lock:
+            connection = self.connections.get(request.path_params["connection_id"])
+        if connection is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, connection
+
+    def create_handle(self, request: FakeRequest):
+        if request.path_params["connection_id"] not in self.connections:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        session_id = str(uuid.uuid4())
+        with self.lock:
+            self.download_handles[session_id] = request.path_params["connection_id"]
+        return HTTPStatus.CREATED, {"session_id": session_id}
+
+    def download(self, request: FakeRequest):
+        with self.lock:
+            known = request.path_params["session_id"] in self.download_handles
+        if not known:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        self.count("streamed_bytes", self.config.trail_bytes)
+        return HTTPStatus.OK, StreamBody(
+            self.config.trail_bytes, "application/octet-stream"
+        )
@@ -0,0 +1,150 @@
+#
+# Generated in-memory PrivX data.
+#
+
+import random
+import time
+import uuid
+
+from fake_privx.config import FakeServerConfig
+from fake_privx.routing import timestamp
+
+
+class FakePrivXData:
+    """
+    The data stores of the fake server, filled with generated records.
+    """
+
+    def __init__(self, config: FakeServerConfig) -> None:
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self.roles = {}
+        self.role_members = {}
+        self.hosts = {}
+        self.connections = {}
+        self.secrets = {}
+        self.user_secrets = {}
+        # oldest first, as the monitor service stores them
+        self.audit_events = []
+        self._generate()
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+    def _padding(self) -> str:
+        return "x" * self.config.payload_padding
+
+    def _generate(self) -> None:
+        now = time.time()
+        created = timestamp(now - 86400 * 30)
+        for i in range(self.config.roles):
+            role_id = self._uuid()
+            self.roles[role_id] = {
+                "id": role_id,
+                "name": f"role-{i:04d}",
+                "comment": self._padding(),
+                "permissions": ["hosts-view"],
+                "source_rules": {},
+                "created": created,
+                "updated": created,
+            }
+            self.role_members[role_id] = []
+        role_ids = list(self.roles)
+
+        for i in range(self.config.users):
+            user = {
+                "id": self._uuid(),
+                "principal": f"user{i:05d}",
+                "full_name": f"User {i:05d}",
+                "email": f"user{i:05d}@example.com",
+                "source_type": "LOCAL",
+            }
+            for role_id in self._sample(role_ids, 2):
+                self.role_members[role_id].append(user)
+
+        for i in range(self.config.hosts):
+            host = self._make_host(i, self._sample(role_ids, 2), created)
+            self.hosts[host["id"]] = host
+        host_list = list(self.hosts.values())
+
+        for i in range(self.config.connections):
+            connection = self._make_connection(i, host_list, now)
+            self.connections[connection["id"]] = connection
+
+        for i in range(self.config.secrets):
+            secret = self._make_secret(f"secret-{i:05d}", role_ids, created)
+            self.secrets[secret["name"]] = secret
+
+        for i in range(self.config.audit_events):
+            received = now - self.config.audit_events + i
+            self.audit_events.append(self._make_audit_event(i, received))
+
+    def _sample(self, items: list, count: int) -> list:
+        return self._rng.sample(items, min(count, len(items)))
+
+    def _make_host(self, index: int, role_ids: list, created: str) -> dict:
+        address = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+        name = f"host-{index:06d}"
+        roles = [{"id": r, "name": self.roles[r]["name"]} for r in role_ids]
+        return {
+            "id": self._uuid(),
+            "external_id": f"ext-{index:06d}",
+            "common_name": name,
+            "addresses": [address, f"{name}.example.com"],
+            "services": [
+                {"service": "SSH", "address": address, "port": 22, "source": "UI"}
+            ],
+            "principals": [
+                {"principal": "root", "roles": roles, "source": "UI"},
+                {"principal": "admin", "roles": roles[:1], "source": "UI"},
+            ],
+            "tags": [f"zone-{index % 10}", "generated"],
+            "audit_enabled": bool(index % 2),
+            "comment": self._padding(),
+            "created": created,
+            "updated": created,
+            "updated_by": "fake-privx",
+        }
+
+    def _make_connection(self, index: int, hosts: list, now: float) -> dict:
+        host = hosts[index % len(hosts)] if hosts else {"addresses": ["127.0.0.1"]}
+        connected = now - 3600 * (index + 1)
+        return {
+            "id": self._uuid(),
+            "type": "SSH",
+            "mode": "UI",
+            "authentication_method": "CERT",
+            "user": {"id": self._uuid(), "display_name": f"user{index % 997:05d}"},
+            "target_host_address": host["addresses"][0],
+            "target_host_account": "root",
+            "channels": [{"id": "1", "type": "shell", "file_id": "1"}],
+            "comment": self._padding(),
+            "connected": timestamp(connected),
+            "disconnected": timestamp(connected + 600),
+            "status": "DISCONNECTED",
+        }
+
+    def _make_secret(self, name: str, role_ids: list, created: str) -> dict:
+        roles = [{"id": r} for r in self._sample(role_ids, 1)]
+        return {
+            "name": name,
+            "data": {"username": name, "password": self._uuid(), "extra": ""},
+            "read_roles": roles,
+            "write_roles": roles,
+            "author": "fake-privx",
+            "created": created,
+            "updated": created,
+            "version": 1,
+        }
+
+    def _make_audit_event(self, index: int, received: float) -> dict:
+        return {
+            "id": self._uuid(),
+            "received_at": timestamp(received),
+            "event": ("USER_LOGIN", "CONNECTION_START", "SECRET_READ")[index % 3],
+            "component": "fake-privx",
+            "user_id": self._uuid(),
+            "username": f"user{index % 997:05d}",
+            "source_address": f"10.1.{index >> 8 & 255}.{index & 255}",
+            "comment": self._padding(),
+        }
@@ -0,0 +1,92 @@
+#
+# Host store routes of the fake server.
+#
+
+import json
+import time
+import uuid
+from http import HTTPStatus
+
+from fake_privx.routing import FakeRequest, paginate, timestamp
+
+
+class HostStoreHandlers:
+    """
+    Route handlers over the data of FakePrivXState.
+    """
+
+    def list_hosts(self, request: FakeRequest):
+        with self.lock:
+            hosts = list(self.hosts.values())
+        return HTTPStatus.OK, paginate(hosts, request, self.config.max_limit)
+
+    def create_host(self, request: FakeRequest):
+        host = request.json()
+        host["id"] = str(uuid.uuid4())
+        host["created"] = host["updated"] = timestamp(time.time())
+        with self.lock:
+            self.hosts[host["id"]] = host
+        return HTTPStatus.CREATED, {"id": host["id"]}
+
+    def get_host(self, request: FakeRequest):
+        with self.lock:
+            host = self.hosts.get(request.path_params["host_id"])
+        if host is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, host
+
+    def update_host(self, request: FakeRequest):
+        host_id = request.path_params["host_id"]
+        host = request.json()
+        with self.lock:
+            if host_id not in self.hosts:
+                return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+            host["id"] = host_id
+            host["created"] = self.hosts[host_id].get("created")
+            host["updated"] = timestamp(time.time())
+            self.hosts[host_id] = host
+        return HTTPStatus.OK, {}
+
+    def delete_host(self, request: FakeRequest):
+        with self.lock:
+            host = self.hosts.pop(request.path_params["host_id"], None)
+        if host is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, {}
+
+    def search_hosts(self, request: FakeRequest):
+        query = request.json()
+        keywords = (query.get("keywords") or "").lower()
+        role_ids = set(query.get("role") or [])
+        tags = set(query.get("tags") or [])
+        with self.lock:
+            hosts = list(self.hosts.values())
+        if keywords:
+            hosts = [h for h in hosts if keywords in json.dumps(h).lower()]
+        if tags:
+            hosts = [h for h in hosts if tags & set(h.get("tags") or [])]
+        if role_ids:
+            hosts = [
+                h
+                for h in hosts
+                if any(
+                    r.get("id") in role_ids
+                    for p in h.get("principals") or []
+                    for r in p.get("roles") or []
+                )
+            ]
+        return HTTPStatus.OK, paginate(hosts, request, self.config.max_limit)
+
+    def resolve_host(self, request: FakeRequest):
+        query = request.json()
+        address = query.get("address")
+        with self.lock:
+            for host in self.hosts.values():
+                if address in (host.get("addresses") or []):
+                    return HTTPStatus.OK, host
+        return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+
+    def host_tags(self, request: FakeRequest):
+        with self.lock:
+            tags = sorted({t for h in self.hosts.values() for t in h.get("tags") or []})
+        return HTTPStatus.OK, paginate(tags, request, self.config.max_limit)
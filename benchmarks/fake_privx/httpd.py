@@ -0,0 +1,141 @@
+#
+# HTTP request handling of the fake server.
+#
+
+import json
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from fake_privx.routing import FakeRequest, StreamBody
+from fake_privx.state import FakePrivXState
+
+from privx_api.enums import UrlEnum
+
+STATS_PATH = "/_fake/stats"
+AFFINITY_COOKIE = "PRIVX_ROUTE"
+
+
+class FakePrivXHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakePrivX/1.0"
+    # headers and body are written separately, avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.state.count("tcp_connections")
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.state.config.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        state = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        state.count("requests")
+        if url.path == STATS_PATH:
+            self._send(HTTPStatus.OK, state.snapshot())
+            return
+
+        cookies = self._affinity(state)
+        state.delay()
+        route = state.router.match(url.path)
+        if route is None:
+            self._send(HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}, cookies)
+            return
+        url_name, path_params = route
+        with state.lock:
+            state.route_stats[url_name] += 1
+        handler = state.handlers.get((method, url_name))
+        if handler is None:
+            self._send(
+                HTTPStatus.NOT_IMPLEMENTED,
+                {"error": "NOT_IMPLEMENTED", "route": url_name},
+                cookies,
+            )
+            return
+        if url_name != UrlEnum.AUTH.TOKEN and state.inject_error():
+            state.count("injected_errors")
+            self._send(state.config.error_status, {"error": "INJECTED"}, cookies)
+            return
+
+        request = FakeRequest(
+            method,
+            url_name,
+            path_params,
+            dict(parse_qsl(url.query)),
+            body,
+            self.headers,
+        )
+        if not self._is_public(url_name) and not state.authorized(request):
+            self._send(HTTPStatus.UNAUTHORIZED, {"error": "UNAUTHORIZED"}, cookies)
+            return
+        status, payload = handler(request)
+        if isinstance(payload, StreamBody):
+            self._stream(status, payload, cookies)
+        else:
+            self._send(status, payload, cookies)
+
+    @staticmethod
+    def _is_public(url_name: str) -> bool:
+        return url_name == UrlEnum.AUTH.TOKEN or url_name.endswith(".STATUS")
+
+    def _affinity(self, state: FakePrivXState) -> list:
+        if not state.config.nodes:
+            return []
+        cookie = self.headers.get("Cookie") or ""
+        if f"{AFFINITY_COOKIE}=" in cookie:
+            state.count("affinity_hits")
+            return []
+        state.count("affinity_misses")
+        return [f"{AFFINITY_COOKIE}={state.next_node()}; Path=/; HttpOnly"]
+
+    def _send(self, status: int, payload, cookies: Optional[list] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Request-Id", uuid.uuid4().hex)
+        if status in (HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.TOO_MANY_REQUESTS):
+            self.send_header("Retry-After", "1")
+        for cookie in cookies or ():
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, status: int, body: StreamBody, cookies: list) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", body.content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        for cookie in cookies:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        for chunk in body.chunks():
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakePrivXHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, state: FakePrivXState) -> None:
+        super().__init__(address, FakePrivXHandler)
+        self.state = state
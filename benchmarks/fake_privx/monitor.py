@@ -0,0 +1,36 @@
+#
+# Monitor service routes of the fake server.
+#
+
+from http import HTTPStatus
+
+from fake_privx.routing import FakeRequest
+
+
+class MonitorHandlers:
+    """
+    Route handlers over the data of FakePrivXState.
+    """
+
+    def search_audit_events(self, request: FakeRequest):
+        # generated timestamps share one format, so strings compare as times
+        params = request.json()
+        start, end = params.get("start_time"), params.get("end_time")
+        with self.lock:
+            events = self.audit_events
+            if start or end:
+                events = [
+                    e
+                    for e in events
+                    if (not start or e["received_at"] >= start)
+                    and (not end or e["received_at"] < end)
+                ]
+            else:
+                events = list(events)
+        if request.query.get("sortdir", "").lower() == "desc":
+            events.reverse()
+        offset, limit = request.page(self.config.max_limit)
+        return HTTPStatus.OK, {
+            "count": len(events),
+            "items": events[offset : offset + limit],
+        }
@@ -0,0 +1,50 @@
+#
+# Role store routes of the fake server.
+#
+
+import uuid
+from http import HTTPStatus
+
+from fake_privx.routing import FakeRequest, paginate
+
+
+class RoleStoreHandlers:
+    """
+    Route handlers over the data of FakePrivXState.
+    """
+
+    def list_roles(self, request: FakeRequest):
+        with self.lock:
+            roles = list(self.roles.values())
+        return HTTPStatus.OK, paginate(roles, request, self.config.max_limit)
+
+    def create_role(self, request: FakeRequest):
+        role = request.json()
+        role["id"] = str(uuid.uuid4())
+        with self.lock:
+            self.roles[role["id"]] = role
+            self.role_members[role["id"]] = []
+        return HTTPStatus.CREATED, {"id": role["id"]}
+
+    def get_role(self, request: FakeRequest):
+        with self.lock:
+            role = self.roles.get(request.path_params["role_id"])
+        if role is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, role
+
+    def delete_role(self, request: FakeRequest):
+        role_id = request.path_params["role_id"]
+        with self.lock:
+            role = self.roles.pop(role_id, None)
+            self.role_members.pop(role_id, None)
+        if role is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, {}
+
+    def role_members_page(self, request: FakeRequest):
+        with self.lock:
+            members = self.role_members.get(request.path_params["role_id"])
+        if members is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, paginate(members, request, self.config.max_limit)
@@ -0,0 +1,114 @@
+#
+# Requests, generated stream bodies and UrlEnum routing of the fake server.
+#
+
+import json
+import re
+import time
+from typing import Iterator, Optional, Tuple
+from urllib.parse import unquote
+
+from privx_api.enums import UrlEnum
+
+DEFAULT_LIMIT = 50
+
+
+class FakeRequest:
+    def __init__(
+        self,
+        method: str,
+        url_name: str,
+        path_params: dict,
+        query: dict,
+        body: bytes,
+        headers,
+    ) -> None:
+        self.method = method
+        self.url_name = url_name
+        self.path_params = path_params
+        self.query = query
+        self.raw_body = body
+        self.headers = headers
+
+    def json(self):
+        try:
+            return json.loads(self.raw_body or b"{}")
+        except ValueError:
+            return {}
+
+    def page(self, max_limit: int) -> Tuple[int, int]:
+        offset = max(int(self.query.get("offset", 0)), 0)
+        limit = int(self.query.get("limit", DEFAULT_LIMIT))
+        return offset, min(max(limit, 0), max_limit)
+
+
+class StreamBody:
+    """
+    Generated response body sent with chunked transfer encoding.
+    """
+
+    def __init__(self, size: int, content_type: str, chunk_size: int = 64 * 1024):
+        self.size = size
+        self.content_type = content_type
+        self.chunk_size = chunk_size
+
+    def chunks(self) -> Iterator[bytes]:
+        line = b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ\n"
+        block = line * (self.chunk_size // len(line) + 1)
+        remaining = self.size
+        while remaining > 0:
+            chunk = block[: min(self.chunk_size, remaining)]
+            remaining -= len(chunk)
+            yield chunk
+
+
+class Router:
+    """
+    Match request paths against the UrlEnum templates.
+
+    Templates are grouped by service prefix and the most literal template wins,
+    so /hosts/search is never taken for /hosts/{host_id}.
+    """
+
+    def __init__(self) -> None:
+        self._routes = {}
+        for key, inner_enum in vars(UrlEnum).items():
+            if key != key.upper() or key.startswith("__"):
+                continue
+            for url_name, template in inner_enum.urls.items():
+                prefix = template.split("/", 2)[1]
+                self._routes.setdefault(prefix, []).append(
+                    (template.count("{"), url_name, self._compile(template))
+                )
+        for routes in self._routes.values():
+            routes.sort(key=lambda route: route[0])
+
+    def match(self, path: str) -> Optional[Tuple[str, dict]]:
+        prefix = path.split("/", 2)[1] if path.count("/") > 1 else ""
+        for _, url_name, regex in self._routes.get(prefix, ()):
+            found = regex.match(path)
+            if found:
+                params = {k: unquote(v) for k, v in found.groupdict().items()}
+                return url_name, params
+        return None
+
+    @staticmethod
+    def _compile(template: str):
+        pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(template))
+        return re.compile(pattern + "$")
+
+
+def timestamp(seconds: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(seconds))
+
+
+def paginate(items: list, request: FakeRequest, max_limit: int) -> dict:
+    sort_key = request.query.get("sortkey")
+    if sort_key and items and isinstance(items[0], dict):
+        items = sorted(
+            items,
+            key=lambda item: str(item.get(sort_key) or ""),
+            reverse=request.query.get("sortdir", "").lower() == "desc",
+        )
+    offset, limit = request.page(max_limit)
+    return {"count": len(items), "items": items[offset : offset + limit]}
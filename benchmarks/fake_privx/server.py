@@ -0,0 +1,85 @@
+#
+# The fake server running in a background thread.
+#
+
+import tempfile
+import threading
+from typing import Optional
+
+from fake_privx.config import FakeServerConfig
+from fake_privx.httpd import FakePrivXHTTPServer
+from fake_privx.state import FakePrivXState
+from fake_privx.tls import generate_self_signed_cert, server_context
+
+from privx_api.privx_api import PrivXAPI
+
+
+class FakePrivXServer:
+    """
+    Fake PrivX server running in a background thread.
+    """
+
+    def __init__(
+        self,
+        config: Optional[FakeServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        certfile: Optional[str] = None,
+        keyfile: Optional[str] = None,
+    ) -> None:
+        self.config = config or FakeServerConfig()
+        self.state = FakePrivXState(self.config)
+        self._tmpdir = None
+        if not certfile:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="fake-privx-")
+            certfile, keyfile = generate_self_signed_cert(self._tmpdir.name)
+        self.certfile = certfile
+        with open(certfile) as f:
+            self.ca_cert = f.read()
+        self._httpd = FakePrivXHTTPServer((host, port), self.state)
+        self._httpd.socket = server_context(certfile, keyfile).wrap_socket(
+            self._httpd.socket, server_side=True
+        )
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def api(self, **kwargs) -> PrivXAPI:
+        """
+        Return a PrivXAPI client authenticated against this server.
+        """
+        api = PrivXAPI(
+            self.host, self.port, self.ca_cert, "privx-external", "secret", **kwargs
+        )
+        api.authenticate("fake-client", "fake-secret")
+        return api
+
+    def stats(self) -> dict:
+        return self.state.snapshot()
+
+    def start(self) -> "FakePrivXServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-privx", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+        if self._tmpdir:
+            self._tmpdir.cleanup()
+
+    def __enter__(self) -> "FakePrivXServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
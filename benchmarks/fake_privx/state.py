@@ -0,0 +1,141 @@
+#
+# Fake server state: the generated data, the route handlers operating on it,
+# counters and load shaping.
+#
+
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http import HTTPStatus
+from typing import Callable, Dict, Tuple
+from urllib.parse import parse_qsl
+
+from fake_privx.config import FakeServerConfig
+from fake_privx.connections import ConnectionManagerHandlers
+from fake_privx.data import FakePrivXData
+from fake_privx.hosts import HostStoreHandlers
+from fake_privx.monitor import MonitorHandlers
+from fake_privx.roles import RoleStoreHandlers
+from fake_privx.routing import FakeRequest, Router
+from fake_privx.vault import VaultHandlers
+
+from privx_api.enums import UrlEnum
+
+
+class FakePrivXState(
+    HostStoreHandlers,
+    RoleStoreHandlers,
+    ConnectionManagerHandlers,
+    MonitorHandlers,
+    VaultHandlers,
+    FakePrivXData,
+):
+    """
+    In-memory PrivX data and the route handlers operating on it.
+    """
+
+    def __init__(self, config: FakeServerConfig) -> None:
+        super().__init__(config)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.route_stats = Counter()
+        self._node_index = 0
+        self.tokens = set()
+        self.download_handles = {}
+        self.router = Router()
+        self.handlers = self._handlers()
+
+    # counters and load shaping
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"counters": dict(self.stats), "routes": dict(self.route_stats)}
+
+    def next_node(self) -> str:
+        with self.lock:
+            self._node_index = (self._node_index + 1) % self.config.nodes
+            return f"node-{self._node_index}"
+
+    def delay(self) -> None:
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            delay += random.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def inject_error(self) -> bool:
+        return self.config.error_rate > 0 and random.random() < self.config.error_rate
+
+    def authorized(self, request: FakeRequest) -> bool:
+        header = request.headers.get("Authorization") or ""
+        if not header.startswith("Bearer "):
+            return False
+        with self.lock:
+            return header[len("Bearer ") :] in self.tokens
+
+    # handlers
+
+    def _handlers(self) -> Dict[Tuple[str, str], Callable]:
+        handlers = {
+            ("POST", UrlEnum.AUTH.TOKEN): self.issue_token,
+            ("GET", UrlEnum.HOST_STORE.HOSTS): self.list_hosts,
+            ("POST", UrlEnum.HOST_STORE.HOSTS): self.create_host,
+            ("GET", UrlEnum.HOST_STORE.HOST): self.get_host,
+            ("PUT", UrlEnum.HOST_STORE.HOST): self.update_host,
+            ("DELETE", UrlEnum.HOST_STORE.HOST): self.delete_host,
+            ("POST", UrlEnum.HOST_STORE.SEARCH): self.search_hosts,
+            ("POST", UrlEnum.HOST_STORE.RESOLVE): self.resolve_host,
+            ("GET", UrlEnum.HOST_STORE.TAGS): self.host_tags,
+            ("GET", UrlEnum.ROLE_STORE.ROLES): self.list_roles,
+            ("POST", UrlEnum.ROLE_STORE.ROLES): self.create_role,
+            ("GET", UrlEnum.ROLE_STORE.ROLE): self.get_role,
+            ("DELETE", UrlEnum.ROLE_STORE.ROLE): self.delete_role,
+            ("GET", UrlEnum.ROLE_STORE.MEMBERS): self.role_members_page,
+            ("GET", UrlEnum.CONNECTION_MANAGER.CONNECTIONS): self.list_connections,
+            ("POST", UrlEnum.CONNECTION_MANAGER.SEARCH): self.search_connections,
+            ("GET", UrlEnum.CONNECTION_MANAGER.CONNECTION): self.get_connection,
+            ("POST", UrlEnum.CONNECTION_MANAGER.TRAIL_SESSION_ID): self.create_handle,
+            ("GET", UrlEnum.CONNECTION_MANAGER.TRAIL): self.download,
+            ("POST", UrlEnum.CONNECTION_MANAGER.TRAIL_LOG): self.create_handle,
+            ("GET", UrlEnum.CONNECTION_MANAGER.TRAIL_LOG_SESSION_ID): self.download,
+            ("GET", UrlEnum.MONITOR.AUDIT_EVENTS): self.search_audit_events,
+            ("POST", UrlEnum.MONITOR.SEARCH_AUDIT_EVENTS): self.search_audit_events,
+            ("GET", UrlEnum.VAULT.SECRETS): self.list_secrets,
+            ("POST", UrlEnum.VAULT.SECRETS): self.create_secret,
+            ("GET", UrlEnum.VAULT.SECRET): self.get_secret,
+            ("PUT", UrlEnum.VAULT.SECRET): self.update_secret,
+            ("DELETE", UrlEnum.VAULT.SECRET): self.delete_secret,
+            ("GET", UrlEnum.VAULT.METADATA): self.get_secret_metadata,
+            ("POST", UrlEnum.VAULT.SEARCH): self.search_secrets,
+            ("POST", UrlEnum.VAULT.USER_SECRETS): self.create_secret,
+            ("GET", UrlEnum.VAULT.USER_SECRET): self.get_secret,
+            ("GET", UrlEnum.VAULT.USER_SECRET_METADATA): self.get_secret_metadata,
+        }
+        for key, inner_enum in vars(UrlEnum).items():
+            status = getattr(inner_enum, "STATUS", None)
+            if key == key.upper() and status:
+                handlers[("GET", status)] = self.service_status
+        return handlers
+
+    def service_status(self, request: FakeRequest):
+        return HTTPStatus.OK, {"status": "ok", "app_version": "fake"}
+
+    def issue_token(self, request: FakeRequest):
+        form = dict(parse_qsl(request.raw_body.decode("utf-8")))
+        if form.get("grant_type") != "password" or not form.get("username"):
+            return HTTPStatus.UNAUTHORIZED, {"error": "invalid_grant"}
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens.add(token)
+        self.count("tokens_issued")
+        return HTTPStatus.OK, {
+            "access_token": token,
+            "token_type": "Bearer",
+            "expires_in": self.config.token_ttl,
+        }
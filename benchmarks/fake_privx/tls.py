@@ -0,0 +1,49 @@
+#
+# TLS setup of the fake server.
+#
+
+import os
+import shutil
+import ssl
+import subprocess
+from typing import Tuple
+
+
+def generate_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """
+    Create a throwaway certificate valid for localhost and 127.0.0.1.
+    """
+    if not shutil.which("openssl"):
+        raise RuntimeError("openssl not found, pass --cert and --key instead")
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "2",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout",
+            keyfile,
+            "-out",
+            certfile,
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return certfile, keyfile
+
+
+def server_context(certfile: str, keyfile: str) -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
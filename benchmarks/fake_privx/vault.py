@@ -0,0 +1,73 @@
+#
+# Vault routes of the fake server.
+#
+
+import time
+from http import HTTPStatus
+
+from fake_privx.routing import FakeRequest, paginate, timestamp
+
+
+class VaultHandlers:
+    """
+    Route handlers over the data of FakePrivXState.
+    """
+
+    def _secret_store(self, request: FakeRequest) -> dict:
+        user_id = request.path_params.get("user_id")
+        if user_id is None:
+            return self.secrets
+        return self.user_secrets.setdefault(user_id, {})
+
+    def list_secrets(self, request: FakeRequest):
+        with self.lock:
+            secrets = list(self.secrets.values())
+        return HTTPStatus.OK, paginate(secrets, request, self.config.max_limit)
+
+    def create_secret(self, request: FakeRequest):
+        secret = request.json()
+        now = timestamp(time.time())
+        secret.update(created=now, updated=now, version=1, author="fake-privx")
+        with self.lock:
+            store = self._secret_store(request)
+            if secret.get("name") in store:
+                return HTTPStatus.CONFLICT, {"error": "SECRET_EXISTS"}
+            store[secret.get("name")] = secret
+        return HTTPStatus.CREATED, {"name": secret.get("name")}
+
+    def get_secret(self, request: FakeRequest):
+        with self.lock:
+            secret = self._secret_store(request).get(request.path_params["name"])
+        if secret is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, secret
+
+    def update_secret(self, request: FakeRequest):
+        name = request.path_params["name"]
+        with self.lock:
+            secret = self._secret_store(request).get(name)
+            if secret is None:
+                return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+            secret.update(request.json())
+            secret["updated"] = timestamp(time.time())
+            secret["version"] = secret.get("version", 0) + 1
+        return HTTPStatus.OK, {}
+
+    def delete_secret(self, request: FakeRequest):
+        with self.lock:
+            secret = self._secret_store(request).pop(request.path_params["name"], None)
+        if secret is None:
+            return HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"}
+        return HTTPStatus.OK, {}
+
+    def get_secret_metadata(self, request: FakeRequest):
+        status, secret = self.get_secret(request)
+        if status != HTTPStatus.OK:
+            return status, secret
+        return status, {k: v for k, v in secret.items() if k != "data"}
+
+    def search_secrets(self, request: FakeRequest):
+        keywords = (request.json().get("keywords") or "").lower()
+        with self.lock:
+            secrets = [s for s in self.secrets.values() if keywords in s["name"]]
+        return HTTPStatus.OK, paginate(secrets, request, self.config.max_limit)
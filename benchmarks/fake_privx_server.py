@@ -0,0 +1,38 @@
+# Local stand-in for a PrivX deployment, for offline benchmarking of the SDK.
+# Requires Python 3.6+ and the openssl command line tool (unless --cert/--key
+# are given).
+#
+# The server speaks HTTPS with keep-alive and routes requests with the same
+# UrlEnum templates the SDK uses. It keeps in-memory stores for:
+#   * the OAuth token endpoint
+#   * host-store hosts, search, resolve and tags
+#   * role-store roles and role members
+#   * connection-manager connections, search and trail/trail log streaming
+#   * vault secrets, user secrets and secret metadata
+#   * monitor-service audit events and audit event search
+# and answers every "*.STATUS" route. Other UrlEnum routes return 501.
+#
+# Load shaping: per-request latency and jitter, random error injection,
+# offset/limit pagination, Set-Cookie node affinity and generated data sets of
+# any size. GET /_fake/stats returns request, connection and affinity counters.
+#
+# The implementation lives in the fake_privx package next to this script:
+# routing, generated data, route handlers per service, HTTP handling, TLS
+# setup and the command line.
+#
+# Usage:
+#   python3 benchmarks/fake_privx_server.py --port 8443 --hosts 100000
+#
+# Programmatic usage:
+#   with FakePrivXServer(FakeServerConfig(hosts=1000)) as server:
+#       api = server.api()
+#       api.search_hosts(limit=100)
+
+from fake_privx.cli import main
+from fake_privx.config import FakeServerConfig
+from fake_privx.server import FakePrivXServer
+
+__all__ = ["FakePrivXServer", "FakeServerConfig", "main"]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Record a search_connections + trail download workload and replay it offline.
+# Requires Python 3.6+
+#
+# Recording runs against the in-process fake server unless a config module
+# with the usual examples/config.py settings is given. Replay needs no server
+# and can run under cProfile to profile JSON decoding, paging and streaming.
+#
+# Usage:
+#   python3 benchmarks/replay_workload.py record workload.jsonl.gz --pages 20
+#   python3 benchmarks/replay_workload.py record workload.jsonl.gz --config cfg
+#   python3 benchmarks/replay_workload.py replay workload.jsonl.gz --profile
+#   python3 benchmarks/replay_workload.py replay workload.jsonl.gz --original-timing
+
+import argparse
+import cProfile
+import importlib
+import pstats
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+
+from privx_api.privx_api import PrivXAPI  # noqa: E402
+from privx_api.replay import record_exchanges, replay_exchanges  # noqa: E402
+
+
+def workload(api: PrivXAPI, pages: int, page_size: int, trails: int) -> dict:
+    totals = {"connections": 0, "trail_bytes": 0}
+    downloaded = 0
+    for page in range(pages):
+        resp = api.search_connections(offset=page * page_size, limit=page_size)
+        if not resp.ok:
+            raise SystemExit(f"search_connections failed: {resp.data}")
+        items = resp.data.get("items", [])
+        totals["connections"] += len(items)
+        for connection in items:
+            if downloaded >= trails:
+                break
+            for channel in connection.get("channels") or []:
+                handle = api.create_trail_download_handle(
+                    connection["id"], channel["id"], channel["file_id"]
+                )
+                stream = api.download_trail(
+                    connection["id"],
+                    channel["id"],
+                    channel["file_id"],
+                    handle.data["session_id"],
+                )
+                for chunk in stream.iter_content():
+                    totals["trail_bytes"] += len(chunk)
+            downloaded += 1
+        if len(items) < page_size:
+            break
+    return totals
+
+
+def record(args: argparse.Namespace) -> None:
+    server = None
+    if args.config:
+        config = importlib.import_module(args.config)
+        api = PrivXAPI(
+            config.HOSTNAME,
+            config.HOSTPORT,
+            config.CA_CERT,
+            config.OAUTH_CLIENT_ID,
+            config.OAUTH_CLIENT_SECRET,
+            use_cookies=True,
+        )
+        credentials = (config.API_CLIENT_ID, config.API_CLIENT_SECRET)
+    else:
+        from fake_privx_server import FakePrivXServer, FakeServerConfig
+
+        server = FakePrivXServer(
+            FakeServerConfig(
+                connections=args.pages * args.page_size,
+                latency_ms=args.latency_ms,
+                nodes=2,
+            )
+        ).start()
+        api = PrivXAPI(server.host, server.port, server.ca_cert, "c", "s")
+        credentials = ("fake-client", "fake-secret")
+    try:
+        with record_exchanges(api, args.file):
+            api.authenticate(*credentials)
+            started = time.perf_counter()
+            totals = workload(api, args.pages, args.page_size, args.trails)
+    finally:
+        if server:
+            server.stop()
+    print(f"recorded {totals} in {time.perf_counter() - started:.3f}s")
+
+
+def replay(args: argparse.Namespace) -> None:
+    api = PrivXAPI("privx.invalid", 443, "", "", "", use_cookies=True)
+    profiler = cProfile.Profile() if args.profile else None
+    with replay_exchanges(api, args.file, args.original_timing):
+        api.authenticate("replay", "replay")
+        started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        totals = workload(api, args.pages, args.page_size, args.trails)
+        if profiler:
+            profiler.disable()
+    print(f"replayed {totals} in {time.perf_counter() - started:.3f}s")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay SDK workload")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("file", help="recording, .gz suffix enables compression")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--trails", type=int, default=5)
+    parser.add_argument("--config", help="config module of a live PrivX")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--original-timing", action="store_true")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+    if args.mode == "record":
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# Benchmark suite for the SDK client-side hot paths.
+# Requires Python 3.6+
+#
+# Every case reports the best mean time per operation over several rounds.
+# Results are written as JSON and can be compared against a stored baseline;
+# a case regresses when it is slower than baseline * threshold.
+#
+# Usage:
+#   python3 benchmarks/run_benchmarks.py                     # run and compare
+#   python3 benchmarks/run_benchmarks.py --save-baseline     # refresh baseline
+#   python3 benchmarks/run_benchmarks.py -k cookie --output results.json
+#
+# Baselines are machine dependent, refresh them on the machine that runs the
+# comparison before relying on the thresholds.
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from http import HTTPStatus
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+
+from privx_api.base import format_path_components  # noqa: E402
+from privx_api.cookie_jar import RoutingCookieJar  # noqa: E402
+from privx_api.enums import UrlEnum  # noqa: E402
+from privx_api.privx_api import PrivXAPI  # noqa: E402
+from privx_api.response import PrivXAPIResponse  # noqa: E402
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 1.25
+# end-to-end cases run over real sockets and are noisier
+NETWORK_THRESHOLD = 1.5
+
+CASES = {}
+
+
+def case(name: str, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Register a benchmark case. The decorated function performs the setup and
+    returns the zero-argument callable that is timed.
+    """
+
+    def register(setup: Callable[[], Callable]) -> Callable:
+        CASES[name] = (setup, threshold)
+        return setup
+
+    return register
+
+
+def _api() -> PrivXAPI:
+    return PrivXAPI("privx.example.com", 443, "", "", "")
+
+
+@case("url_enum_get")
+def bench_url_enum_get():
+    return lambda: UrlEnum.get(UrlEnum.SECRETS_MANAGER.TARGET_DOMAIN_ACCOUNTS)
+
+
+@case("build_url")
+def bench_build_url():
+    api = _api()
+    path_params = {"role_id": "8f4d7c5e-0ea4-4a34-6b5d-02d0b3b2bd19"}
+    query_params = {"offset": 100, "limit": 50, "sortdir": "asc"}
+    return lambda: api._build_url(UrlEnum.ROLE_STORE.MEMBERS, path_params, query_params)
+
+
+@case("format_path_components")
+def bench_format_path_components():
+    template = UrlEnum.get(UrlEnum.CONNECTION_MANAGER.TRAIL)
+    params = {
+        "connection_id": "3fce2f47-d6b9-42a4-749a-7cfde7afb0c7",
+        "channel_id": "1",
+        "file_id": "a file/with spaces",
+        "session_id": "9f6aadac-f3a0-4f08-51bb-d2a2cfcbc10c",
+    }
+    return lambda: format_path_components(template, **params)
+
+
+@case("get_search_params")
+def bench_get_search_params():
+    api = _api()
+    return lambda: api._get_search_params(
+        offset=0,
+        limit=1000,
+        sortkey="updated",
+        sortdir="desc",
+        filter=None,
+        fuzzycount=True,
+        verbose=False,
+    )
+
+
+def _cookie_jar() -> RoutingCookieJar:
+    jar = RoutingCookieJar()
+    jar.store(
+        [
+            "AWSALB=node-a; Path=/; Max-Age=3600",
+            "AWSALBCORS=node-a; Path=/; Max-Age=3600; SameSite=None; Secure",
+            "ROUTE=auth-2; Path=/auth",
+        ],
+        "privx.example.com",
+        "/auth/api/v1/oauth/token",
+    )
+    return jar
+
+
+@case("cookie_jar_get_header")
+def bench_cookie_jar_get_header():
+    jar = _cookie_jar()
+    return lambda: jar.get_header("privx.example.com", "/host-store/api/v1/hosts")
+
+
+@case("cookie_jar_store")
+def bench_cookie_jar_store():
+    jar = _cookie_jar()
+    headers = ["AWSALB=node-b; Path=/; Max-Age=3600"]
+    return lambda: jar.store(headers, "privx.example.com", "/host-store/api/v1/hosts")
+
+
+@case("response_small")
+def bench_response_small():
+    body = b'{"id": "8f4d7c5e-0ea4-4a34-6b5d-02d0b3b2bd19", "name": "admins"}'
+    headers = {"Content-Type": "application/json", "X-Request-Id": "abc"}
+    return lambda: PrivXAPIResponse(HTTPStatus.OK, HTTPStatus.OK, body, headers)
+
+
+@case("response_page_100_hosts")
+def bench_response_page():
+    host = {
+        "id": "8f4d7c5e-0ea4-4a34-6b5d-02d0b3b2bd19",
+        "common_name": "host-000001",
+        "addresses": ["10.0.0.1", "host-000001.example.com"],
+        "services": [{"service": "SSH", "address": "10.0.0.1", "port": 22}],
+        "principals": [{"principal": "root", "roles": [{"id": "r", "name": "n"}]}],
+        "tags": ["zone-1"],
+        "updated": "2021-03-29T12:53:05.000Z",
+    }
+    body = json.dumps({"count": 100, "items": [host] * 100}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    return lambda: PrivXAPIResponse(HTTPStatus.OK, HTTPStatus.OK, body, headers)
+
+
+def _fake_server():
+    from fake_privx_server import FakePrivXServer, FakeServerConfig
+
+    server = FakePrivXServer(FakeServerConfig(hosts=100, connections=10)).start()
+    return server
+
+
+@case("e2e_get_host", threshold=NETWORK_THRESHOLD)
+def bench_e2e_get_host():
+    server = _fake_server()
+    api = server.api()
+    host_id = api.get_hosts(limit=1).data["items"][0]["id"]
+    CLEANUP.append(server.stop)
+    return lambda: api.get_host(host_id)
+
+
+@case("e2e_search_hosts_page", threshold=NETWORK_THRESHOLD)
+def bench_e2e_search_hosts():
+    server = _fake_server()
+    api = server.api()
+    CLEANUP.append(server.stop)
+    return lambda: api.search_hosts(limit=100)
+
+
+@case("e2e_get_host_pooled", threshold=NETWORK_THRESHOLD)
+def bench_e2e_get_host_pooled():
+    server = _fake_server()
+    api = server.api(pool_size=4)
+    host_id = api.get_hosts(limit=1).data["items"][0]["id"]
+    CLEANUP.extend((api.close, server.stop))
+    return lambda: api.get_host(host_id)
+
+
+@case("e2e_search_hosts_page_pooled", threshold=NETWORK_THRESHOLD)
+def bench_e2e_search_hosts_pooled():
+    server = _fake_server()
+    api = server.api(pool_size=4)
+    CLEANUP.extend((api.close, server.stop))
+    return lambda: api.search_hosts(limit=100)
+
+
+CLEANUP = []
+
+
+def measure(func: Callable, rounds: int, min_time: float) -> float:
+    """
+    Return the best mean seconds per call over `rounds` timed rounds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    results = [elapsed] + timer.repeat(repeat=rounds - 1, number=number)
+    return min(results) / number
+
+
+def run(selected: Dict[str, tuple], rounds: int, min_time: float) -> dict:
+    results = {}
+    try:
+        for name, (setup, threshold) in selected.items():
+            seconds = measure(setup(), rounds, min_time)
+            results[name] = {
+                "ns_per_op": round(seconds * 1e9, 1),
+                "ops_per_sec": round(1 / seconds, 1),
+                "threshold": threshold,
+            }
+            print(f"{name:28s} {seconds * 1e9:14.1f} ns/op {1 / seconds:14.1f} op/s")
+    finally:
+        for cleanup in CLEANUP:
+            cleanup()
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list:
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            print(f"{name:28s} no baseline")
+            continue
+        ratio = result["ns_per_op"] / reference["ns_per_op"]
+        threshold = reference.get("threshold", DEFAULT_THRESHOLD)
+        verdict = "REGRESSION" if ratio > threshold else "ok"
+        print(f"{name:28s} {ratio:6.2f}x of baseline (limit {threshold}x) {verdict}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PrivX SDK benchmarks")
+    parser.add_argument("-k", dest="keyword", help="only run cases containing this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    selected = {
+        name: spec
+        for name, spec in CASES.items()
+        if not args.keyword or args.keyword in name
+    }
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": run(selected, args.rounds, args.min_time),
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        if args.baseline.exists() and args.keyword:
+            # keep the cases that were not part of this run
+            previous = json.loads(args.baseline.read_text())
+            report["results"] = {**previous.get("results", {}), **report["results"]}
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline")
+        return
+    regressions = compare(report["results"], json.loads(args.baseline.read_text()))
+    if regressions:
+        print("Regressed: " + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,43 +42,43 @@ api = privx_api.PrivXAPI(
 # NOTE: fill in your credentials from secure storage, this is just an example
 api.authenticate(config.API_CLIENT_ID, config.API_CLIENT_SECRET)
 
+# Search role IDs for host account mapping.
+roles = {}
+resp = api.get_roles()
+if resp.ok:
+    for role in resp.data.get("items"):
+        roles[role.get("name")] = role.get("id")
+
+desired_hosts = []
 for hostdata in hosts:
     principals = []
-    if len(hostdata.get("accounts")):
-        for account in hostdata.get("accounts"):
-            item = {
+    for account in hostdata.get("accounts") or []:
+        principals.append(
+            {
                 "principal": account.get("name"),
                 "passphrase": account.get("password"),
                 "source": "UI",
+                "roles": [
+                    {"id": role_id}
+                    for role_name, role_id in roles.items()
+                    if role_name in account.get("roles")
+                ],
             }
+        )
 
-            # Search role ID for host account mapping.
-            roles = {}
-            acc_roles = []
-            resp = api.get_roles()
-            if resp.ok:
-                for role in resp.data.get("items"):
-                    roles[role.get("name")] = role.get("id")
-
-            for role_name, role_id in roles.items():
-                if role_name in account.get("roles"):
-                    acc_roles.append({"id": role_id})
-
-            item["roles"] = acc_roles
-            principals.append(item)
-
-    # Create host.
-    data = {
-        "common_name": hostdata.get("name"),
-        "addresses": hostdata.get("addresses"),
-        "audit_enabled": bool(hostdata.get("audited")),
-        "services": hostdata.get("services"),
-        "principals": principals,
-    }
+    desired_hosts.append(
+        {
+            "common_name": hostdata.get("name"),
+            "addresses": hostdata.get("addresses"),
+            "audit_enabled": bool(hostdata.get("audited")),
+            "services": hostdata.get("services"),
+            "principals": principals,
+        }
+    )
 
-    resp = api.create_host(data)
-    if resp.ok:
-        print("Host created.")
-    else:
-        print("Host creation failed.")
-        print(resp.data)
+# Create missing hosts and update the changed ones, existing hosts are
+# matched by address or common name. Use dry_run=True to only see the counts.
+report = api.sync_hosts(desired_hosts)
+print(report)
+for failure in report.failures:
+    print("Host {} failed:".format(failure["operation"]), failure)
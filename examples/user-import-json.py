@@ -1,7 +1,6 @@
 # An example how to use PrivX API for user creation.
 # Requires Python 3.6+
 
-import json
 import os
 import sys
 
@@ -40,33 +39,23 @@ api.authenticate(config.API_CLIENT_ID, config.API_CLIENT_SECRET)
 # PrivX-API specifications.
 USER_DATA_FILE = os.path.join(sys.path[0], "data/user-import.json")
 
-# Destination for logging user import.
+# Destination for per-user import results, rerunning the example with the
+# same log resumes an interrupted import.
 LOGFILE = "user-import-json.log"
 
 
 def main():
-    with open(USER_DATA_FILE, "r") as f:
-        user_data = json.load(f)
+    print("Adding users from " + USER_DATA_FILE)
 
-    with open(LOGFILE, "w") as log:
-        print("Adding users from " + USER_DATA_FILE)
-
-        fails = 0
-
-        for user in user_data:
-            response = api.create_user(user)
-
-            if response.ok:
-                log.write(user["username"] + " added succesfully.\n")
-            else:
-                log.write(user["username"] + " failed to be added: ")
-                log.write(json.dumps(response.data) + "\n")
-                fails += 1
+    counts = api.import_users(USER_DATA_FILE, log_path=LOGFILE)
 
     print("User import completed.")
 
-    if fails > 0:
-        print("{} out of {} users failed to be added!".format(fails, len(user_data)))
+    for status, count in sorted(counts.items()):
+        print("{}: {}".format(status, count))
+
+    if counts["failed"] > 0:
+        print("{} users failed to be added!".format(counts["failed"]))
 
     print("Check {} for additional information.".format(os.path.abspath(LOGFILE)))
 
@@ -0,0 +1,247 @@
+#
+# Audit event export to columnar files.
+#
+# Events are paged oldest first with a bounded number of pages prefetched in
+# parallel, gathered into fixed-size batches of columns and appended to
+# rotating files: Parquet or Arrow IPC when pyarrow is installed, gzipped CSV
+# otherwise. Only the prefetched pages and one batch are held in memory, so
+# peak memory does not depend on the number of events exported.
+#
+# Every column is a string column so that the schema stays stable across
+# batches: nested values are JSON encoded and fields missing from the column
+# list go to a JSON "extra" column, named "_extra" (or with more underscores)
+# when the events have an extra field of their own. A batch is split between
+# files so that none holds more than rows_per_file rows.
+#
+
+import csv
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.utils import iter_items
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXTRA_COLUMN = "extra"
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+
+
+def default_format() -> str:
+    return "parquet" if pyarrow is not None else "csv"
+
+
+class AuditExportReport:
+    """
+    Files written by an export and its throughput.
+    """
+
+    def __init__(self) -> None:
+        self.files: List[str] = []
+        self.events = 0
+        self.elapsed = 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.events} events to {len(self.files)} files in "
+            f"{self.elapsed:.2f}s ({self.events_per_second:.0f} events/s)"
+        )
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: List[str]) -> None:
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+        self._columns = columns
+
+    def write(self, batch: Dict[str, list]) -> None:
+        self._writer.writerows(
+            zip(*(["" if v is None else v for v in batch[c]] for c in self._columns))
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowWriter:
+    def __init__(self, path: str, columns: List[str], file_format: str) -> None:
+        self._schema = pyarrow.schema([(c, pyarrow.string()) for c in columns])
+        if file_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(path, self._schema)
+
+    def write(self, batch: Dict[str, list]) -> None:
+        self._writer.write_table(pyarrow.Table.from_pydict(batch, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _cell(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"))
+
+
+def extra_column(columns: List[str]) -> str:
+    """
+    Name of the column holding the fields missing from `columns`.
+    """
+    name = EXTRA_COLUMN
+    while name in columns:
+        name = "_" + name
+    return name
+
+
+def to_columns(events: List[dict], columns: List[str]) -> Dict[str, list]:
+    """
+    Column-major string batch of `events`, unknown fields go to the column
+    named by extra_column.
+    """
+    known = set(columns)
+    batch = {c: [_cell(e.get(c)) for e in events] for c in columns}
+    batch[extra_column(columns)] = [
+        _cell({k: v for k, v in e.items() if k not in known} or None) for e in events
+    ]
+    return batch
+
+
+class _RotatingWriter:
+    """
+    Appends batches to numbered files of at most rows_per_file rows each.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        file_format: str,
+        rows_per_file: int,
+        report: AuditExportReport,
+    ) -> None:
+        self._directory = directory
+        self._prefix = prefix
+        self._file_format = file_format
+        self._rows_per_file = rows_per_file
+        self._report = report
+        self._writer = None
+        self._rows = 0
+
+    def write(self, events: List[dict], columns: List[str]) -> None:
+        while events:
+            if self._writer is None:
+                self._open(columns + [extra_column(columns)])
+            part = events[: self._rows_per_file - self._rows]
+            events = events[len(part) :]
+            self._writer.write(to_columns(part, columns))
+            self._rows += len(part)
+            self._report.events += len(part)
+            if self._rows >= self._rows_per_file:
+                self.close()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer, self._rows = None, 0
+
+    def _open(self, columns: List[str]) -> None:
+        path = os.path.join(
+            self._directory,
+            f"{self._prefix}-{len(self._report.files):05d}"
+            f"{SUFFIXES[self._file_format]}",
+        )
+        self._writer = _open_writer(path, columns, self._file_format)
+        self._report.files.append(path)
+
+
+def _batches(events: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for event in events:
+        batch.append(event)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_events(
+    events: Iterable[dict],
+    directory: str,
+    file_format: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    batch_size: int = 50000,
+    rows_per_file: int = 1000000,
+    prefix: str = "audit-events",
+) -> AuditExportReport:
+    """
+    Write `events` to rotating files in `directory`, see
+    MonitorServiceAPI.export_audit_events.
+    """
+    file_format = file_format or default_format()
+    if file_format not in SUFFIXES:
+        raise InternalAPIException("Unknown export format: ", file_format)
+    if file_format != "csv" and pyarrow is None:
+        raise InternalAPIException("pyarrow is required for ", file_format)
+    os.makedirs(directory, exist_ok=True)
+    report = AuditExportReport()
+    start = time.perf_counter()
+    writer = _RotatingWriter(directory, prefix, file_format, rows_per_file, report)
+    try:
+        for batch in _batches(iter(events), batch_size):
+            if columns is None:
+                # the first batch fixes the layout of every file
+                columns = sorted({k for event in batch for k in event})
+            writer.write(batch, columns)
+    finally:
+        writer.close()
+        report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _open_writer(path: str, columns: List[str], file_format: str):
+    if file_format == "csv":
+        return _CsvWriter(path, columns)
+    return _ArrowWriter(path, columns, file_format)
+
+
+def export_audit_events(
+    search: Callable,
+    directory: str,
+    params: Optional[dict] = None,
+    workers: int = 4,
+    page_size: int = 1000,
+    **kwargs,
+) -> AuditExportReport:
+    """
+    Export the events of `search` (search_audit_events) oldest first, with up
+    to `workers` pages fetched in parallel ahead of the batch being written.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        events = iter_items(
+            lambda offset, limit: search(
+                offset=offset,
+                limit=limit,
+                sort_dir="asc",
+                audit_event_params=params,
+            ),
+            page_size,
+            executor,
+            prefetch=workers,
+        )
+        return export_events(events, directory, **kwargs)
@@ -0,0 +1,147 @@
+#
+# Audit event follow mode.
+#
+# Instead of paging a growing result set with ever larger offsets, every poll
+# searches from a time high-water mark in ascending order. The search starts
+# `overlap` seconds before the mark so that events stored late are still
+# picked up, and the ids of events already delivered inside that window are
+# remembered so that the overlap yields no duplicates. The cursor is
+# checkpointed to a JSON file after every delivered page.
+#
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, Optional
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.utils import format_time, parse_time
+
+
+class AuditEventCursor:
+    """
+    High-water mark plus the ids delivered within the overlap window.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.high_water_mark: Optional[str] = None
+        # event id -> event time, only for events within the overlap window
+        self.seen: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.high_water_mark = state.get("high_water_mark")
+            self.seen = state.get("seen") or {}
+
+    def advance(self, event_id: Optional[str], event_time: str) -> None:
+        if event_id is not None:
+            self.seen[event_id] = event_time
+        if self.high_water_mark is None or parse_time(event_time) > parse_time(
+            self.high_water_mark
+        ):
+            self.high_water_mark = event_time
+
+    def prune(self, before: datetime) -> None:
+        self.seen = {i: t for i, t in self.seen.items() if parse_time(t) >= before}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        # write and rename, so a crash never leaves a torn checkpoint
+        state = {"high_water_mark": self.high_water_mark, "seen": self.seen}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+
+class AuditEventFollower:
+    """
+    Iterate audit events as they arrive, oldest first, until stop() is called.
+    Delivery is at least once: events of a page that was not finished before
+    a crash or stop() are delivered again.
+
+    `search(offset, limit, audit_event_params)` is search_audit_events. The poll
+    interval drops back to min_interval whenever a poll finds events and
+    doubles up to max_interval while polls come back empty.
+    """
+
+    def __init__(
+        self,
+        search: Callable,
+        checkpoint_path: Optional[str] = None,
+        params: Optional[dict] = None,
+        start_time: Optional[str] = None,
+        page_size: int = 1000,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        overlap: float = 60.0,
+        time_field: str = "received_at",
+        id_field: str = "id",
+    ) -> None:
+        self._search = search
+        self._params = dict(params or {})
+        self._page_size = page_size
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._overlap = timedelta(seconds=overlap)
+        self._time_field = time_field
+        self._id_field = id_field
+        self._stop = threading.Event()
+        self.cursor = AuditEventCursor(checkpoint_path)
+        if self.cursor.high_water_mark is None:
+            self.cursor.high_water_mark = start_time
+        self.interval = min_interval
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def __iter__(self) -> Iterator[dict]:
+        while not self._stop.is_set():
+            found = False
+            for event in self.poll():
+                found = True
+                yield event
+                if self._stop.is_set():
+                    return
+            if found:
+                self.interval = self._min_interval
+            else:
+                self.interval = min(self.interval * 2, self._max_interval)
+            self._stop.wait(self.interval)
+
+    def poll(self) -> Iterator[dict]:
+        """
+        Yield the events not delivered yet, a single pass without waiting.
+        """
+        params = dict(self._params)
+        if self.cursor.high_water_mark:
+            start = parse_time(self.cursor.high_water_mark) - self._overlap
+            params["start_time"] = format_time(start)
+            self.cursor.prune(start)
+        offset = 0
+        while True:
+            response = self._search(
+                offset=offset,
+                limit=self._page_size,
+                sort_dir="asc",
+                audit_event_params=params,
+            )
+            if not response.ok:
+                raise InternalAPIException(
+                    "Failed to search audit events: ", response.data
+                )
+            events = response.data.get("items") or []
+            for event in events:
+                event_id = event.get(self._id_field)
+                if event_id is not None and event_id in self.cursor.seen:
+                    continue
+                yield event
+                self.cursor.advance(event_id, event[self._time_field])
+            # the consumer has handled the page once the generator resumes
+            self.cursor.save()
+            if len(events) < self._page_size:
+                return
+            offset += self._page_size
@@ -1,6 +1,7 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
+from privx_api import batch_signing, checkout_pool, target_credential_cache, trust_cache
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse, PrivXStreamResponse
@@ -75,6 +76,30 @@ class AuthorizerAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def target_credential_cache(
+        self,
+        expiry_margin: float = 30.0,
+        refresh_ahead: float = 0.8,
+        default_ttl: float = 60.0,
+    ) -> target_credential_cache.TargetCredentialCache:
+        """
+        Create a cache of get_target_host_credentials results keyed by the
+        target parameters. Entries are reused until expiry_margin seconds
+        before the earliest OpenSSH or X.509 certificate in them expires
+        (default_ttl seconds when there is none) and refreshed in the
+        background once refresh_ahead of their lifetime has passed;
+        concurrent misses for the same target share one request.
+
+        Returns:
+            TargetCredentialCache
+        """
+        return target_credential_cache.TargetCredentialCache(
+            self.get_target_host_credentials,
+            expiry_margin=expiry_margin,
+            refresh_ahead=refresh_ahead,
+            default_ttl=default_ttl,
+        )
+
     def get_principals(self) -> PrivXAPIResponse:
         """
         Get defined principals from the authorizer.
@@ -178,6 +203,34 @@ class AuthorizerAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def sign_batch_with_principal_key(
+        self,
+        group_id: str,
+        key_id: str,
+        sign_params: Iterable[dict],
+        workers: int = 8,
+        window: Optional[int] = None,
+        stats: Optional[batch_signing.SigningStats] = None,
+    ) -> Iterator[PrivXAPIResponse]:
+        """
+        Sign many payloads with up to `workers` requests in flight, reading
+        sign_params lazily and keeping at most `window` requests (2 * workers
+        by default) ahead of the consumer. Create the client with
+        pool_size >= workers so that the requests reuse pooled connections.
+        Pass a SigningStats to get the throughput and latency distribution.
+
+        Returns:
+            iterator of PrivXAPIResponse in sign_params order, a request that
+            failed without a response has status 0 and the error in its data
+        """
+        return batch_signing.sign_batch(
+            lambda params: self.sign_with_principal_key(group_id, key_id, params),
+            sign_params,
+            workers=workers,
+            window=window,
+            stats=stats,
+        )
+
     def get_component_certs(
         self,
         ca_type: str,
@@ -422,6 +475,36 @@ class AuthorizerAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def trust_cache(
+        self,
+        path: Optional[str] = None,
+        max_age: float = 3600.0,
+        refresh_ahead: float = 0.8,
+        stale_grace: float = 300.0,
+    ) -> trust_cache.TrustCache:
+        """
+        Create a cache of CRLs, authorizer CA certificates and trust anchors,
+        with revocation lookups by serial number against the parsed CRLs.
+        Entries are fresh until the CRL nextUpdate or certificate expiry, at
+        most max_age seconds, and refreshed in the background once
+        refresh_ahead of that has passed. For stale_grace seconds after it a
+        stale entry is served while the refresh runs. With path the entries
+        are also kept in a JSON file for reuse across processes.
+
+        Returns:
+            TrustCache
+        """
+        return trust_cache.TrustCache(
+            self.download_cert_revocation_list,
+            self.download_authorizer_cert,
+            self.get_ssl_trust_anchor,
+            self.get_extender_trust_anchor,
+            path=path,
+            max_age=max_age,
+            refresh_ahead=refresh_ahead,
+            stale_grace=stale_grace,
+        )
+
     def get_access_groups(
         self,
         offset: Optional[int] = None,
@@ -706,3 +789,30 @@ class AuthorizerAPI(BasePrivXAPI):
             UrlEnum.AUTHORIZER.RELEASE_ACCOUNT_SECRET, path_params={"id": id}
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
+
+    def account_secret_checkout_pool(
+        self,
+        expiry_margin: float = 30.0,
+        idle_release: float = 300.0,
+        default_ttl: float = 300.0,
+        release_at_exit: bool = True,
+    ) -> checkout_pool.CheckoutPool:
+        """
+        Create a pool of account secret checkouts shared between workers.
+        pool.lease(checkout_params) reuses an active checkout for the same
+        parameters until expiry_margin seconds before it expires, checkouts
+        unused for idle_release seconds are released by a background timer
+        and the rest on close or at process exit. The pool counts checkouts
+        and reuses.
+
+        Returns:
+            CheckoutPool
+        """
+        return checkout_pool.CheckoutPool(
+            self.checkout_account_secrets,
+            self.release_account_secret_checkout,
+            expiry_margin=expiry_margin,
+            idle_release=idle_release,
+            default_ttl=default_ttl,
+            release_at_exit=release_at_exit,
+        )
@@ -0,0 +1,138 @@
+#
+# AWS temporary credential cache.
+#
+# Tokens are keyed by AWS role and requested TTL and kept until
+# `expiry_margin` seconds before they expire. Once `refresh_ahead` of a
+# token's lifetime has passed, a read still returns it but starts a refresh
+# in a background thread. Concurrent reads of a missing token share a single
+# get_aws_token call.
+#
+# With a path and an encryption key the tokens are also stored in a Fernet
+# encrypted file, so that short-lived CLI processes can reuse them. This needs
+# the optional cryptography package.
+#
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.expiring_cache import ExpiringCache
+from privx_api.utils import parse_time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+
+class AwsTokenCache:
+    """
+    Thread-safe cache of get_aws_token results.
+    """
+
+    def __init__(
+        self,
+        get_aws_token: Callable,
+        expiry_margin: float = 60.0,
+        refresh_ahead: float = 0.8,
+        path: Optional[str] = None,
+        encryption_key: Optional[bytes] = None,
+    ) -> None:
+        if path and Fernet is None:
+            raise InternalAPIException("Persisting AWS tokens requires cryptography")
+        if path and not encryption_key:
+            raise InternalAPIException("Persisting AWS tokens requires a key")
+        self._get_aws_token = get_aws_token
+        self._expiry_margin = expiry_margin
+        self._refresh_ahead = refresh_ahead
+        self._path = path
+        self._fernet = Fernet(encryption_key) if path else None
+        self._save_lock = threading.Lock()
+        self._cache = ExpiringCache(self._load_token, self._save if path else None)
+        if path:
+            self._load()
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def fetches(self) -> int:
+        return self._cache.loads
+
+    def get(
+        self, aws_role_id: str, ttl: int = 900, token_code: Optional[str] = None
+    ) -> dict:
+        """
+        AWS credentials as returned by RoleStoreAPI.get_aws_token.
+        """
+        if token_code is None:
+            return dict(self._cache.get((aws_role_id, ttl)))
+        # a one-time token code cannot be reused by a later refresh
+        return dict(
+            self._cache.get(
+                (aws_role_id, ttl),
+                lambda key: self._load_token(key, token_code),
+                refresh=False,
+            )
+        )
+
+    def invalidate(self, aws_role_id: Optional[str] = None) -> None:
+        self._cache.invalidate(lambda key: aws_role_id in (None, key[0]))
+        if self._path:
+            self._save()
+
+    def _load_token(
+        self, key: Tuple[str, int], token_code: Optional[str] = None
+    ) -> Tuple[dict, float, float]:
+        fetched = time.time()
+        response = self._get_aws_token(key[0], key[1], token_code)
+        if not response.ok:
+            raise InternalAPIException("Failed to get AWS token: ", response.data)
+        token = response.data
+        expires = fetched + key[1]
+        if token.get("expiration"):
+            expires = parse_time(token["expiration"]).timestamp()
+        refresh_at = fetched + (expires - fetched) * self._refresh_ahead
+        return token, expires - self._expiry_margin, refresh_at
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "rb") as f:
+            try:
+                state = json.loads(self._fernet.decrypt(f.read()))
+            except (InvalidToken, ValueError):
+                # written with another key or damaged, start over
+                return
+        now = time.time()
+        for item in state:
+            if now < item["expires"]:
+                self._cache.put(
+                    (item["role"], item["ttl"]),
+                    item["data"],
+                    item["expires"],
+                    item["refresh_at"],
+                )
+
+    def _save(self) -> None:
+        state = [
+            {
+                "role": role,
+                "ttl": ttl,
+                "data": token,
+                "expires": expires,
+                "refresh_at": refresh_at,
+            }
+            for (role, ttl), token, expires, refresh_at in self._cache.items()
+        ]
+        data = self._fernet.encrypt(json.dumps(state).encode("utf-8"))
+        with self._save_lock:
+            tmp_path = self._path + ".tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path)
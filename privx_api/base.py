@@ -1,18 +1,23 @@
 import base64
 import http.client
 import json
-import ssl
+import threading
 import time
 import urllib.parse
 import urllib.request
+from functools import partial
 from http.client import HTTPException, HTTPResponse
 from json import JSONDecodeError
-from typing import Optional, Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 from privx_api.cookie_jar import RoutingCookieJar
 from privx_api.enums import NO_AUTH_STATUS_URLS, UrlEnum
 from privx_api.exceptions import InternalAPIException
+from privx_api.hooks import REDACTED, HookEnum, RequestHooks
+from privx_api.hooks import dispatch as dispatch_hooks
 from privx_api.response import PrivXAPIResponse, PrivXStreamResponse
+from privx_api.transport import Connection  # noqa: F401
+from privx_api.transport import HTTPSTransport, Transport
 
 
 def format_path_components(format_str: str, **kw) -> str:
@@ -32,33 +37,6 @@ def format_path_components(format_str: str, **kw) -> str:
     return format_str.format(**components)
 
 
-class Connection:
-    def __init__(self, connection_info) -> None:
-        self.host = connection_info["host"]
-        self.port = connection_info["port"]
-        self.ca_cert = connection_info["ca_cert"]
-        self._connection = None
-
-    def __enter__(self) -> http.client.HTTPSConnection:
-        self._connection = self.connect()
-        return self._connection
-
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self._connection.close()
-
-    def connect(self) -> http.client.HTTPSConnection:
-        return http.client.HTTPSConnection(
-            self.host, port=self.port, context=self.get_context()
-        )
-
-    def get_context(self) -> ssl.SSLContext:
-        try:
-            context = ssl.create_default_context(cadata=self.ca_cert)
-        except ssl.SSLError as e:
-            raise InternalAPIException(e)
-        return context
-
-
 class BasePrivXAPI:
     """
     Base class of PrivXAPI.
@@ -73,6 +51,8 @@ class BasePrivXAPI:
         oauth_client_secret: str,
         re_auth_margin: int = 3,
         use_cookies=False,
+        transport: Optional[Transport] = None,
+        pool_size: int = 0,
     ) -> None:
         self._access_token = ""
         self._oauth_client_id = oauth_client_id
@@ -88,55 +68,75 @@ class BasePrivXAPI:
         self._access_token_age = None
         self._re_auth_margin = re_auth_margin
         self._cookie_jar = RoutingCookieJar() if use_cookies else None
-        self._last_response_headers = {}
+        # per thread, _api_response reads the headers of the response the
+        # same thread received last while other threads share the API object
+        self._response_headers = threading.local()
+        self._hooks = RequestHooks()
+        self._auth_lock = threading.Lock()
+        # pool_size only applies to the default transport
+        self._transport = transport or HTTPSTransport(
+            self._connection_info, pool_size=pool_size
+        )
+
+    def __enter__(self) -> "BasePrivXAPI":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the connections held by the transport.
+        """
+        self._transport.close()
 
     def _authenticate(self, username: str, password: str) -> None:
         # saving the creds for the re-auth purposes
         self._initialize_api_client_credentials(username, password)
-        with Connection(self._connection_info) as conn:
-            token_request = {
-                "grant_type": "password",
-                "username": username,
-                "password": password,
-            }
-            basic_auth = base64.b64encode(
-                "{}:{}".format(self._oauth_client_id, self._oauth_client_secret).encode(
-                    "utf-8"
-                )
+        token_request = {
+            "grant_type": "password",
+            "username": username,
+            "password": password,
+        }
+        basic_auth = base64.b64encode(
+            "{}:{}".format(self._oauth_client_id, self._oauth_client_secret).encode(
+                "utf-8"
             )
+        )
 
-            headers = {
-                "Content-type": "application/x-www-form-urlencoded",
-                "Authorization": "Basic {}".format(basic_auth.decode("utf-8")),
-            }
-            token_url = self._get_url(UrlEnum.AUTH.TOKEN)
-            try:
-                conn.request(
-                    "POST",
-                    token_url,
-                    body=urllib.parse.urlencode(token_request),
-                    headers=headers,
-                )
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            self._store_response_cookies(response, token_url)
-            if response.status != 200:
-                raise InternalAPIException("Invalid response: ", response.status)
-
-            try:
-                data = json.loads(response.read())
-            except (JSONDecodeError, TypeError) as e:
-                raise InternalAPIException(e) from e
-
-            # privx response includes access token age in seconds
-            self._access_token_age = data.get("expires_in")
-            self._re_auth_deadline = (
-                int(time.time()) + self._access_token_age - self._re_auth_margin
-            )
-            self._access_token = data.get("access_token")
-            if self._access_token == "":
-                raise InternalAPIException("Failed to get access token")
+        headers = {
+            "Content-type": "application/x-www-form-urlencoded",
+            "Authorization": "Basic {}".format(basic_auth.decode("utf-8")),
+        }
+        request = dict(
+            method="POST",
+            url=self._get_url(UrlEnum.AUTH.TOKEN),
+            body=urllib.parse.urlencode(token_request),
+            headers=headers,
+        )
+        # hooks see the token request without the password and client secret
+        traced = dict(
+            request,
+            body=REDACTED,
+            headers=dict(headers, Authorization=REDACTED),
+        )
+        response, body = self._send_request(request, traced=traced)
+        if response.status != 200:
+            raise InternalAPIException("Invalid response: ", response.status)
+
+        try:
+            data = json.loads(body)
+        except (JSONDecodeError, TypeError) as e:
+            raise InternalAPIException(e) from e
+
+        # privx response includes access token age in seconds
+        self._access_token_age = data.get("expires_in")
+        self._re_auth_deadline = (
+            int(time.time()) + self._access_token_age - self._re_auth_margin
+        )
+        self._access_token = data.get("access_token")
+        if self._access_token == "":
+            raise InternalAPIException("Failed to get access token")
 
     def _build_request(
         self,
@@ -223,11 +223,11 @@ class BasePrivXAPI:
         return {k.lower(): v for k, v in headers.items()}
 
     def _store_response_headers(self, headers: dict) -> None:
-        self._last_response_headers = dict(headers)
+        self._response_headers.value = dict(headers)
 
     @property
     def last_response_headers(self) -> dict:
-        return dict(self._last_response_headers)
+        return dict(getattr(self._response_headers, "value", {}))
 
     def _api_response(
         self,
@@ -253,45 +253,42 @@ class BasePrivXAPI:
             headers=self.last_response_headers,
         )
 
+    def _http_request(
+        self,
+        method: str,
+        url_name: str,
+        path_params: Optional[dict] = None,
+        query_params: Optional[dict] = None,
+        body: Optional[Union[dict, str, list]] = None,
+        stream: bool = False,
+        auth: bool = True,
+    ) -> Tuple[HTTPResponse, Optional[bytes]]:
+        """
+        Build and send a request, the shared path of every _http_* verb.
+        """
+        request = self._build_request(
+            method,
+            url_name,
+            path_params,
+            query_params,
+            body=body,
+        )
+        if not auth:
+            request["headers"].pop("Authorization", None)
+        return self._send_request(request, stream=stream)
+
     def _http_get(
         self,
         url_name: str,
         path_params: Optional[dict] = None,
         query_params: Optional[dict] = None,
     ) -> Tuple:
-
-        with Connection(self._connection_info) as conn:
-            request = self._build_request(
-                "GET",
-                url_name,
-                path_params,
-                query_params,
-            )
-            try:
-                conn.request(**request)
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            headers = self._collect_headers(response)
-            self._store_response_headers(headers)
-            self._store_response_cookies(response, request["url"])
-            return response.status, response.read()
+        response, data = self._http_request("GET", url_name, path_params, query_params)
+        return response.status, data
 
     def _http_get_no_auth(self, url_name: str) -> Tuple:
-        request = self._build_request("GET", url_name)
-        headers = request["headers"]
-        headers.pop("Authorization", None)
-
-        with Connection(self._connection_info) as conn:
-            try:
-                conn.request(**request)
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            headers = self._collect_headers(response)
-            self._store_response_headers(headers)
-            self._store_response_cookies(response, request["url"])
-            return response.status, response.read()
+        response, data = self._http_request("GET", url_name, auth=False)
+        return response.status, data
 
     def _http_post(
         self,
@@ -300,24 +297,10 @@ class BasePrivXAPI:
         path_params: Optional[dict] = None,
         query_params: Optional[dict] = None,
     ) -> Tuple:
-
-        with Connection(self._connection_info) as conn:
-            request = self._build_request(
-                "POST",
-                url_name,
-                path_params,
-                query_params,
-                body=body,
-            )
-            try:
-                conn.request(**request)
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            headers = self._collect_headers(response)
-            self._store_response_headers(headers)
-            self._store_response_cookies(response, request["url"])
-            return response.status, response.read()
+        response, data = self._http_request(
+            "POST", url_name, path_params, query_params, body=body
+        )
+        return response.status, data
 
     def _http_put(
         self,
@@ -326,24 +309,10 @@ class BasePrivXAPI:
         path_params: Optional[dict] = None,
         query_params: Optional[dict] = None,
     ) -> Tuple:
-
-        with Connection(self._connection_info) as conn:
-            request = self._build_request(
-                "PUT",
-                url_name,
-                path_params,
-                query_params,
-                body=body,
-            )
-            try:
-                conn.request(**request)
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            headers = self._collect_headers(response)
-            self._store_response_headers(headers)
-            self._store_response_cookies(response, request["url"])
-            return response.status, response.read()
+        response, data = self._http_request(
+            "PUT", url_name, path_params, query_params, body=body
+        )
+        return response.status, data
 
     def _http_delete(
         self,
@@ -352,24 +321,10 @@ class BasePrivXAPI:
         path_params: Optional[dict] = None,
         query_params: Optional[dict] = None,
     ) -> Tuple:
-
-        with Connection(self._connection_info) as conn:
-            request = self._build_request(
-                "DELETE",
-                url_name,
-                path_params,
-                query_params,
-                body=body,
-            )
-            try:
-                conn.request(**request)
-            except (OSError, HTTPException) as e:
-                raise InternalAPIException(e)
-            response = conn.getresponse()
-            headers = self._collect_headers(response)
-            self._store_response_headers(headers)
-            self._store_response_cookies(response, request["url"])
-            return response.status, response.read()
+        response, data = self._http_request(
+            "DELETE", url_name, path_params, query_params, body=body
+        )
+        return response.status, data
 
     def _http_stream(
         self,
@@ -378,23 +333,68 @@ class BasePrivXAPI:
         path_params: Optional[dict] = None,
         query_params: Optional[dict] = None,
     ) -> HTTPResponse:
-        conn = Connection(self._connection_info).connect()
-        request = self._build_request(
-            "GET",
-            url_name,
-            path_params,
-            query_params,
-            body=body,
+        response, _ = self._http_request(
+            "GET", url_name, path_params, query_params, body=body, stream=True
         )
+        return response
+
+    def _send_request(
+        self, request: dict, stream: bool = False, traced: Optional[dict] = None
+    ) -> Tuple[HTTPResponse, Optional[bytes]]:
+        """
+        Send a prepared request through the transport and record response
+        metadata. Returns the response and its body, or None as the body
+        when streaming.
+
+        Every verb goes through here, so this is the single place where the
+        lifecycle hooks run. The hooks receive traced instead of the request
+        when given, a copy with credentials removed. With no hooks registered
+        only a truth test of the hook snapshot is added to the request path.
+        """
+        # one snapshot serves every event of this request, so a hook added
+        # by another thread meanwhile does not run halfway through it
+        hooks = self._hooks.active()
+        on_retry = None
+        if hooks:
+            traced = traced or request
+            dispatch_hooks(hooks, HookEnum.BEFORE_REQUEST, traced)
+            on_retry = partial(dispatch_hooks, hooks, HookEnum.ON_RETRY, traced)
+            started = time.perf_counter()
         try:
-            conn.request(**request)
+            if stream:
+                response, data = self._transport.stream(request, on_retry), None
+            else:
+                response, data = self._transport.send(request, on_retry)
         except (OSError, HTTPException) as e:
+            if hooks:
+                dispatch_hooks(hooks, HookEnum.ON_ERROR, traced, e)
             raise InternalAPIException(e)
-        response = conn.getresponse()
         headers = self._collect_headers(response)
         self._store_response_headers(headers)
         self._store_response_cookies(response, request["url"])
-        return response
+        if hooks:
+            dispatch_hooks(
+                hooks,
+                HookEnum.AFTER_RESPONSE,
+                traced,
+                response.status,
+                headers,
+                time.perf_counter() - started,
+            )
+        return response, data
+
+    def add_hook(self, event: str, callback: Callable) -> None:
+        """
+        Register a request lifecycle callback, see HookEnum for the events
+        and the arguments each callback receives.
+        """
+        self._hooks.register(event, callback)
+
+    def remove_hook(self, event: str, callback: Callable) -> None:
+        """
+        Unregister a previously added lifecycle callback.
+        """
+        self._hooks.unregister(event, callback)
 
     def _make_body_params(self, data: Union[dict, str]) -> str:
         return data if isinstance(data, str) else json.dumps(data)
@@ -409,10 +409,16 @@ class BasePrivXAPI:
         if url_name in NO_AUTH_STATUS_URLS and self._re_auth_deadline is None:
             return
 
-        # checking if access token is expired and do re-auth if needed
+        # checking if access token is expired and do re-auth if needed, the lock
+        # keeps threads sharing the instance from authenticating all at once
+        if self._access_token_expired():
+            with self._auth_lock:
+                if self._access_token_expired():
+                    self._authenticate(self._api_client_id, self._api_client_password)
+
+    def _access_token_expired(self) -> bool:
         now = int(time.time())
-        if self._re_auth_deadline is None or now >= self._re_auth_deadline:
-            self._authenticate(self._api_client_id, self._api_client_password)
+        return self._re_auth_deadline is None or now >= self._re_auth_deadline
 
     def _initialize_api_client_credentials(self, username: str, password: str):
         # check if arguments are None or empty string
@@ -0,0 +1,113 @@
+#
+# Batch signing with principal keys.
+#
+# Payloads are read lazily from any iterable and signed by a bounded pool of
+# workers, signatures are yielded in input order. Per-call latency and
+# overall throughput are collected into SigningStats while the batch runs.
+# Latencies are kept as a fixed-size uniform sample of the calls, so memory
+# does not grow with the batch and percentiles are exact up to that size.
+#
+
+import math
+import random
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.response import PrivXAPIResponse
+from privx_api.utils import iter_concurrently
+
+# latencies kept by SigningStats by default
+LATENCY_SAMPLES = 10000
+
+
+class SigningStats:
+    """
+    Throughput and latency of a batch signing run, filled as it progresses.
+    """
+
+    def __init__(self, max_samples: int = LATENCY_SAMPLES) -> None:
+        # sign calls completed, signed successfully and failed
+        self.count = 0
+        self.signed = 0
+        self.failures = 0
+        self.elapsed = 0.0
+        # seconds per sign call, every call while there are at most
+        # max_samples of them and a uniform sample of max_samples afterwards
+        self.latencies: List[float] = []
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+
+    @property
+    def signatures_per_second(self) -> float:
+        return self.signed / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Latency in seconds below which `percent` of the sampled calls
+        completed (nearest rank), 0.0 before any call.
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(latencies)))
+        return latencies[rank - 1]
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.count += 1
+            if ok:
+                self.signed += 1
+            else:
+                self.failures += 1
+            if len(self.latencies) < self._max_samples:
+                self.latencies.append(latency)
+                return
+            # reservoir sampling: every call ends up sampled with equal odds
+            index = random.randrange(self.count)
+            if index < self._max_samples:
+                self.latencies[index] = latency
+
+    def __str__(self) -> str:
+        latency = ", ".join(
+            f"p{p} {self.percentile(p) * 1000:.1f}ms" for p in (50, 95, 99, 100)
+        )
+        return (
+            f"{self.signed} signed ({self.failures} failed) in {self.elapsed:.2f}s "
+            f"({self.signatures_per_second:.1f}/s), latency {latency}"
+        )
+
+
+def sign_batch(
+    sign: Callable[[dict], PrivXAPIResponse],
+    payloads: Iterable[dict],
+    workers: int = 8,
+    window: Optional[int] = None,
+    stats: Optional[SigningStats] = None,
+) -> Iterator[PrivXAPIResponse]:
+    """
+    Yield `sign(payload)` for every payload in input order with up to
+    `workers` calls in flight and at most `window` queued ahead of the
+    consumer (see utils.iter_concurrently).
+    """
+    stats = stats if stats is not None else SigningStats()
+
+    def timed_sign(payload: dict) -> PrivXAPIResponse:
+        start = time.perf_counter()
+        try:
+            response = sign(payload)
+        except InternalAPIException:
+            # iter_concurrently turns it into a status 0 response
+            stats.record(time.perf_counter() - start, False)
+            raise
+        stats.record(time.perf_counter() - start, response.ok)
+        return response
+
+    start = time.perf_counter()
+    try:
+        for response in iter_concurrently(timed_sign, payloads, workers, window):
+            yield response
+            stats.elapsed = time.perf_counter() - start
+    finally:
+        stats.elapsed = time.perf_counter() - start
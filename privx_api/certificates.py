@@ -0,0 +1,194 @@
+#
+# Certificate validity parsing.
+#
+# Only the validity period is read: from OpenSSH certificates by walking the
+# wire format, from X.509 certificates and CRLs with a minimal DER reader,
+# which also lists the revoked serial numbers of a CRL. Signatures are not
+# verified, the data is only as trustworthy as the connection it came over.
+#
+
+import base64
+import re
+import struct
+from datetime import datetime, timezone
+from typing import Any, FrozenSet, Iterator, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+
+SSH_CERT_SUFFIX = "-cert-v01@openssh.com"
+# public key fields between the nonce and the serial, per key type
+SSH_KEY_FIELDS = {
+    "ssh-rsa": 2,
+    "ssh-dss": 4,
+    "ecdsa-sha2-nistp256": 2,
+    "ecdsa-sha2-nistp384": 2,
+    "ecdsa-sha2-nistp521": 2,
+    "ssh-ed25519": 1,
+    "sk-ecdsa-sha2-nistp256@openssh.com": 3,
+    "sk-ssh-ed25519@openssh.com": 2,
+}
+SSH_FOREVER = 2**64 - 1
+PEM_BLOCK = r"-----BEGIN {0}-----(.+?)-----END {0}-----"
+PEM_CERTIFICATE = re.compile(PEM_BLOCK.format("CERTIFICATE"), re.DOTALL)
+PEM_CRL = re.compile(PEM_BLOCK.format("X509 CRL"), re.DOTALL)
+DER_INTEGER = 0x02
+DER_SEQUENCE = 0x30
+DER_EXPLICIT_0 = 0xA0
+DER_UTC_TIME = 0x17
+DER_GENERALIZED_TIME = 0x18
+
+
+def ssh_cert_validity(cert: str) -> Tuple[float, float]:
+    """
+    (valid_after, valid_before) of an OpenSSH certificate line as epoch
+    seconds, valid_before is infinite for certificates valid forever.
+    """
+    try:
+        blob = base64.b64decode(cert.split()[1])
+        offset = 0
+
+        def read(size: int) -> bytes:
+            nonlocal offset
+            if offset + size > len(blob):
+                raise ValueError("truncated certificate")
+            offset += size
+            return blob[offset - size : offset]
+
+        def read_string() -> bytes:
+            return read(struct.unpack(">I", read(4))[0])
+
+        key_type = read_string().decode("ascii")
+        read_string()  # nonce
+        for _ in range(SSH_KEY_FIELDS[key_type[: -len(SSH_CERT_SUFFIX)]]):
+            read_string()
+        read(8 + 4)  # serial, type
+        read_string()  # key id
+        read_string()  # valid principals
+        valid_after, valid_before = struct.unpack(">QQ", read(16))
+    except (IndexError, KeyError, ValueError, struct.error) as e:
+        raise InternalAPIException("Invalid OpenSSH certificate: ", e)
+    if valid_before == SSH_FOREVER:
+        return float(valid_after), float("inf")
+    return float(valid_after), float(valid_before)
+
+
+def _der(data: bytes, offset: int) -> Tuple[int, int, int]:
+    # (tag, content start, content end) of the element at offset
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    if offset + length > len(data):
+        raise ValueError("truncated DER element")
+    return tag, offset, offset + length
+
+
+def _der_time(tag: int, value: bytes) -> float:
+    text = value.decode("ascii")
+    if tag == DER_UTC_TIME:
+        # two digit years 50-99 are 19xx
+        text = ("19" if int(text[:2]) >= 50 else "20") + text
+    elif tag != DER_GENERALIZED_TIME:
+        raise ValueError("not a time")
+    moment = datetime.strptime(text[:14], "%Y%m%d%H%M%S")
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def x509_validity(der: bytes) -> Tuple[float, float]:
+    """
+    (not_before, not_after) of a DER X.509 certificate as epoch seconds.
+    """
+    try:
+        _, start, _ = _der(der, 0)  # Certificate
+        _, position, _ = _der(der, start)  # TBSCertificate
+        tag, _, end = _der(der, position)
+        if tag == DER_EXPLICIT_0:  # version
+            position = end
+        for _ in range(3):  # serial number, signature, issuer
+            position = _der(der, position)[2]
+        tag, start, _ = _der(der, position)  # validity
+        if tag != DER_SEQUENCE:
+            raise ValueError("no validity")
+        tag, start, end = _der(der, start)
+        not_before = _der_time(tag, der[start:end])
+        tag, start, end = _der(der, end)
+        return not_before, _der_time(tag, der[start:end])
+    except (IndexError, ValueError) as e:
+        raise InternalAPIException("Invalid X.509 certificate: ", e)
+
+
+def revocation_list(der: bytes) -> Tuple[float, Optional[float], FrozenSet[int]]:
+    """
+    (this_update, next_update, revoked serial numbers) of a DER X.509 CRL,
+    next_update is None when the CRL has none.
+    """
+    try:
+        _, start, _ = _der(der, 0)  # CertificateList
+        _, position, end = _der(der, start)  # TBSCertList
+        if _der(der, position)[0] == DER_INTEGER:  # version
+            position = _der(der, position)[2]
+        for _ in range(2):  # signature, issuer
+            position = _der(der, position)[2]
+        tag, start, position = _der(der, position)
+        this_update = _der_time(tag, der[start:position])
+        next_update = None
+        if position < end:
+            tag, start, after = _der(der, position)
+            if tag in (DER_UTC_TIME, DER_GENERALIZED_TIME):
+                next_update = _der_time(tag, der[start:after])
+                position = after
+        serials = set()
+        if position < end and der[position] == DER_SEQUENCE:
+            _, entry, entries_end = _der(der, position)
+            while entry < entries_end:
+                _, start, entry = _der(der, entry)
+                _, start, serial_end = _der(der, start)
+                serials.add(int.from_bytes(der[start:serial_end], "big"))
+        return this_update, next_update, frozenset(serials)
+    except (IndexError, ValueError) as e:
+        raise InternalAPIException("Invalid X.509 CRL: ", e)
+
+
+def pem_certificates(text: str) -> Iterator[bytes]:
+    for match in PEM_CERTIFICATE.finditer(text):
+        yield base64.b64decode("".join(match.group(1).split()))
+
+
+def crl_der(data: bytes) -> bytes:
+    """
+    DER of a CRL given in PEM or DER.
+    """
+    if b"-----BEGIN X509 CRL-----" not in data:
+        return data
+    match = PEM_CRL.search(data.decode("ascii", "replace"))
+    if match is None:
+        raise InternalAPIException("Invalid PEM CRL")
+    return base64.b64decode("".join(match.group(1).split()))
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def earliest_expiry(data: Any) -> Optional[float]:
+    """
+    Earliest end of validity of the OpenSSH and PEM certificates found in
+    any string of `data`, None when there are none.
+    """
+    expiries = []
+    for text in _strings(data):
+        for line in text.splitlines():
+            if line.split(" ", 1)[0].endswith(SSH_CERT_SUFFIX):
+                expiries.append(ssh_cert_validity(line)[1])
+        if "-----BEGIN CERTIFICATE-----" in text:
+            expiries.extend(x509_validity(der)[1] for der in pem_certificates(text))
+    return min(expiries) if expiries else None
@@ -0,0 +1,189 @@
+#
+# Account secret checkout pool.
+#
+# Checkouts are keyed by their checkout parameters and shared by all workers
+# until `expiry_margin` seconds before they expire; concurrent requests for
+# the same secret share one checkout call. A worker holds a checkout through
+# a lease, and a background timer releases checkouts nobody has leased for
+# `idle_release` seconds, as well as expired ones. Whatever is still checked
+# out is released on close, by default also at process exit.
+#
+
+import atexit
+import contextlib
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterator, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.expiring_cache import ExpiringCache
+from privx_api.utils import parse_time
+
+
+class _Checkout:
+    __slots__ = ("key", "data", "expires", "leases", "last_used")
+
+    def __init__(self, key: str, data: dict, expires: float) -> None:
+        self.key = key
+        self.data = data
+        self.expires = expires
+        self.leases = 0
+        self.last_used = time.time()
+
+
+class CheckoutPool:
+    """
+    Thread-safe pool of account secret checkouts, see the module comment.
+    """
+
+    def __init__(
+        self,
+        checkout_account_secrets: Callable,
+        release_account_secret_checkout: Callable,
+        expiry_margin: float = 30.0,
+        idle_release: float = 300.0,
+        default_ttl: float = 300.0,
+        release_at_exit: bool = True,
+    ) -> None:
+        self._checkout_account_secrets = checkout_account_secrets
+        self._release_account_secret_checkout = release_account_secret_checkout
+        self._expiry_margin = expiry_margin
+        self._idle_release = idle_release
+        self._default_ttl = default_ttl
+        self._cache = ExpiringCache(self._load)
+        # checkout id -> checkout, everything not yet released
+        self._active: Dict[str, _Checkout] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        self.released = 0
+        self.release_failures = 0
+        self._release_at_exit = release_at_exit
+        if release_at_exit:
+            atexit.register(self.close)
+
+    @property
+    def checkouts(self) -> int:
+        return self._cache.loads
+
+    @property
+    def reused(self) -> int:
+        return self._cache.hits
+
+    @property
+    def reuse_ratio(self) -> float:
+        """
+        Share of leases served by an existing checkout.
+        """
+        total = self.checkouts + self.reused
+        return self.reused / total if total else 0.0
+
+    @contextlib.contextmanager
+    def lease(self, checkout_params: dict) -> Iterator[dict]:
+        """
+        Checkout data as returned by checkout_account_secrets, kept from
+        being released while the block runs.
+        """
+        checkout = self._acquire(json.dumps(checkout_params, sort_keys=True))
+        try:
+            yield checkout.data
+        finally:
+            with self._lock:
+                checkout.leases -= 1
+                checkout.last_used = time.time()
+
+    def release_idle(self) -> None:
+        """
+        Release unleased checkouts that are expired or idle for too long, run
+        by the timer.
+        """
+        now = time.time()
+        with self._lock:
+            idle = [
+                checkout
+                for checkout in self._active.values()
+                if not checkout.leases
+                and (
+                    now >= checkout.expires
+                    or now - checkout.last_used >= self._idle_release
+                )
+            ]
+            self._forget(idle)
+        self._release(idle)
+
+    def close(self) -> None:
+        """
+        Stop the timer and release every checkout, leased or not.
+        """
+        self._stop.set()
+        if self._release_at_exit:
+            atexit.unregister(self.close)
+        with self._lock:
+            checkouts = list(self._active.values())
+            self._forget(checkouts)
+        self._release(checkouts)
+
+    def __enter__(self) -> "CheckoutPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _acquire(self, key: str) -> _Checkout:
+        while True:
+            checkout = self._cache.get(key)
+            with self._lock:
+                # the timer may have released it since the cache returned it
+                if self._active.get(checkout.data["id"]) is checkout:
+                    checkout.leases += 1
+                    checkout.last_used = time.time()
+                    self._start_timer()
+                    return checkout
+
+    def _load(self, key: str) -> Tuple[_Checkout, float, float]:
+        fetched = time.time()
+        response = self._checkout_account_secrets(json.loads(key))
+        if not response.ok:
+            raise InternalAPIException("Failed to checkout secret: ", response.data)
+        items = response.data.get("items")
+        data = items[0] if items else response.data
+        if data.get("expires"):
+            expires = parse_time(data["expires"]).timestamp() - self._expiry_margin
+        else:
+            expires = fetched + self._default_ttl
+        checkout = _Checkout(key, data, expires)
+        with self._lock:
+            self._active[data["id"]] = checkout
+        # a checkout is never renewed ahead of expiry, that would hold two
+        return checkout, expires, float("inf")
+
+    def _forget(self, checkouts) -> None:
+        # with self._lock held
+        for checkout in checkouts:
+            del self._active[checkout.data["id"]]
+            self._cache.discard(checkout.key, checkout)
+
+    def _release(self, checkouts) -> None:
+        for checkout in checkouts:
+            try:
+                response = self._release_account_secret_checkout(checkout.data["id"])
+                ok = response.ok
+            except InternalAPIException:
+                ok = False
+            with self._lock:
+                self.released += ok
+                self.release_failures += not ok
+
+    def _start_timer(self) -> None:
+        # with self._lock held
+        if self._timer is not None or self._stop.is_set():
+            return
+        interval = max(min(self._idle_release / 2, 60.0), 0.01)
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                self.release_idle()
+
+        self._timer = threading.Thread(target=run, daemon=True)
+        self._timer.start()
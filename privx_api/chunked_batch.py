@@ -0,0 +1,195 @@
+#
+# Chunked batch operations.
+#
+# An arbitrarily large iterable is cut into chunks that are submitted
+# concurrently as separate batch calls. A chunk failing with a transient
+# error (a dropped connection, 429 or 5xx) is retried with backoff. A chunk
+# that still fails is split in half and each half is submitted on its own, so
+# only the failing items end up retried and ultimately reported. A chunk
+# rejected as too large or timing out also lowers the chunk size used for the
+# chunks cut after it, which discovers a size the server accepts.
+# Authentication and not found errors and a refused connection fail the whole
+# chunk without splitting. A call that is not idempotent is neither retried
+# nor split after a failure that the server may have applied anyway, in part
+# or whole: a lost connection, a timeout or any 5xx.
+#
+# Results are per chunk: every item is paired with the response of the batch
+# call that finally carried it. Errors the server reports for single items
+# in the body of that response are not parsed.
+#
+
+import json
+import socket
+import threading
+import time
+from http import HTTPStatus
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.response import PrivXAPIResponse
+from privx_api.utils import iter_concurrently
+
+# outcomes of a batch call
+OK = "ok"
+TRANSIENT = "transient"
+OVERSIZE = "oversize"
+REJECTED = "rejected"
+FATAL = "fatal"
+
+TRANSIENT_STATUSES = {
+    0,
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+# failures of the whole operation, splitting the chunk would not help
+FATAL_STATUSES = {HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND}
+# the chunk may be too big for the server
+OVERSIZE_STATUSES = {
+    HTTPStatus.REQUEST_TIMEOUT,
+    HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+class ChunkedBatchReport:
+    """
+    Per-item outcome of a chunked batch, in input order. An item's outcome is
+    the response to its chunk, see the module comment.
+    """
+
+    def __init__(self, chunk_size: int) -> None:
+        # (item, response of the batch call that finally carried it)
+        self.results: List[Tuple[Any, PrivXAPIResponse]] = []
+        self.calls = 0
+        self.retries = 0
+        self.splits = 0
+        # the chunk size in use at the end, lower than requested when the
+        # server rejected bigger ones
+        self.chunk_size = chunk_size
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self) -> List[Any]:
+        return [item for item, response in self.results if response.ok]
+
+    @property
+    def failed(self) -> List[Tuple[Any, PrivXAPIResponse]]:
+        return [(item, response) for item, response in self.results if not response.ok]
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.results) - len(self.failed)} ok, {len(self.failed)} failed "
+            f"in {self.calls} calls ({self.retries} retries, {self.splits} splits, "
+            f"chunk size {self.chunk_size}) in {self.elapsed:.2f}s"
+        )
+
+
+class _ChunkRunner:
+    def __init__(
+        self,
+        call: Callable[[List[Any]], PrivXAPIResponse],
+        report: ChunkedBatchReport,
+        retries: int,
+        backoff: float,
+        idempotent: bool,
+    ) -> None:
+        self._call = call
+        self._report = report
+        self._retries = retries
+        self._backoff = backoff
+        self._idempotent = idempotent
+        self._lock = threading.Lock()
+
+    def chunks(self, items: Iterable[Any]) -> Iterator[List[Any]]:
+        items = iter(items)
+        while True:
+            # read the size per chunk, it shrinks as oversize chunks fail
+            chunk = list(islice(items, self._report.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, chunk: List[Any]) -> List[Tuple[Any, PrivXAPIResponse]]:
+        for attempt in range(self._retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(self._backoff * 2 ** (attempt - 1))
+            self._count("calls")
+            response, error = self._send(chunk)
+            outcome = self._outcome(response, error, chunk)
+            if outcome != TRANSIENT:
+                break
+        if outcome == OVERSIZE:
+            with self._lock:
+                self._report.chunk_size = max(
+                    1, min(self._report.chunk_size, len(chunk) // 2)
+                )
+        if outcome in (OK, FATAL) or len(chunk) == 1:
+            return [(item, response) for item in chunk]
+        self._count("splits")
+        middle = len(chunk) // 2
+        return self.run(chunk[:middle]) + self.run(chunk[middle:])
+
+    def _send(self, chunk: List[Any]) -> Tuple[PrivXAPIResponse, Optional[Exception]]:
+        # a connection error becomes a failed response with status 0, returned
+        # with the error it wraps
+        try:
+            return self._call(chunk), None
+        except InternalAPIException as e:
+            error = e.args[0] if e.args and isinstance(e.args[0], Exception) else None
+            body = json.dumps({"error": str(e)})
+            return PrivXAPIResponse(0, HTTPStatus.OK, body), error
+
+    def _outcome(
+        self, response: PrivXAPIResponse, error: Optional[Exception], chunk: List[Any]
+    ) -> str:
+        if response.ok:
+            return OK
+        if response.status in FATAL_STATUSES or isinstance(
+            error, ConnectionRefusedError
+        ):
+            return FATAL
+        if not self._idempotent and _ambiguous(response.status):
+            return FATAL
+        timeout = isinstance(error, (socket.timeout, TimeoutError))
+        if len(chunk) > 1 and (response.status in OVERSIZE_STATUSES or timeout):
+            return OVERSIZE
+        if response.status in TRANSIENT_STATUSES:
+            return TRANSIENT
+        return REJECTED
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self._report, name, getattr(self._report, name) + 1)
+
+
+def _ambiguous(status: int) -> bool:
+    # the server may have applied the call, or part of it, before failing
+    return status == 0 or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def run_chunked(
+    call: Callable[[List[Any]], PrivXAPIResponse],
+    items: Iterable[Any],
+    chunk_size: int = 100,
+    workers: int = 4,
+    retries: int = 3,
+    backoff: float = 0.5,
+    idempotent: bool = True,
+) -> ChunkedBatchReport:
+    """
+    Submit `items` through `call(chunk)` in chunks of at most `chunk_size`
+    with up to `workers` chunks in flight, see the module comment. Pass
+    idempotent=False when resending a chunk the server already applied has
+    side effects, for example creating items.
+    """
+    report = ChunkedBatchReport(chunk_size)
+    runner = _ChunkRunner(call, report, retries, backoff, idempotent)
+    start = time.perf_counter()
+    for results in iter_concurrently(runner.run, runner.chunks(items), workers):
+        report.results.extend(results)
+    report.elapsed = time.perf_counter() - start
+    return report
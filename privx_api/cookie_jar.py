@@ -42,7 +42,8 @@ class RoutingCookieJar:
         request_path = request_path.split("?", 1)[0] or "/"
         pairs = []
         expired = []
-        for (domain, path, name), meta in self._cookies.items():
+        # iterate over a copy, requests on other threads may store cookies
+        for (domain, path, name), meta in list(self._cookies.items()):
             expires = meta["expires"]
             if expires is not None and expires <= now:
                 expired.append((domain, path, name))
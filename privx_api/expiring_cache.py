@@ -0,0 +1,119 @@
+#
+# Cache of values that expire at a known time.
+#
+# A missing or expired key is loaded once however many threads ask for it at
+# the same time; the others wait for that load and share its result or
+# error. A value past its refresh time is still returned, while a single
+# background load replaces it before it expires.
+#
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+# load(key) -> (value, expires, refresh_at), times are time.time() seconds
+Loader = Callable[[Hashable], Tuple[Any, float, float]]
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "refresh_at")
+
+    def __init__(self, value: Any, expires: float, refresh_at: float) -> None:
+        self.value = value
+        self.expires = expires
+        self.refresh_at = refresh_at
+
+
+class ExpiringCache:
+    """
+    Thread-safe single-flight cache, see the module comment.
+    """
+
+    def __init__(
+        self, load: Loader, on_update: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._load = load
+        # called after every stored load, outside the lock; best effort, its
+        # errors do not fail the read
+        self._on_update = on_update
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, key: Hashable, load: Optional[Loader] = None, refresh: bool = True
+    ) -> Any:
+        """
+        The value of `key`, loaded with `load` (the cache loader by default)
+        when missing or expired. Without `refresh` no background load starts.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires:
+                self.hits += 1
+                if refresh and now >= entry.refresh_at and key not in self._in_flight:
+                    future = self._in_flight[key] = Future()
+                    threading.Thread(
+                        target=self._run, args=(key, future, self._load), daemon=True
+                    ).start()
+                return entry.value
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if owner:
+            self._run(key, future, load or self._load)
+        return future.result()
+
+    def put(self, key: Hashable, value: Any, expires: float, refresh_at: float) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value, expires, refresh_at)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float, float]]:
+        """
+        Snapshot of the unexpired entries as (key, value, expires, refresh_at).
+        """
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, entry in entries:
+            if now < entry.expires:
+                yield key, entry.value, entry.expires, entry.refresh_at
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = lambda key: True):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def discard(self, key: Hashable, value: Any) -> None:
+        """
+        Drop `key` only while `value` is still the cached value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is value:
+                del self._entries[key]
+
+    def _run(self, key: Hashable, future: Future, load: Loader) -> None:
+        try:
+            value, expires, refresh_at = load(key)
+            with self._lock:
+                self._entries[key] = _Entry(value, expires, refresh_at)
+                self.loads += 1
+            future.set_result(value)
+            if self._on_update is not None:
+                self._on_update()
+        except Exception as e:
+            # handed to every reader waiting on this load
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
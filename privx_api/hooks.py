@@ -0,0 +1,85 @@
+#
+# Request lifecycle hooks.
+#
+
+import threading
+from typing import Callable, Mapping
+
+from privx_api.exceptions import InternalAPIException
+
+# stands in for credentials in the requests hooks receive
+REDACTED = "<redacted>"
+
+
+class HookEnum:
+    # callback(request: dict)
+    BEFORE_REQUEST = "before_request"
+    # callback(request: dict, status: int, headers: dict, elapsed: float)
+    AFTER_RESPONSE = "after_response"
+    # callback(request: dict, error: Exception)
+    ON_ERROR = "on_error"
+    # callback(request: dict, attempt: int, error: Exception)
+    ON_RETRY = "on_retry"
+
+    events = (BEFORE_REQUEST, AFTER_RESPONSE, ON_ERROR, ON_RETRY)
+
+
+class RequestHooks:
+    """
+    Registry of callbacks invoked around every HTTP exchange.
+
+    Registering or unregistering replaces the whole event -> callbacks mapping
+    instead of changing it, so the mapping returned by active() is a snapshot
+    a request can use for all of its events while hooks change concurrently.
+    An empty snapshot is falsy, which lets callers skip dispatching entirely.
+    """
+
+    def __init__(self) -> None:
+        # event -> tuple of callbacks, only events with callbacks are present
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._callbacks)
+
+    def active(self) -> Mapping[str, tuple]:
+        """
+        Return the callbacks registered right now, never changed afterwards.
+        """
+        return self._callbacks
+
+    def register(self, event: str, callback: Callable) -> None:
+        self._check_event(event)
+        if not callable(callback):
+            raise InternalAPIException("Hook callback is not callable: ", callback)
+        with self._lock:
+            callbacks = dict(self._callbacks)
+            callbacks[event] = callbacks.get(event, ()) + (callback,)
+            self._callbacks = callbacks
+
+    def unregister(self, event: str, callback: Callable) -> None:
+        self._check_event(event)
+        with self._lock:
+            callbacks = dict(self._callbacks)
+            remaining = tuple(c for c in callbacks.get(event, ()) if c != callback)
+            if remaining:
+                callbacks[event] = remaining
+            else:
+                callbacks.pop(event, None)
+            self._callbacks = callbacks
+
+    def dispatch(self, event: str, *args) -> None:
+        dispatch(self._callbacks, event, *args)
+
+    @staticmethod
+    def _check_event(event: str) -> None:
+        if event not in HookEnum.events:
+            raise InternalAPIException("Unknown hook event: ", event)
+
+
+def dispatch(callbacks: Mapping[str, tuple], event: str, *args) -> None:
+    """
+    Run the callbacks of an active() snapshot registered for the event.
+    """
+    for callback in callbacks.get(event, ()):
+        callback(*args)
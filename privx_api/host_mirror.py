@@ -0,0 +1,349 @@
+#
+# Local mirror of the host store.
+#
+# A full snapshot pages through every host once, later syncs fetch hosts
+# newest `updated` first and stop at the first host that is already mirrored.
+# Deletions are not visible in the updated order, so a sync whose host count
+# disagrees with the server count falls back to a full snapshot. A deletion
+# offset by a create the updated order misses (one that ties with or predates
+# the high water mark) leaves the count unchanged, so a sync also takes a
+# full snapshot once snapshot_interval, an hour by default, has passed since
+# the last one; the time of the last snapshot is persisted. Timestamps are
+# compared as parsed times, the server does not pad fraction digits and the
+# strings do not sort.
+#
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.host_store import HostStoreAPI
+from privx_api.utils import format_time, parse_time
+
+# seconds between full snapshots unless given, see the module comment
+SNAPSHOT_INTERVAL = 3600.0
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS hosts (id TEXT PRIMARY KEY, data TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def host_updated(host: dict) -> str:
+    return host.get("updated") or host.get("created") or ""
+
+
+def updated_time(updated: str) -> Optional[datetime]:
+    return parse_time(updated) if updated else None
+
+
+class HostIndex:
+    """
+    In-memory host lookup tables, keys other than id are case-insensitive.
+    Not thread-safe on its own, HostStoreMirror guards it with a lock.
+    """
+
+    fields = ("address", "common_name", "tag", "principal")
+
+    def __init__(self) -> None:
+        self.hosts: Dict[str, dict] = {}
+        # field -> key -> ids of the hosts having that key
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {f: {} for f in self.fields}
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def put(self, host: dict) -> None:
+        host_id = host["id"]
+        if host_id in self.hosts:
+            self.remove(host_id)
+        self.hosts[host_id] = host
+        for field, keys in self._keys(host):
+            index = self._indexes[field]
+            for key in keys:
+                index.setdefault(key, set()).add(host_id)
+
+    def remove(self, host_id: str) -> None:
+        host = self.hosts.pop(host_id, None)
+        if host is None:
+            return
+        for field, keys in self._keys(host):
+            index = self._indexes[field]
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(host_id)
+                    if not ids:
+                        del index[key]
+
+    def find(self, field: str, key: str) -> List[dict]:
+        ids = self._indexes[field].get(key.lower(), ())
+        return [self.hosts[host_id] for host_id in sorted(ids)]
+
+    @staticmethod
+    def _keys(host: dict) -> Iterable[Tuple[str, Set[str]]]:
+        addresses = set(host.get("addresses") or [])
+        addresses.update(
+            s["address"] for s in host.get("services") or [] if s.get("address")
+        )
+        principals = {p.get("principal") for p in host.get("principals") or []}
+        yield "address", {a.lower() for a in addresses}
+        yield "common_name", {(host.get("common_name") or "").lower()} - {""}
+        yield "tag", {t.lower() for t in host.get("tags") or []}
+        yield "principal", {p.lower() for p in principals if p}
+
+
+class HostStoreMirror:
+    """
+    Host store copy answering lookups from memory, optionally persisted to a
+    SQLite file so that a restart only needs an incremental sync. Every
+    snapshot_interval seconds a sync takes a full snapshot instead, None
+    turns that off.
+
+    Returned host dicts are shared with the mirror and must not be modified.
+    """
+
+    def __init__(
+        self,
+        api: HostStoreAPI,
+        path: Optional[str] = None,
+        page_size: int = 1000,
+        snapshot_interval: Optional[float] = SNAPSHOT_INTERVAL,
+    ) -> None:
+        self._api = api
+        self._page_size = page_size
+        self._snapshot_interval = snapshot_interval
+        self._last_snapshot = None
+        self._index = HostIndex()
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._high_water_mark: Optional[datetime] = None
+        self._db = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners: List[Callable] = []
+        self.last_sync = None
+        self.last_error = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self._load()
+
+    def __enter__(self) -> "HostStoreMirror":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, host_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._index.hosts.get(host_id)
+
+    def by_address(self, address: str) -> List[dict]:
+        return self._find("address", address)
+
+    def by_common_name(self, common_name: str) -> List[dict]:
+        return self._find("common_name", common_name)
+
+    def by_tag(self, tag: str) -> List[dict]:
+        return self._find("tag", tag)
+
+    def by_principal(self, principal: str) -> List[dict]:
+        return self._find("principal", principal)
+
+    def hosts(self) -> List[dict]:
+        with self._lock:
+            return list(self._index.hosts.values())
+
+    def sync(self) -> int:
+        """
+        Bring the mirror up to date, a full snapshot on the first call and an
+        incremental refresh afterwards. Returns the number of hosts fetched.
+        """
+        with self._sync_lock:
+            if self._high_water_mark is None or self._snapshot_due():
+                return self._snapshot()
+            changed, count = self._fetch_changed(self._high_water_mark)
+            with self._lock:
+                for host in changed:
+                    self._index.put(host)
+                self._advance(changed)
+                in_sync = count is None or count == len(self._index)
+            if not in_sync:
+                return len(changed) + self._snapshot()
+            self._persist(changed, replace=False)
+            self.last_sync = time.time()
+            if changed:
+                self._notify(changed, full=False)
+            return len(changed)
+
+    def snapshot(self) -> int:
+        """
+        Replace the mirror with a full copy of the host store.
+        """
+        with self._sync_lock:
+            return self._snapshot()
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Call `callback(hosts, full)` after every sync that changed the mirror.
+        With full=True `hosts` is the complete new host list, otherwise only
+        the created or updated hosts.
+        """
+        self._listeners.append(callback)
+
+    def start(self, interval: float) -> None:
+        """
+        Sync every `interval` seconds on a daemon thread. Failed syncs are kept
+        in last_error and retried on the next round.
+        """
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="host-store-mirror", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        if self._db:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+    def _find(self, field: str, key: str) -> List[dict]:
+        with self._lock:
+            return self._index.find(field, key)
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sync()
+                self.last_error = None
+            except InternalAPIException as e:
+                self.last_error = e
+
+    def _snapshot_due(self) -> bool:
+        if self._snapshot_interval is None:
+            return False
+        if self._last_snapshot is None:
+            return True
+        return time.time() - self._last_snapshot >= self._snapshot_interval
+
+    def _snapshot(self) -> int:
+        index = HostIndex()
+        hosts = [host for items, _ in self._pages() for host in items]
+        for host in hosts:
+            index.put(host)
+        with self._lock:
+            self._index = index
+            self._high_water_mark = None
+            self._advance(hosts)
+        self._last_snapshot = time.time()
+        self._persist(hosts, replace=True)
+        self.last_sync = self._last_snapshot
+        self._notify(hosts, full=True)
+        return len(hosts)
+
+    def _notify(self, hosts: List[dict], full: bool) -> None:
+        for callback in self._listeners:
+            callback(hosts, full)
+
+    def _pages(
+        self, sort_key: Optional[str] = None, sort_dir: Optional[str] = None
+    ) -> Iterator[Tuple[List[dict], Optional[int]]]:
+        # yields every page with the total host count reported by the server;
+        # the server may cap the limit, so a short page only ends the listing
+        # when there is no count
+        offset = 0
+        while True:
+            response = self._api.get_hosts(
+                offset=offset,
+                limit=self._page_size,
+                sort_key=sort_key,
+                sort_dir=sort_dir,
+            )
+            if not response.ok:
+                raise InternalAPIException("Failed to fetch hosts: ", response.data)
+            items = response.data.get("items") or []
+            count = response.data.get("count")
+            yield items, count
+            offset += len(items)
+            if not items or (
+                offset >= count if count is not None else len(items) < self._page_size
+            ):
+                return
+
+    def _fetch_changed(self, since: datetime) -> Tuple[List[dict], Optional[int]]:
+        # stop at the first host older than `since` or already mirrored with
+        # that same timestamp, a create sorted after such a tie is caught by
+        # the count check in sync
+        changed, count = [], None
+        for items, count in self._pages(sort_key="updated", sort_dir="desc"):
+            for host in items:
+                updated = host_updated(host)
+                time_updated = updated_time(updated)
+                if time_updated is None or time_updated < since:
+                    return changed, count
+                if time_updated == since and self._is_mirrored(host["id"], updated):
+                    return changed, count
+                changed.append(host)
+        return changed, count
+
+    def _is_mirrored(self, host_id: str, updated: str) -> bool:
+        with self._lock:
+            local = self._index.hosts.get(host_id)
+        return local is not None and host_updated(local) == updated
+
+    def _advance(self, hosts: List[dict]) -> None:
+        times = [updated_time(host_updated(h)) for h in hosts]
+        if self._high_water_mark is not None:
+            times.append(self._high_water_mark)
+        self._high_water_mark = max(filter(None, times), default=None)
+
+    def _persist(self, hosts: List[dict], replace: bool) -> None:
+        if not self._db:
+            return
+        rows = [(h["id"], json.dumps(h, separators=(",", ":"))) for h in hosts]
+        with self._lock, self._db:
+            if replace:
+                self._db.execute("DELETE FROM hosts")
+            self._db.executemany("INSERT OR REPLACE INTO hosts VALUES (?, ?)", rows)
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('high_water_mark', ?)",
+                (format_time(self._high_water_mark) if self._high_water_mark else "",),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_snapshot', ?)",
+                (str(self._last_snapshot or ""),),
+            )
+
+    def _load(self) -> None:
+        index = HostIndex()
+        for (data,) in self._db.execute("SELECT data FROM hosts"):
+            index.put(json.loads(data))
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        high_water_mark = meta.get("high_water_mark")
+        last_snapshot = meta.get("last_snapshot")
+        with self._lock:
+            self._index = index
+            self._high_water_mark = (
+                parse_time(high_water_mark) if high_water_mark and len(index) else None
+            )
+            self._last_snapshot = float(last_snapshot) if last_snapshot else None
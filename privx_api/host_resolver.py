@@ -0,0 +1,215 @@
+#
+# Client-side equivalent of HostStoreAPI.resolve_host.
+#
+# Hosts come from a HostStoreMirror and are indexed by exact address, by
+# service + address (+ port), by CIDR network and by wildcard host name.
+# A service with a port only matches queries for that port or without one.
+# Lookups that find no host or more than one fall back to the server.
+#
+
+import fnmatch
+import ipaddress
+import re
+import socket
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from privx_api.host_mirror import HostStoreMirror
+from privx_api.host_store import HostStoreAPI
+
+IPNetwork = Tuple[int, int, int]  # ip version, prefix length, network address
+
+
+def _parse_ip(address: str) -> Optional[Tuple[int, int]]:
+    # inet_pton is several times faster than ipaddress.ip_address
+    for family, version in ((socket.AF_INET, 4), (socket.AF_INET6, 6)):
+        try:
+            return version, int.from_bytes(socket.inet_pton(family, address), "big")
+        except OSError:
+            continue
+    return None
+
+
+def _parse_network(address: str) -> Optional[IPNetwork]:
+    try:
+        network = ipaddress.ip_network(address, strict=False)
+    except ValueError:
+        return None
+    return network.version, network.prefixlen, int(network.network_address)
+
+
+class ResolveIndex:
+    """
+    Address lookup tables for a set of hosts. Not thread-safe on its own,
+    HostResolver guards it with a lock.
+    """
+
+    def __init__(self) -> None:
+        self.hosts: Dict[str, dict] = {}
+        # table -> key -> host ids, tables are "address", "service",
+        # "service_port", "service_any_port", "network", "wildcard" and
+        # "pattern"
+        self._tables: Dict[str, Dict[tuple, Set[str]]] = {}
+        # host id -> (table, key) entries of the host, for removal
+        self._entries: Dict[str, List[Tuple[str, tuple]]] = {}
+        # ip version -> prefix lengths present in the network table, longest first
+        self._prefixes: Dict[int, List[int]] = {}
+        self._patterns: Dict[str, re.Pattern] = {}
+
+    def put(self, host: dict) -> None:
+        host_id = host["id"]
+        self.remove(host_id)
+        self.hosts[host_id] = host
+        entries = self._entries[host_id] = list(self._host_entries(host))
+        for table, key in entries:
+            self._tables.setdefault(table, {}).setdefault(key, set()).add(host_id)
+            if table == "network" and key[1] not in self._prefixes.get(key[0], ()):
+                prefixes = self._prefixes.setdefault(key[0], [])
+                prefixes.append(key[1])
+                prefixes.sort(reverse=True)
+            elif table == "pattern" and key[0] not in self._patterns:
+                self._patterns[key[0]] = re.compile(fnmatch.translate(key[0]))
+
+    def remove(self, host_id: str) -> None:
+        if self.hosts.pop(host_id, None) is None:
+            return
+        for table, key in self._entries.pop(host_id):
+            ids = self._tables[table][key]
+            ids.discard(host_id)
+            if not ids:
+                del self._tables[table][key]
+
+    def lookup(self, address: str, service: str = "", port: int = 0) -> Set[str]:
+        """
+        Ids of the hosts matching, most specific match first: service and
+        port, service, exact address, longest CIDR prefix, wildcard name.
+        A service address known only with other ports is a miss.
+        """
+        address = address.lower()
+        service = service.upper()
+        if service and port:
+            ids = self._get("service_port", (service, address, port))
+            if ids:
+                return ids
+            ids = self._get("service_any_port", (service, address))
+            if ids or self._get("service", (service, address)):
+                return ids
+        if service:
+            ids = self._get("service", (service, address))
+            if ids:
+                return ids
+        ids = self._get("address", (address,))
+        if ids:
+            return ids
+        ip = _parse_ip(address)
+        if ip:
+            return self._lookup_network(*ip)
+        return self._lookup_name(address)
+
+    def _get(self, table: str, key: tuple) -> Set[str]:
+        return self._tables.get(table, {}).get(key, set())
+
+    def _lookup_network(self, version: int, ip: int) -> Set[str]:
+        bits = 32 if version == 4 else 128
+        for prefix in self._prefixes.get(version, ()):
+            mask = ((1 << prefix) - 1) << (bits - prefix)
+            ids = self._get("network", (version, prefix, ip & mask))
+            if ids:
+                return ids
+        return set()
+
+    def _lookup_name(self, name: str) -> Set[str]:
+        labels = name.split(".")
+        for i in range(1, len(labels)):
+            ids = self._get("wildcard", (".".join(labels[i:]),))
+            if ids:
+                return ids
+        for pattern, regex in self._patterns.items():
+            if regex.match(name):
+                ids = self._get("pattern", (pattern,))
+                if ids:
+                    return ids
+        return set()
+
+    @staticmethod
+    def _host_entries(host: dict):
+        addresses = set(host.get("addresses") or [])
+        for service in host.get("services") or []:
+            address = (service.get("address") or "").lower()
+            if not address:
+                continue
+            addresses.add(address)
+            name = (service.get("service") or "").upper()
+            yield "service", (name, address)
+            if service.get("port"):
+                yield "service_port", (name, address, int(service["port"]))
+            else:
+                yield "service_any_port", (name, address)
+        for address in {a.lower() for a in addresses}:
+            if "/" in address:
+                network = _parse_network(address)
+                if network:
+                    yield "network", network
+            elif address.startswith("*.") and "*" not in address[2:]:
+                yield "wildcard", (address[2:],)
+            elif "*" in address or "?" in address:
+                yield "pattern", (address,)
+            else:
+                yield "address", (address,)
+
+
+class HostResolver:
+    """
+    Answers resolve_host queries from the hosts of a HostStoreMirror and
+    follows the mirror as it syncs.
+
+    resolve() takes the same service address dict as resolve_host, for
+    example {"service": "SSH", "address": "10.0.0.5", "port": 22}, and returns
+    the host dict or None. Misses and ambiguous matches are sent to the
+    server; set fallback=False to answer only from the local index. A
+    resolver can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        api: HostStoreAPI,
+        mirror: HostStoreMirror,
+        fallback: bool = True,
+    ) -> None:
+        self._api = api
+        self._fallback = fallback
+        self._lock = threading.Lock()
+        self._index = ResolveIndex()
+        self.hits = 0
+        self.misses = 0
+        self._update(mirror.hosts(), full=True)
+        mirror.subscribe(self._update)
+
+    def resolve(self, service_address: dict) -> Optional[dict]:
+        service = service_address.get("service") or ""
+        port = int(service_address.get("port") or 0)
+        with self._lock:
+            ids = self._index.lookup(service_address["address"], service, port)
+            host = self._index.hosts[next(iter(ids))] if len(ids) == 1 else None
+            if host is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if host is not None:
+            return host
+        if not self._fallback:
+            return None
+        response = self._api.resolve_host(service_address)
+        return response.data if response.ok else None
+
+    def _update(self, hosts: List[dict], full: bool) -> None:
+        if full:
+            index = ResolveIndex()
+            for host in hosts:
+                index.put(host)
+            with self._lock:
+                self._index = index
+            return
+        with self._lock:
+            for host in hosts:
+                self._index.put(host)
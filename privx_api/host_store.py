@@ -1,6 +1,7 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterable, Optional
 
+from privx_api import host_sync
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
@@ -85,6 +86,38 @@ class HostStoreAPI(BasePrivXAPI):
         response_status, data = self._http_post(UrlEnum.HOST_STORE.HOSTS, body=host)
         return self._api_response(response_status, HTTPStatus.CREATED, data)
 
+    def sync_hosts(
+        self,
+        hosts: Iterable[dict],
+        prune: bool = False,
+        dry_run: bool = False,
+        workers: int = 8,
+        current: Optional[Iterable[dict]] = None,
+    ) -> host_sync.HostSyncReport:
+        """
+        Make the host store match `hosts`. A host is matched to an existing
+        one by external_id, address or common name and updated only when its
+        given fields differ; with `prune` existing hosts that match nothing
+        are deleted. Pass `current`, for example from a HostStoreMirror, to
+        skip fetching the host store; a fetched listing that does not match
+        the host count raises InternalAPIException before any call is made.
+        With `dry_run` the report counts the calls without making them.
+
+        Returns:
+            HostSyncReport
+        """
+        if current is None:
+            current = host_sync.fetch_hosts(self.get_hosts, 1000, workers)
+        plan = host_sync.diff_hosts(hosts, current, prune=prune)
+        return host_sync.apply_plan(
+            plan,
+            self.create_host,
+            self.update_host,
+            self.delete_host,
+            workers=workers,
+            dry_run=dry_run,
+        )
+
     def resolve_host(self, host_resolve_params: dict) -> PrivXAPIResponse:
         """
         Resolve service+address to a single host in host store.
@@ -0,0 +1,242 @@
+#
+# Host store synchronisation.
+#
+# The desired hosts are diffed against the current host store content: a
+# desired host is matched to a current one by external_id, then by address,
+# then by common name. Only hosts whose desired fields differ are updated and
+# current hosts without a match are deleted only when pruning. The resulting
+# create/update/delete calls are applied concurrently.
+#
+
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.response import PrivXAPIResponse
+from privx_api.utils import fetch_all_items
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+UNCHANGED = "unchanged"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+OPERATIONS = {CREATED: "create", UPDATED: "update", DELETED: "delete"}
+# fields the host store accepts but never returns, they cannot be compared
+WRITE_ONLY_FIELDS = {"passphrase"}
+
+
+class HostSyncPlan:
+    """
+    Host store calls needed to reach the desired hosts.
+    """
+
+    def __init__(self) -> None:
+        self.creates: List[dict] = []
+        # (host id, full host body to PUT)
+        self.updates: List[Tuple[str, dict]] = []
+        self.deletes: List[str] = []
+        self.unchanged = 0
+        # desired hosts matching a current host already claimed by another one
+        self.duplicates: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+
+class HostSyncReport:
+    """
+    Outcome of a host sync, counts by status plus the failed calls.
+    """
+
+    def __init__(self, plan: HostSyncPlan, dry_run: bool) -> None:
+        self.plan = plan
+        self.dry_run = dry_run
+        self.counts = Counter()
+        self.failures: List[dict] = []
+        self.elapsed = 0.0
+
+    @property
+    def operations_per_second(self) -> float:
+        done = sum(self.counts[s] for s in (CREATED, UPDATED, DELETED, FAILED))
+        return done / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        counts = ", ".join(f"{s}: {n}" for s, n in sorted(self.counts.items()))
+        prefix = "dry run, " if self.dry_run else ""
+        return (
+            f"{prefix}{counts or 'nothing to do'} in {self.elapsed:.2f}s "
+            f"({self.operations_per_second:.1f} ops/s)"
+        )
+
+
+def diff_hosts(
+    desired: Iterable[dict], current: Iterable[dict], prune: bool = False
+) -> HostSyncPlan:
+    """
+    Plan the calls that turn `current` hosts into `desired` ones.
+    """
+    plan = HostSyncPlan()
+    current = {host["id"]: host for host in current}
+    indexes = _match_indexes(current.values())
+    claimed = set()
+    for host in desired:
+        match = _match(host, indexes)
+        if match is None:
+            plan.creates.append(host)
+        elif match["id"] in claimed:
+            plan.duplicates.append(host)
+        else:
+            claimed.add(match["id"])
+            if _changed(match, host):
+                plan.updates.append((match["id"], dict(match, **host)))
+            else:
+                plan.unchanged += 1
+    if prune:
+        plan.deletes = sorted(set(current) - claimed)
+    return plan
+
+
+def _match_keys(host: dict) -> Iterable[Tuple[str, str]]:
+    # match keys in priority order
+    if host.get("external_id"):
+        yield "external_id", host["external_id"]
+    for address in host.get("addresses") or []:
+        yield "address", address.lower()
+    if host.get("common_name"):
+        yield "common_name", host["common_name"].lower()
+
+
+def _match_indexes(hosts: Iterable[dict]) -> Dict[Tuple[str, str], dict]:
+    indexes = {}
+    for host in sorted(hosts, key=lambda h: h["id"]):
+        for key in _match_keys(host):
+            indexes.setdefault(key, host)
+    return indexes
+
+
+def _match(host: dict, indexes: Dict[Tuple[str, str], dict]) -> Optional[dict]:
+    for key in _match_keys(host):
+        if key in indexes:
+            return indexes[key]
+    return None
+
+
+def _changed(current: dict, desired: dict) -> bool:
+    return any(
+        _canonical(current.get(field), value) != _canonical(value, value)
+        for field, value in desired.items()
+        if field not in WRITE_ONLY_FIELDS
+    )
+
+
+def _canonical(value: Any, shape: Any) -> Any:
+    # `value` reduced to the fields present in the desired `shape`, so that
+    # server-added fields do not count as changes; lists compare as multisets
+    if isinstance(shape, dict):
+        value = value if isinstance(value, dict) else {}
+        return {
+            k: _canonical(value.get(k), v)
+            for k, v in shape.items()
+            if k not in WRITE_ONLY_FIELDS
+        }
+    if isinstance(shape, list):
+        if not isinstance(value, list):
+            return value
+        item_shape = {}
+        for item in shape:
+            if isinstance(item, dict):
+                item_shape.update(item)
+        return sorted(
+            json.dumps(
+                _canonical(v, item_shape) if item_shape else v,
+                sort_keys=True,
+                default=str,
+            )
+            for v in value
+        )
+    return value
+
+
+def apply_plan(
+    plan: HostSyncPlan,
+    create_host: Callable,
+    update_host: Callable,
+    delete_host: Callable,
+    workers: int = 8,
+    dry_run: bool = False,
+) -> HostSyncReport:
+    """
+    Run the planned calls with up to `workers` in flight, see
+    HostStoreAPI.sync_hosts.
+    """
+    report = HostSyncReport(plan, dry_run)
+    report.counts[UNCHANGED] = plan.unchanged
+    report.counts[DUPLICATE] = len(plan.duplicates)
+    calls = [(CREATED, create_host, (host,)) for host in plan.creates]
+    calls.extend((UPDATED, update_host, args) for args in plan.updates)
+    calls.extend((DELETED, delete_host, (host_id,)) for host_id in plan.deletes)
+    if dry_run:
+        report.counts.update(status for status, _, _ in calls)
+        return report
+    lock = threading.Lock()
+
+    def call(status: str, func: Callable, args: tuple) -> None:
+        try:
+            response = func(*args)
+            error = None if response.ok else response.data
+        except InternalAPIException as e:
+            error = str(e)
+        with lock:
+            if error is None:
+                report.counts[status] += 1
+            else:
+                report.counts[FAILED] += 1
+                report.failures.append(_failure(status, args, error))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(lambda c: call(*c), calls):
+            pass
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _failure(status: str, args: tuple, error: Any) -> dict:
+    host = args[-1] if isinstance(args[-1], dict) else {}
+    host_id = args[0] if isinstance(args[0], str) else None
+    return {
+        "operation": OPERATIONS[status],
+        "host_id": host_id,
+        "common_name": host.get("common_name"),
+        "error": error,
+    }
+
+
+def fetch_hosts(get_hosts: Callable, page_size: int, workers: int) -> List[dict]:
+    """
+    Every host of the host store. A sync acting on a partial listing would
+    create duplicates and, when pruning, delete hosts, so the listing must
+    match the count the host store reported, the same on every page.
+    """
+    counts = set()
+
+    def fetch(offset: int, limit: int) -> PrivXAPIResponse:
+        response = get_hosts(offset=offset, limit=limit)
+        if response.ok:
+            counts.add(response.data.get("count"))
+        return response
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hosts = fetch_all_items(fetch, page_size, executor)
+    if counts != {len(hosts)}:
+        raise InternalAPIException(
+            "Incomplete host listing, refusing to sync: ",
+            {"fetched": len(hosts), "counts": sorted(counts, key=str)},
+        )
+    return hosts
@@ -1,6 +1,7 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import List, Optional
 
+from privx_api import audit_export, audit_follow
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
@@ -101,6 +102,73 @@ class MonitorServiceAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def follow_audit_events(
+        self,
+        checkpoint_path: Optional[str] = None,
+        audit_event_params: Optional[dict] = None,
+        start_time: Optional[str] = None,
+        page_size: int = 1000,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        overlap: float = 60.0,
+    ) -> audit_follow.AuditEventFollower:
+        """
+        Follow audit events as they arrive, iterate the returned follower and
+        call its stop() to end. Polls search from a time high-water mark, events
+        are deduplicated by id and the cursor is saved to checkpoint_path so
+        that a restart resumes where the previous run stopped. Without a
+        checkpoint, events from start_time on are read (all when None).
+
+        Returns:
+            AuditEventFollower
+        """
+        return audit_follow.AuditEventFollower(
+            self.search_audit_events,
+            checkpoint_path=checkpoint_path,
+            params=audit_event_params,
+            start_time=start_time,
+            page_size=page_size,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            overlap=overlap,
+        )
+
+    def export_audit_events(
+        self,
+        directory: str,
+        audit_event_params: Optional[dict] = None,
+        file_format: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        workers: int = 4,
+        page_size: int = 1000,
+        batch_size: int = 50000,
+        rows_per_file: int = 1000000,
+    ) -> audit_export.AuditExportReport:
+        """
+        Export the matching audit events, oldest first, to rotating files in
+        directory. file_format is "parquet" or "arrow" (both need pyarrow) or
+        "csv" for gzipped CSV, by default parquet when pyarrow is installed.
+        Pages are fetched by up to `workers` in parallel and written in
+        batches of batch_size events, so memory does not grow with the number
+        of events, and files are rotated after rows_per_file rows. columns
+        defaults to the fields of the first batch, other fields are kept as
+        JSON in an "extra" column ("_extra" if the events have an extra field).
+
+        Returns:
+            AuditExportReport
+        """
+        return audit_export.export_audit_events(
+            self.search_audit_events,
+            directory,
+            params=audit_event_params,
+            workers=workers,
+            page_size=page_size,
+            file_format=file_format,
+            columns=columns,
+            batch_size=batch_size,
+            rows_per_file=rows_per_file,
+        )
+
     def get_audit_event_codes(self) -> PrivXAPIResponse:
         """
         Get audit event codes.
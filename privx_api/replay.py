@@ -0,0 +1,365 @@
+#
+# Record and replay of HTTP exchanges.
+#
+# Recording wraps the API's transport and writes every exchange
+# (request line, headers, cookies, body chunks and their timings) as one JSON
+# line. Paths ending with ".gz" are gzip compressed. Replay serves the recorded
+# responses from memory, either at full speed or with the recorded latencies.
+#
+# Authorization headers, the token request body and issued access tokens are
+# never written. Response bodies are stored as received, so recordings of
+# secret-bearing endpoints must be protected like the secrets themselves.
+#
+
+import base64
+import gzip
+import http.client
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from privx_api.base import BasePrivXAPI
+from privx_api.enums import UrlEnum
+from privx_api.exceptions import InternalAPIException
+from privx_api.transport import Transport
+
+REDACTED_HEADERS = {"authorization"}
+REDACTED_TOKEN = "recorded-access-token"
+
+
+def _open(path: str, mode: str) -> IO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _encode_body(data: bytes) -> Tuple[str, Optional[str]]:
+    try:
+        return data.decode("utf-8"), None
+    except UnicodeDecodeError:
+        return base64.b64encode(data).decode("ascii"), "base64"
+
+
+def _decode_body(body: str, encoding: Optional[str]) -> bytes:
+    if encoding == "base64":
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+class ExchangeWriter:
+    """
+    Thread-safe append-only writer of recorded exchanges.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def write(self, exchange: dict) -> None:
+        line = json.dumps(exchange, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class _RecordingResponse:
+    """
+    Proxy of HTTPResponse that captures the body as the caller reads it.
+    """
+
+    def __init__(
+        self, response: http.client.HTTPResponse, exchange: dict, writer, started
+    ) -> None:
+        self._response = response
+        self._exchange = exchange
+        self._writer = writer
+        self._started = started
+        self._chunks = []
+        self._done = False
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.msg = response.msg
+
+    def getheader(self, name: str, default=None):
+        return self._response.getheader(name, default)
+
+    def getheaders(self) -> list:
+        return self._response.getheaders()
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        data = self._response.read(amt)
+        if data:
+            self._chunks.append((time.monotonic() - self._started, data))
+        if amt is None or amt < 0 or not data:
+            self._finish()
+        return data
+
+    def close(self) -> None:
+        self._finish()
+        self._response.close()
+
+    def _finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        body, encoding = _encode_body(b"".join(data for _, data in self._chunks))
+        if self._exchange["url_name"] == UrlEnum.AUTH.TOKEN:
+            body = self._redact_token(body)
+        self._exchange.update(
+            body=body,
+            encoding=encoding,
+            chunks=[[round(t, 6), len(data)] for t, data in self._chunks],
+        )
+        del self._exchange["url_name"]
+        self._writer.write(self._exchange)
+
+    @staticmethod
+    def _redact_token(body: str) -> str:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+        if isinstance(data, dict) and "access_token" in data:
+            data["access_token"] = REDACTED_TOKEN
+        return json.dumps(data)
+
+
+class RecordingTransport(Transport):
+    """
+    Transport that records every exchange sent through the wrapped transport.
+    """
+
+    def __init__(self, transport: Transport, writer: ExchangeWriter) -> None:
+        self._transport = transport
+        self._writer = writer
+
+    def send(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> Tuple[http.client.HTTPResponse, bytes]:
+        started = time.monotonic()
+        response, body = self._transport.send(request, on_retry)
+        recorded = _RecordingResponse(
+            _BufferedResponse(response, body),
+            self._exchange(request, response, started),
+            self._writer,
+            started,
+        )
+        recorded.read()
+        return response, body
+
+    def stream(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> _RecordingResponse:
+        started = time.monotonic()
+        response = self._transport.stream(request, on_retry)
+        return _RecordingResponse(
+            response, self._exchange(request, response, started), self._writer, started
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def _exchange(
+        self, request: dict, response: http.client.HTTPResponse, started: float
+    ) -> dict:
+        url = request["url"]
+        body = request.get("body")
+        is_token = url.split("?", 1)[0] == UrlEnum.get(UrlEnum.AUTH.TOKEN)
+        return {
+            "offset": round(started - self._writer.started, 6),
+            "method": request["method"],
+            "url": url,
+            "url_name": UrlEnum.AUTH.TOKEN if is_token else None,
+            "request_headers": [
+                [k, v]
+                for k, v in request.get("headers", {}).items()
+                if k.lower() not in REDACTED_HEADERS
+            ],
+            "request_body": None if is_token or body is None else body,
+            "status": response.status,
+            "reason": response.reason,
+            "elapsed": round(time.monotonic() - started, 6),
+            "headers": [[k, v] for k, v in response.getheaders()],
+        }
+
+
+class _BufferedResponse:
+    """
+    Already read response body offered through read(), for recording sends.
+    """
+
+    def __init__(self, response: http.client.HTTPResponse, body: bytes) -> None:
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = self.msg = response.headers
+        self._body = body
+
+    def getheader(self, name: str, default=None):
+        return self.headers.get(name, default)
+
+    def getheaders(self) -> list:
+        return list(self.headers.items())
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        body, self._body = self._body, b""
+        return body
+
+    def close(self) -> None:
+        return None
+
+
+class ReplayedResponse:
+    """
+    In-memory stand-in for HTTPResponse built from a recorded exchange.
+    """
+
+    def __init__(self, exchange: dict, original_timing: bool) -> None:
+        self.status = exchange["status"]
+        self.reason = exchange.get("reason", "")
+        self.headers = http.client.HTTPMessage()
+        for key, value in exchange.get("headers", []):
+            self.headers[key] = value
+        self.msg = self.headers
+        self._body = _decode_body(exchange.get("body", ""), exchange.get("encoding"))
+        self._chunks = exchange.get("chunks") or []
+        self._position = 0
+        self._original_timing = original_timing
+        self._started = time.monotonic()
+        if original_timing:
+            time.sleep(exchange.get("elapsed", 0))
+
+    def getheader(self, name: str, default=None):
+        return self.headers.get(name, default)
+
+    def getheaders(self) -> list:
+        return list(self.headers.items())
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None or amt < 0:
+            end = len(self._body)
+        else:
+            end = min(self._position + amt, len(self._body))
+        if self._original_timing:
+            self._wait_for(end)
+        data = self._body[self._position : end]
+        self._position = end
+        return data
+
+    def close(self) -> None:
+        self._position = len(self._body)
+
+    def _wait_for(self, end: int) -> None:
+        # sleep until the recorded time at which byte `end` had arrived
+        received = 0
+        for offset, size in self._chunks:
+            received += size
+            if received >= end:
+                delay = offset - (time.monotonic() - self._started)
+                if delay > 0:
+                    time.sleep(delay)
+                return
+
+
+class ExchangePlayer:
+    """
+    Recorded exchanges indexed by request, served first-in first-out.
+
+    Requests are matched on method, URL and body, falling back to method and
+    URL alone, so concurrent callers receive the responses recorded for their
+    own requests regardless of the interleaving.
+    """
+
+    def __init__(self, exchanges: List[dict], original_timing: bool = False) -> None:
+        self.original_timing = original_timing
+        self._lock = threading.Lock()
+        self._by_body = {}
+        self._by_url = {}
+        for exchange in exchanges:
+            key = (exchange["method"], exchange["url"])
+            entry = [exchange, False]
+            self._by_url.setdefault(key, deque()).append(entry)
+            body_key = key + (exchange.get("request_body"),)
+            self._by_body.setdefault(body_key, deque()).append(entry)
+
+    @classmethod
+    def load(cls, path: str, original_timing: bool = False) -> "ExchangePlayer":
+        with _open(path, "r") as f:
+            exchanges = [json.loads(line) for line in f if line.strip()]
+        return cls(exchanges, original_timing)
+
+    def take(self, method: str, url: str, body) -> dict:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        with self._lock:
+            for key in ((method, url, body), (method, url)):
+                queue = (self._by_body if len(key) == 3 else self._by_url).get(key)
+                while queue:
+                    entry = queue.popleft()
+                    if not entry[1]:
+                        entry[1] = True
+                        return entry[0]
+        raise InternalAPIException("No recorded exchange for: ", method, url)
+
+
+class ReplayTransport(Transport):
+    """
+    Transport that answers from an ExchangePlayer instead of the network.
+    """
+
+    def __init__(self, player: ExchangePlayer) -> None:
+        self._player = player
+
+    def send(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> Tuple[ReplayedResponse, bytes]:
+        response = self.stream(request, on_retry)
+        return response, response.read()
+
+    def stream(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> ReplayedResponse:
+        exchange = self._player.take(
+            request["method"], request["url"], request.get("body")
+        )
+        return ReplayedResponse(exchange, self._player.original_timing)
+
+
+@contextmanager
+def record_exchanges(api: BasePrivXAPI, path: str) -> Iterator[ExchangeWriter]:
+    """
+    Record every exchange `api` makes inside the block to `path`.
+    """
+    writer = ExchangeWriter(path)
+    previous = api._transport
+    api._transport = RecordingTransport(previous, writer)
+    try:
+        yield writer
+    finally:
+        api._transport = previous
+        writer.close()
+
+
+@contextmanager
+def replay_exchanges(
+    api: BasePrivXAPI, path: str, original_timing: bool = False
+) -> Iterator[ExchangePlayer]:
+    """
+    Answer every request `api` makes inside the block from the recording at
+    `path`. With original_timing the recorded latencies are reproduced,
+    otherwise responses are served as fast as they are read.
+    """
+    player = ExchangePlayer.load(path, original_timing)
+    previous = api._transport
+    api._transport = ReplayTransport(player)
+    try:
+        yield player
+    finally:
+        api._transport = previous
@@ -0,0 +1,126 @@
+#
+# Role membership graph.
+#
+# Roles, role members and the hosts mapped to roles are loaded once, with
+# pages fetched concurrently, and kept as adjacency indexes so that access
+# questions are answered without further API calls. Host mappings come from
+# the role references in host principals.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+from privx_api.privx_api import PrivXAPI
+from privx_api.utils import fetch_all_items
+
+
+class RoleGraph:
+    """
+    Adjacency indexes user <-> role <-> host.
+    """
+
+    def __init__(
+        self,
+        roles: Iterable[dict],
+        members: Dict[str, List[dict]],
+        hosts: Iterable[dict],
+    ) -> None:
+        self.roles: Dict[str, dict] = {r["id"]: r for r in roles}
+        self.users: Dict[str, dict] = {}
+        self.hosts: Dict[str, dict] = {}
+        self._role_users: Dict[str, Set[str]] = {r: set() for r in self.roles}
+        self._user_roles: Dict[str, Set[str]] = {}
+        self._role_hosts: Dict[str, Set[str]] = {r: set() for r in self.roles}
+        # host id -> role id -> principals the role may use on the host
+        self._host_roles: Dict[str, Dict[str, Set[str]]] = {}
+        self._users_by_principal: Dict[str, str] = {}
+
+        for role_id, role_members in members.items():
+            for user in role_members:
+                self.users.setdefault(user["id"], user)
+                self._role_users.setdefault(role_id, set()).add(user["id"])
+                self._user_roles.setdefault(user["id"], set()).add(role_id)
+                if user.get("principal"):
+                    self._users_by_principal[user["principal"].lower()] = user["id"]
+        for host in hosts:
+            for principal in host.get("principals") or []:
+                for role in principal.get("roles") or []:
+                    self.hosts[host["id"]] = host
+                    self._role_hosts.setdefault(role["id"], set()).add(host["id"])
+                    self._host_roles.setdefault(host["id"], {}).setdefault(
+                        role["id"], set()
+                    ).add(principal.get("principal"))
+
+    @classmethod
+    def load(
+        cls,
+        api: PrivXAPI,
+        workers: int = 8,
+        page_size: int = 1000,
+        hosts: Optional[Iterable[dict]] = None,
+    ) -> "RoleGraph":
+        """
+        Load every role, its members and the hosts. Pass `hosts`, for example
+        from a HostStoreMirror, to skip fetching them.
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            roles = fetch_all_items(
+                lambda offset, limit: api.get_roles(offset=offset, limit=limit),
+                page_size,
+                executor,
+            )
+            if hosts is None:
+                hosts_future = executor.submit(
+                    fetch_all_items,
+                    lambda offset, limit: api.get_hosts(offset=offset, limit=limit),
+                    page_size,
+                )
+            # role pages are read sequentially per role, roles run concurrently
+            member_lists = executor.map(
+                lambda role: fetch_all_items(
+                    lambda offset, limit: api.get_role_members(
+                        role["id"], offset=offset, limit=limit
+                    ),
+                    page_size,
+                ),
+                roles,
+            )
+            members = {role["id"]: items for role, items in zip(roles, member_lists)}
+            if hosts is None:
+                hosts = hosts_future.result()
+        return cls(roles, members, hosts)
+
+    def user_id(self, principal: str) -> Optional[str]:
+        return self._users_by_principal.get(principal.lower())
+
+    def user_roles(self, user_id: str) -> List[dict]:
+        return self._sorted(self.roles, self._user_roles.get(user_id, ()))
+
+    def role_users(self, role_id: str) -> List[dict]:
+        return self._sorted(self.users, self._role_users.get(role_id, ()))
+
+    def role_hosts(self, role_id: str) -> List[dict]:
+        return self._sorted(self.hosts, self._role_hosts.get(role_id, ()))
+
+    def user_hosts(self, user_id: str) -> List[dict]:
+        host_ids = set()
+        for role_id in self._user_roles.get(user_id, ()):
+            host_ids.update(self._role_hosts.get(role_id, ()))
+        return self._sorted(self.hosts, host_ids)
+
+    def host_access(self, host_id: str) -> Dict[str, Set[str]]:
+        """
+        Users who can reach the host, user id -> principals they may use.
+        """
+        access: Dict[str, Set[str]] = {}
+        for role_id, principals in self._host_roles.get(host_id, {}).items():
+            for user_id in self._role_users.get(role_id, ()):
+                access.setdefault(user_id, set()).update(principals)
+        return access
+
+    def host_users(self, host_id: str) -> List[dict]:
+        return self._sorted(self.users, self.host_access(host_id))
+
+    @staticmethod
+    def _sorted(items: Dict[str, dict], ids: Iterable[str]) -> List[dict]:
+        return [items[i] for i in sorted(ids) if i in items]
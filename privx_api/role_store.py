@@ -1,6 +1,7 @@
 from http import HTTPStatus
 from typing import Optional
 
+from privx_api import aws_token_cache
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
@@ -298,6 +299,32 @@ class RoleStoreAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def aws_token_cache(
+        self,
+        expiry_margin: float = 60.0,
+        refresh_ahead: float = 0.8,
+        path: Optional[str] = None,
+        encryption_key: Optional[bytes] = None,
+    ) -> aws_token_cache.AwsTokenCache:
+        """
+        Create a cache of AWS tokens fetched with get_aws_token, keyed by AWS
+        role and TTL. Tokens are reused until expiry_margin seconds before
+        they expire and refreshed in the background once refresh_ahead of
+        their lifetime has passed; concurrent misses share one request. With
+        path and a Fernet encryption_key (needs the cryptography package)
+        tokens are also kept in an encrypted file for reuse across processes.
+
+        Returns:
+            AwsTokenCache
+        """
+        return aws_token_cache.AwsTokenCache(
+            self.get_aws_token,
+            expiry_margin=expiry_margin,
+            refresh_ahead=refresh_ahead,
+            path=path,
+            encryption_key=encryption_key,
+        )
+
     def get_principal_keys(self, role_id: str) -> PrivXAPIResponse:
         """
         Get role's principal key objects.
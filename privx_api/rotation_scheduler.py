@@ -0,0 +1,179 @@
+#
+# Password rotation scheduler.
+#
+# Host accounts and target domain managed accounts are rotated at an even
+# pace over a time window rather than all at once: the targets are
+# interleaved round-robin across target domains (host accounts form one
+# group) and the i-th of n rotations starts `window * i / n` seconds into the
+# run. At most `per_domain` rotations of one target domain or of one host's
+# accounts, and `workers` in total, run at the same time. Every rotation gets
+# a line in a JSON lines result log; a rerun with the same log skips the
+# rotated targets and retries the failed ones.
+#
+
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, zip_longest
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.user_import import ResultLog
+
+ROTATED = "rotated"
+FAILED = "failed"
+
+
+class RotationReport:
+    """
+    Outcome of a rotation run, counts by status plus the failed rotations.
+    """
+
+    def __init__(self) -> None:
+        self.counts = Counter()
+        self.failures: List[dict] = []
+        self.elapsed = 0.0
+        self.interrupted = False
+
+    @property
+    def rotations_per_second(self) -> float:
+        done = self.counts[ROTATED] + self.counts[FAILED]
+        return done / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        counts = ", ".join(f"{s}: {n}" for s, n in sorted(self.counts.items()))
+        suffix = ", interrupted" if self.interrupted else ""
+        return (
+            f"{counts or 'nothing to do'} in {self.elapsed:.2f}s "
+            f"({self.rotations_per_second:.1f} rotations/s){suffix}"
+        )
+
+
+class RotationScheduler:
+    """
+    Paced, resumable rotation of many passwords, see the module comment.
+    """
+
+    def __init__(
+        self,
+        rotate_host_password: Callable,
+        rotate_target_domain_managed_account: Callable,
+        window: float = 0.0,
+        per_domain: int = 2,
+        workers: int = 8,
+        log_path: Optional[str] = None,
+    ) -> None:
+        self._rotate_host_password = rotate_host_password
+        self._rotate_managed_account = rotate_target_domain_managed_account
+        self._window = window
+        self._per_domain = per_domain
+        self._workers = workers
+        self._log_path = log_path
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """
+        Start no further rotations, run() returns once the running ones end.
+        """
+        self._stop.set()
+
+    def run(
+        self,
+        hosts: Iterable[Tuple[str, str]] = (),
+        managed_accounts: Iterable[Tuple[str, str]] = (),
+    ) -> RotationReport:
+        """
+        Rotate (host_id, account) and (target_domain_id, managed_account_id)
+        pairs.
+        """
+        self._stop.clear()
+        report = RotationReport()
+        report_lock = threading.Lock()
+        log = ResultLog(self._log_path, final_statuses={ROTATED})
+        try:
+            schedule = self._schedule(hosts, managed_accounts, log, report)
+        except BaseException:
+            log.close()
+            raise
+        limits = {
+            limit: threading.BoundedSemaphore(self._per_domain)
+            for _, limit, _, _ in schedule
+        }
+        in_flight = threading.BoundedSemaphore(self._workers)
+
+        def rotate(key: str, limit: Tuple[str, str], call: Callable, args) -> None:
+            try:
+                with limits[limit]:
+                    result = _rotate_one(key, call, args)
+                with report_lock:
+                    report.counts[result["status"]] += 1
+                    if result["status"] == FAILED:
+                        report.failures.append(result)
+                log.write(result)
+            finally:
+                in_flight.release()
+
+        start = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self._workers) as executor:
+                for index, target in enumerate(schedule):
+                    due = start + self._window * index / len(schedule)
+                    if self._stop.wait(max(due - time.monotonic(), 0)):
+                        break
+                    in_flight.acquire()
+                    executor.submit(rotate, *target)
+        finally:
+            log.close()
+        report.interrupted = self._stop.is_set()
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def _schedule(
+        self,
+        hosts: Iterable[Tuple[str, str]],
+        managed_accounts: Iterable[Tuple[str, str]],
+        log: ResultLog,
+        report: RotationReport,
+    ) -> List[tuple]:
+        # (key, concurrency limit, rotate call, args) of the pending rotations,
+        # round-robin by domain; host accounts are not in a domain and form
+        # group None, but are limited per host rather than as one group
+        groups: Dict[Optional[str], list] = defaultdict(list)
+        targets = chain(
+            (
+                (f"host:{h}:{a}", ("host", h), self._rotate_host_password, (h, a))
+                for h, a in hosts
+            ),
+            (
+                (
+                    f"managed:{d}:{a}",
+                    ("target_domain", d),
+                    self._rotate_managed_account,
+                    (d, a),
+                )
+                for d, a in managed_accounts
+            ),
+        )
+        seen = set()
+        for target in targets:
+            kind, name = target[1]
+            if target[0] in log.done:
+                report.counts["skipped"] += 1
+            elif target[0] in seen:
+                report.counts["duplicate"] += 1
+            else:
+                seen.add(target[0])
+                groups[name if kind == "target_domain" else None].append(target)
+        rounds = zip_longest(*groups.values())
+        return [target for targets in rounds for target in targets if target]
+
+
+def _rotate_one(key: str, rotate: Callable, args: Tuple[str, str]) -> dict:
+    try:
+        response = rotate(*args)
+        if response.ok:
+            return {"key": key, "status": ROTATED}
+        return {"key": key, "status": FAILED, "error": response.data}
+    except InternalAPIException as e:
+        return {"key": key, "status": FAILED, "error": str(e)}
@@ -0,0 +1,150 @@
+#
+# Vault secret cache.
+#
+# A cached secret is served without a request for `ttl` seconds. After that a
+# read first asks for the secret metadata, which carries no secret data, and
+# only fetches the secret again when its version or updated time changed, or
+# when the metadata has neither.
+#
+# Secrets are kept as their raw JSON body in a bytearray that is overwritten
+# with zeros when the entry is evicted, invalidated or the cache is cleared.
+# This is best-effort hygiene: the response the body came from and the dicts
+# handed to callers are ordinary Python objects that cannot be wiped.
+#
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+
+
+def _wipe(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+class _Entry:
+    __slots__ = ("buffer", "version", "updated", "validated")
+
+    def __init__(self, buffer: bytearray, secret: dict, validated: float) -> None:
+        self.buffer = buffer
+        self.version = secret.get("version")
+        self.updated = secret.get("updated")
+        self.validated = validated
+
+
+class SecretCache:
+    """
+    LRU cache of vault secrets bounded by entry count and body bytes.
+    """
+
+    def __init__(
+        self,
+        get_secret: Callable,
+        get_metadata: Callable,
+        get_user_secret: Callable,
+        get_user_metadata: Callable,
+        ttl: float = 30.0,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        self._get_secret = get_secret
+        self._get_metadata = get_metadata
+        self._get_user_secret = get_user_secret
+        self._get_user_metadata = get_user_metadata
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # (user id or "", name) -> entry
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.fetches = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str) -> dict:
+        """
+        The secret, as returned by VaultAPI.get_secret.
+        """
+        return self._get(
+            ("", name),
+            lambda: self._get_secret(name),
+            lambda: self._get_metadata(name),
+        )
+
+    def get_user_secret(self, user_id: str, name: str) -> dict:
+        """
+        The user secret, as returned by VaultAPI.get_user_secret.
+        """
+        return self._get(
+            (user_id, name),
+            lambda: self._get_user_secret(user_id, name),
+            lambda: self._get_user_metadata(user_id, name),
+        )
+
+    def invalidate(self, name: str, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._evict((user_id or "", name))
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def _get(self, key: Tuple[str, str], fetch: Callable, metadata: Callable) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.validated < self._ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry.buffer)
+        if entry is not None and self._unchanged(entry, metadata()):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    entry.validated = now
+                    self._entries.move_to_end(key)
+                    self.revalidations += 1
+                    return json.loads(entry.buffer)
+        return self._fetch(key, fetch)
+
+    @staticmethod
+    def _unchanged(entry: _Entry, response) -> bool:
+        if not response.ok:
+            return False
+        version, updated = response.data.get("version"), response.data.get("updated")
+        if version is None and updated is None:
+            # nothing tells whether the secret changed, fetch it again
+            return False
+        return version == entry.version and updated == entry.updated
+
+    def _fetch(self, key: Tuple[str, str], fetch: Callable) -> dict:
+        response = fetch()
+        if not response.ok:
+            with self._lock:
+                self._evict(key)
+            raise InternalAPIException("Failed to get secret: ", response.data)
+        secret = response.data
+        entry = _Entry(bytearray(response.content), secret, time.monotonic())
+        with self._lock:
+            self.fetches += 1
+            self._evict(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.buffer)
+            while self._entries and (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                self._evict(next(iter(self._entries)))
+        return secret
+
+    def _evict(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.buffer)
+            _wipe(entry.buffer)
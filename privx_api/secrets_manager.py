@@ -1,11 +1,21 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
 
+from privx_api import chunked_batch, rotation_scheduler, target_domain_accounts
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
+from privx_api.exceptions import InternalAPIException
 from privx_api.response import PrivXAPIResponse
 from privx_api.utils import get_value
 
+# body field holding the items of a managed account batch operation
+MANAGED_ACCOUNT_BATCH_FIELDS = {
+    "create": "data",
+    "update": "ids",
+    "delete": "ids",
+    "rotate": "ids",
+}
+
 
 class SecretsManagerAPI(BasePrivXAPI):
     def get_secrets_manager_service_status(self) -> PrivXAPIResponse:
@@ -623,3 +633,142 @@ class SecretsManagerAPI(BasePrivXAPI):
             body=td_params,
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
+
+    def batch_target_domain_managed_accounts_chunked(
+        self,
+        operation: str,
+        target_domain_id: str,
+        items: Iterable,
+        td_params: Optional[dict] = None,
+        items_field: Optional[str] = None,
+        chunk_size: int = 100,
+        workers: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> chunked_batch.ChunkedBatchReport:
+        """
+        Run a batch managed account operation ("create", "update", "delete"
+        or "rotate") over any number of items. Each chunk of at most
+        chunk_size items is sent as items_field of td_params (for example
+        the changes of an update), with up to `workers` chunks in flight.
+        Transient failures are retried up to `retries` times with exponential
+        backoff from `backoff` seconds, failed chunks are split so that only
+        the failing items are resent, and chunks rejected as too large lower
+        the chunk size. A create chunk that may have been applied despite
+        failing, on a lost connection, a timeout or any 5xx, is not resent and
+        its items are reported failed.
+
+        Returns:
+            ChunkedBatchReport pairing every item with the response of the
+            batch call that carried it
+        """
+        if operation not in MANAGED_ACCOUNT_BATCH_FIELDS:
+            raise InternalAPIException("Unknown batch operation: ", operation)
+        batch = getattr(self, f"batch_{operation}_target_domain_managed_account")
+        items_field = items_field or MANAGED_ACCOUNT_BATCH_FIELDS[operation]
+        td_params = get_value(td_params, dict())
+        return chunked_batch.run_chunked(
+            lambda chunk: batch(target_domain_id, {**td_params, items_field: chunk}),
+            items,
+            chunk_size=chunk_size,
+            workers=workers,
+            retries=retries,
+            backoff=backoff,
+            idempotent=operation != "create",
+        )
+
+    def rotate_passwords(
+        self,
+        hosts: Iterable[Tuple[str, str]] = (),
+        managed_accounts: Iterable[Tuple[str, str]] = (),
+        window: float = 0.0,
+        per_domain: int = 2,
+        workers: int = 8,
+        log_path: Optional[str] = None,
+    ) -> rotation_scheduler.RotationReport:
+        """
+        Rotate the passwords of (host_id, account) pairs and of
+        (target_domain_id, managed_account_id) pairs, started at an even
+        pace over `window` seconds with targets interleaved across target
+        domains. At most per_domain rotations of one target domain or of one
+        host's accounts, and `workers` in total, run at once. With log_path
+        every result is appended to that JSON lines file and a rerun with the
+        same log skips the targets already rotated. Use RotationScheduler
+        directly to stop a run from another thread.
+
+        Returns:
+            RotationReport with counts, failures and rotations per second
+        """
+        return rotation_scheduler.RotationScheduler(
+            self.rotate_host_password,
+            self.rotate_target_domain_managed_account,
+            window=window,
+            per_domain=per_domain,
+            workers=workers,
+            log_path=log_path,
+        ).run(hosts, managed_accounts)
+
+    def iter_target_domain_accounts(
+        self,
+        target_domain_id: str,
+        search_payload: Optional[dict] = None,
+        fields: Sequence[str] = target_domain_accounts.ACCOUNT_FIELDS,
+        page_size: int = 1000,
+        prefetch: int = 2,
+        sort_key: Optional[str] = None,
+        sort_dir: Optional[str] = None,
+    ) -> Iterator[tuple]:
+        """
+        Yield every account of a target domain, those matching
+        search_payload when given, as named tuples of `fields`. Up to
+        `prefetch` pages are fetched ahead of the consumer and each page is
+        reduced to its records as it arrives, so memory stays flat however
+        many accounts there are.
+
+        Returns:
+            iterator of TargetDomainAccount named tuples
+        """
+        return target_domain_accounts.iter_accounts(
+            target_domain_accounts.account_fetch(
+                self.get_target_domain_accounts,
+                self.search_target_domain_accounts,
+                target_domain_id,
+                search_payload,
+                sort_key,
+                sort_dir,
+            ),
+            target_domain_accounts.record_type("TargetDomainAccount", tuple(fields)),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_target_domain_managed_accounts(
+        self,
+        target_domain_id: str,
+        search_payload: Optional[dict] = None,
+        fields: Sequence[str] = target_domain_accounts.MANAGED_ACCOUNT_FIELDS,
+        page_size: int = 1000,
+        prefetch: int = 2,
+        sort_key: Optional[str] = None,
+        sort_dir: Optional[str] = None,
+    ) -> Iterator[tuple]:
+        """
+        Yield every managed account of a target domain, see
+        iter_target_domain_accounts.
+
+        Returns:
+            iterator of ManagedAccount named tuples
+        """
+        return target_domain_accounts.iter_accounts(
+            target_domain_accounts.account_fetch(
+                self.get_target_domain_managed_accounts,
+                self.search_target_domain_managed_accounts,
+                target_domain_id,
+                search_payload,
+                sort_key,
+                sort_dir,
+            ),
+            target_domain_accounts.record_type("ManagedAccount", tuple(fields)),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,79 @@
+#
+# Target host credential cache.
+#
+# Credentials are keyed by the target parameters and kept until
+# `expiry_margin` seconds before the earliest certificate in the response
+# stops being valid, or for `default_ttl` seconds when it has none. Once
+# `refresh_ahead` of that lifetime has passed, a read still returns the
+# cached credentials but starts a refresh in a background thread. Concurrent
+# reads for the same target share a single get_target_host_credentials call.
+#
+
+import copy
+import json
+import time
+from typing import Callable, Tuple
+
+from privx_api.certificates import earliest_expiry
+from privx_api.exceptions import InternalAPIException
+from privx_api.expiring_cache import ExpiringCache
+
+
+class TargetCredentialCache:
+    """
+    Thread-safe cache of get_target_host_credentials results.
+    """
+
+    def __init__(
+        self,
+        get_target_host_credentials: Callable,
+        expiry_margin: float = 30.0,
+        refresh_ahead: float = 0.8,
+        default_ttl: float = 60.0,
+    ) -> None:
+        self._get_target_host_credentials = get_target_host_credentials
+        self._expiry_margin = expiry_margin
+        self._refresh_ahead = refresh_ahead
+        self._default_ttl = default_ttl
+        self._cache = ExpiringCache(self._load)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def fetches(self) -> int:
+        return self._cache.loads
+
+    def get(self, target_params: dict) -> dict:
+        """
+        Credentials as returned by AuthorizerAPI.get_target_host_credentials.
+        """
+        # callers get their own copy, the cached one is shared
+        return copy.deepcopy(self._cache.get(self._key(target_params)))
+
+    def invalidate(self, target_params: dict = None) -> None:
+        if target_params is None:
+            self._cache.invalidate()
+        else:
+            key = self._key(target_params)
+            self._cache.invalidate(lambda cached: cached == key)
+
+    @staticmethod
+    def _key(target_params: dict) -> str:
+        return json.dumps(target_params, sort_keys=True)
+
+    def _load(self, key: str) -> Tuple[dict, float, float]:
+        fetched = time.time()
+        response = self._get_target_host_credentials(json.loads(key))
+        if not response.ok:
+            raise InternalAPIException(
+                "Failed to get target host credentials: ", response.data
+            )
+        expires = earliest_expiry(response.data)
+        if expires is None:
+            expires = fetched + self._default_ttl
+        else:
+            expires -= self._expiry_margin
+        refresh_at = fetched + max(expires - fetched, 0) * self._refresh_ahead
+        return response.data, expires, refresh_at
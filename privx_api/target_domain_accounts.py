@@ -0,0 +1,91 @@
+#
+# Streaming enumeration of target domain accounts.
+#
+# Target domains can hold hundreds of thousands of accounts. The iterators
+# here fetch the account pages ahead of the consumer and turn every account
+# into a named tuple of the selected fields as soon as its page arrives, so
+# only the records of the prefetched pages are held instead of their
+# response dicts. Fields missing from an account are None.
+#
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from privx_api.utils import iter_items
+
+ACCOUNT_FIELDS = ("id", "username", "email", "full_name", "state", "updated")
+MANAGED_ACCOUNT_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "full_name",
+    "enabled",
+    "rotation_enabled",
+    "updated",
+)
+
+
+@lru_cache(maxsize=32)
+def record_type(name: str, fields: Sequence[str]) -> type:
+    """
+    Named tuple type `name` with `fields`, the same type for the same fields.
+    """
+    return namedtuple(name, fields)
+
+
+TargetDomainAccount = record_type("TargetDomainAccount", ACCOUNT_FIELDS)
+ManagedAccount = record_type("ManagedAccount", MANAGED_ACCOUNT_FIELDS)
+
+
+def iter_accounts(
+    fetch: Callable,
+    record: type,
+    page_size: int = 1000,
+    prefetch: int = 2,
+) -> Iterator[tuple]:
+    """
+    Yield the accounts of the offset/limit paginated `fetch` as `record`
+    tuples, with up to `prefetch` pages requested ahead of the consumer.
+    """
+    fields = record._fields
+
+    def convert(items: List[dict]) -> List[tuple]:
+        return [record._make(item.get(field) for field in fields) for item in items]
+
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch)) if prefetch else None
+    try:
+        yield from iter_items(fetch, page_size, executor, prefetch, convert=convert)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def account_fetch(
+    get: Callable,
+    search: Callable,
+    target_domain_id: str,
+    search_payload: Optional[dict],
+    sort_key: Optional[str],
+    sort_dir: Optional[str],
+) -> Callable:
+    """
+    fetch(offset, limit) over `search` with a payload, over `get` otherwise.
+    """
+    if search_payload is None:
+        return lambda offset, limit: get(
+            target_domain_id,
+            offset=offset,
+            limit=limit,
+            sort_key=sort_key,
+            sort_dir=sort_dir,
+        )
+    return lambda offset, limit: search(
+        target_domain_id,
+        offset=offset,
+        limit=limit,
+        sort_key=sort_key,
+        sort_dir=sort_dir,
+        search_payload=search_payload,
+    )
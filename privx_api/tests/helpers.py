@@ -0,0 +1,43 @@
+import json
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from http import HTTPStatus
+
+from privx_api.privx_api import PrivXAPI
+from privx_api.response import PrivXAPIResponse
+
+
+def json_response(status, body, expected=HTTPStatus.OK):
+    return PrivXAPIResponse(status, expected, json.dumps(body).encode("utf-8"))
+
+
+class FakePrivXAPI(PrivXAPI):
+    """
+    PrivXAPI without a server, fakes override the calls a test needs.
+
+    Calls made inside tracked(*groups) count as in flight for every group, or
+    for "all" without groups, and max_in_flight keeps the peak per group.
+    """
+
+    def __init__(self):
+        super().__init__("privx.example.com", 443, "", "", "")
+        self.lock = threading.Lock()
+        self.in_flight = Counter()
+        self.max_in_flight = Counter()
+
+    @contextmanager
+    def tracked(self, *groups):
+        groups = groups or ("all",)
+        with self.lock:
+            for group in groups:
+                self.in_flight[group] += 1
+                self.max_in_flight[group] = max(
+                    self.max_in_flight[group], self.in_flight[group]
+                )
+        try:
+            yield
+        finally:
+            with self.lock:
+                for group in groups:
+                    self.in_flight[group] -= 1
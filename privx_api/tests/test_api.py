@@ -1,3 +1,4 @@
+import threading
 from enum import Enum
 from http import HTTPStatus
 from unittest import mock
@@ -200,6 +201,29 @@ def test_stream_response_helper_passes_last_response_headers():
     assert resp.ok is True
 
 
+def test_response_headers_are_kept_per_thread():
+    api = PrivXAPI("", 0, "", "", "")
+    stored, overwritten = threading.Event(), threading.Event()
+    seen = []
+
+    def request():
+        api._store_response_headers({"X-Request-Id": "req-1"})
+        stored.set()
+        overwritten.wait()
+        resp = api._api_response(HTTPStatus.OK, HTTPStatus.OK, b"{}")
+        seen.append(resp.headers["x-request-id"])
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    stored.wait()
+    api._store_response_headers({"X-Request-Id": "req-2"})
+    overwritten.set()
+    thread.join()
+
+    assert seen == ["req-1"]
+    assert api.last_response_headers == {"X-Request-Id": "req-2"}
+
+
 def test_api_response_helper_marks_non_expected_status_as_not_ok():
     api = PrivXAPI("", 0, "", "", "")
     api._store_response_headers({"Content-Type": "application/json"})
@@ -0,0 +1,128 @@
+import csv
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+
+from privx_api import audit_export
+from privx_api.audit_export import export_audit_events, export_events
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import json_response
+
+
+def make_event(index):
+    event = {
+        "id": f"event-{index}",
+        "received_at": f"2021-08-01T00:{index // 60:02d}:{index % 60:02d}.000Z",
+        "event": "USER_LOGIN",
+        "tags": ["a", "b"],
+    }
+    if index > 5 and index % 4 == 3:
+        event["late_field"] = index
+    return event
+
+
+class FakeMonitor:
+    def __init__(self, count):
+        self.events = [make_event(i) for i in range(count)]
+        self.offsets = []
+
+    def search_audit_events(self, offset, limit, sort_dir, audit_event_params):
+        self.offsets.append(offset)
+        body = {
+            "count": len(self.events),
+            "items": self.events[offset : offset + limit],
+        }
+        return json_response(HTTPStatus.OK, body)
+
+
+def read_csv(path):
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_export_rotates_files(tmp_path):
+    api = FakeMonitor(25)
+
+    report = export_audit_events(
+        api.search_audit_events,
+        str(tmp_path),
+        page_size=4,
+        workers=3,
+        file_format="csv",
+        batch_size=5,
+        rows_per_file=10,
+    )
+
+    assert report.events == 25
+    assert [p.rsplit("/", 1)[1] for p in report.files] == [
+        "audit-events-00000.csv.gz",
+        "audit-events-00001.csv.gz",
+        "audit-events-00002.csv.gz",
+    ]
+    assert sorted(api.offsets) == list(range(0, 25, 4))
+    rows = [row for path in report.files for row in read_csv(path)]
+    assert [row["id"] for row in rows] == [f"event-{i}" for i in range(25)]
+    assert rows[0]["tags"] == '["a","b"]'
+    assert rows[0]["extra"] == ""
+    # the layout is fixed by the first batch, later fields go to "extra"
+    assert "late_field" not in rows[0]
+    assert rows[7]["extra"] == '{"late_field":7}'
+
+
+def test_explicit_columns(tmp_path):
+    report = export_events(
+        [make_event(0)], str(tmp_path), file_format="csv", columns=["id"]
+    )
+
+    (row,) = read_csv(report.files[0])
+    assert list(row) == ["id", "extra"]
+    assert json.loads(row["extra"])["event"] == "USER_LOGIN"
+
+
+def test_extra_field_does_not_collide_with_extra_column(tmp_path):
+    events = [dict(make_event(0), extra="kept"), make_event(7)]
+
+    report = export_events(events, str(tmp_path), file_format="csv", batch_size=1)
+
+    rows = read_csv(report.files[0])
+    assert list(rows[0]) == ["event", "extra", "id", "received_at", "tags", "_extra"]
+    assert rows[0]["extra"] == "kept"
+    assert json.loads(rows[1]["_extra"])["late_field"] == 7
+
+
+def test_batches_split_between_files(tmp_path):
+    events = [make_event(i) for i in range(10)]
+
+    report = export_events(
+        events, str(tmp_path), file_format="csv", batch_size=4, rows_per_file=3
+    )
+
+    assert report.events == 10
+    assert [len(read_csv(path)) for path in report.files] == [3, 3, 3, 1]
+
+
+def test_unavailable_formats(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_export, "pyarrow", None)
+
+    assert audit_export.default_format() == "csv"
+    with pytest.raises(InternalAPIException):
+        export_events([], str(tmp_path), file_format="parquet")
+    with pytest.raises(InternalAPIException):
+        export_events([], str(tmp_path), file_format="xml")
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_pyarrow_formats(tmp_path, file_format):
+    pyarrow = pytest.importorskip("pyarrow")
+    events = [make_event(i) for i in range(12)]
+
+    report = export_events(events, str(tmp_path), file_format=file_format, batch_size=5)
+
+    if file_format == "parquet":
+        table = pyarrow.parquet.read_table(report.files[0])
+    else:
+        table = pyarrow.ipc.open_file(report.files[0]).read_all()
+    assert table.num_rows == 12
+    assert table.column("id").to_pylist()[-1] == "event-11"
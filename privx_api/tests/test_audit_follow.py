@@ -0,0 +1,113 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.audit_follow import AuditEventFollower
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import json_response
+from privx_api.utils import parse_time
+
+
+def event(index, second):
+    return {
+        "id": f"event-{index}",
+        "received_at": f"2021-08-01T00:00:{second:02d}.5Z",
+        "event": "USER_LOGIN",
+    }
+
+
+class FakeMonitor:
+    def __init__(self, events=()):
+        self.events = list(events)
+        self.calls = []
+        self.status = HTTPStatus.OK
+
+    def search_audit_events(self, offset, limit, sort_dir, audit_event_params):
+        self.calls.append((offset, audit_event_params.get("start_time")))
+        start = audit_event_params.get("start_time")
+        events = sorted(self.events, key=lambda e: parse_time(e["received_at"]))
+        if start:
+            events = [
+                e for e in events if parse_time(e["received_at"]) >= parse_time(start)
+            ]
+        body = {"count": len(events), "items": events[offset : offset + limit]}
+        return json_response(self.status, body)
+
+
+def ids(events):
+    return [e["id"] for e in events]
+
+
+def test_poll_follows_high_water_mark_without_duplicates():
+    api = FakeMonitor(event(i, i) for i in range(5))
+    follower = AuditEventFollower(api.search_audit_events, page_size=2, overlap=2)
+
+    assert ids(follower.poll()) == [f"event-{i}" for i in range(5)]
+    assert [offset for offset, _ in api.calls] == [0, 2, 4]
+    assert follower.cursor.high_water_mark == "2021-08-01T00:00:04.5Z"
+
+    # a late event inside the overlap window and a new one
+    api.events += [event(5, 3), event(6, 9)]
+    api.calls.clear()
+
+    assert ids(follower.poll()) == ["event-5", "event-6"]
+    assert api.calls[0] == (0, "2021-08-01T00:00:02.500000Z")
+    assert ids(follower.poll()) == []
+    assert set(follower.cursor.seen) == {"event-6"}
+
+
+def test_checkpoint_resumes_after_restart(tmp_path):
+    path = str(tmp_path / "cursor.json")
+    api = FakeMonitor(event(i, i) for i in range(3))
+    assert len(list(AuditEventFollower(api.search_audit_events, path).poll())) == 3
+
+    api.events.append(event(3, 5))
+    resumed = AuditEventFollower(api.search_audit_events, path)
+
+    assert ids(resumed.poll()) == ["event-3"]
+
+
+def test_follow_backs_off_while_idle_and_stops():
+    api = FakeMonitor([event(0, 0)])
+    follower = AuditEventFollower(
+        api.search_audit_events, min_interval=0.001, max_interval=0.004
+    )
+    seen = []
+
+    def consume():
+        for e in follower:
+            seen.append(e["id"])
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while len(api.calls) < 5 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    follower.stop()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert seen == ["event-0"]
+    assert follower.interval == 0.004
+
+
+def test_failed_search_raises():
+    api = FakeMonitor()
+    api.status = HTTPStatus.FORBIDDEN
+
+    with pytest.raises(InternalAPIException):
+        list(AuditEventFollower(api.search_audit_events).poll())
+
+
+@pytest.mark.parametrize(
+    "value, microsecond",
+    [
+        ("2021-08-01T00:00:01Z", 0),
+        ("2021-08-01T00:00:01.5Z", 500000),
+        ("2021-08-01T00:00:01.123456789Z", 123456),
+    ],
+)
+def test_parse_time(value, microsecond):
+    assert parse_time(value).microsecond == microsecond
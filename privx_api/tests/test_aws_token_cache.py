@@ -0,0 +1,130 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import pytest
+
+from privx_api import aws_token_cache
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+from privx_api.utils import format_time
+
+
+class FakeRoleStore(FakePrivXAPI):
+    def __init__(self, lifetime=900, delay=0.0, status=HTTPStatus.OK):
+        super().__init__()
+        self.lifetime = lifetime
+        self.delay = delay
+        self.status = status
+        self.calls = []
+
+    def get_aws_token(self, aws_role_id, ttl=900, token_code=None):
+        with self.lock:
+            self.calls.append((aws_role_id, ttl, token_code))
+            serial = len(self.calls)
+        time.sleep(self.delay)
+        expiration = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        body = {
+            "access_key_id": f"AKIA{serial}",
+            "secret_access_key": "secret",
+            "session_token": "session",
+            "expiration": format_time(expiration),
+        }
+        return json_response(self.status, body)
+
+
+def test_reuses_token_per_role_and_ttl():
+    api = FakeRoleStore()
+    cache = api.aws_token_cache()
+
+    assert cache.get("role-1")["access_key_id"] == "AKIA1"
+    assert cache.get("role-1")["access_key_id"] == "AKIA1"
+    assert cache.get("role-1", ttl=3600)["access_key_id"] == "AKIA2"
+    assert cache.get("role-2", token_code="123456")["access_key_id"] == "AKIA3"
+
+    assert api.calls == [
+        ("role-1", 900, None),
+        ("role-1", 3600, None),
+        ("role-2", 900, "123456"),
+    ]
+    assert cache.hits == 1
+
+
+def test_refetches_within_expiry_margin():
+    api = FakeRoleStore(lifetime=30)
+    cache = api.aws_token_cache(expiry_margin=60)
+
+    cache.get("role-1")
+    cache.get("role-1")
+
+    assert len(api.calls) == 2
+
+
+def test_refreshes_in_background_before_expiry():
+    api = FakeRoleStore(delay=0.05)
+    cache = api.aws_token_cache(refresh_ahead=0)
+    cache.get("role-1")
+
+    # served from cache while one refresh runs in the background
+    assert cache.get("role-1")["access_key_id"] == "AKIA1"
+    assert cache.get("role-1")["access_key_id"] == "AKIA1"
+    deadline = time.monotonic() + 2
+    while cache.fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(api.calls) == 2
+    assert cache.get("role-1")["access_key_id"] == "AKIA2"
+
+
+def test_concurrent_misses_share_one_request():
+    api = FakeRoleStore(delay=0.05)
+    cache = api.aws_token_cache()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("role-1")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(api.calls) == 1
+    assert {r["access_key_id"] for r in results} == {"AKIA1"}
+
+
+def test_failed_fetch_raises_and_is_not_cached():
+    api = FakeRoleStore(status=HTTPStatus.FORBIDDEN)
+    cache = api.aws_token_cache()
+
+    with pytest.raises(InternalAPIException):
+        cache.get("role-1")
+    api.status = HTTPStatus.OK
+    assert cache.get("role-1")["access_key_id"] == "AKIA2"
+
+
+def test_persistence_requires_cryptography(tmp_path, monkeypatch):
+    monkeypatch.setattr(aws_token_cache, "Fernet", None)
+
+    with pytest.raises(InternalAPIException):
+        FakeRoleStore().aws_token_cache(path=str(tmp_path / "tokens"))
+
+
+def test_encrypted_persistence(tmp_path):
+    fernet = pytest.importorskip("cryptography.fernet")
+    key = fernet.Fernet.generate_key()
+    path = str(tmp_path / "tokens")
+    api = FakeRoleStore()
+    api.aws_token_cache(path=path, encryption_key=key).get("role-1")
+
+    with open(path, "rb") as f:
+        assert b"AKIA1" not in f.read()
+    cache = api.aws_token_cache(path=path, encryption_key=key)
+    assert cache.get("role-1")["access_key_id"] == "AKIA1"
+    assert len(api.calls) == 1
+
+    other_key = fernet.Fernet.generate_key()
+    api.aws_token_cache(path=path, encryption_key=other_key).get("role-1")
+    assert len(api.calls) == 2
@@ -0,0 +1,98 @@
+import random
+import time
+from http import HTTPStatus
+
+from privx_api.batch_signing import SigningStats
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeAuthorizer(FakePrivXAPI):
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+
+    def sign_with_principal_key(self, group_id, key_id, sign_params):
+        with self.tracked():
+            # finish out of order
+            time.sleep(random.uniform(0, self.delay))
+            if sign_params["data"] == "broken":
+                raise InternalAPIException("connection reset")
+            if sign_params["data"] == "denied":
+                return json_response(HTTPStatus.FORBIDDEN, {"error": "FORBIDDEN"})
+            body = {"signature": f"{key_id}:{sign_params['data']}"}
+            return json_response(HTTPStatus.OK, body)
+
+
+def test_signatures_in_input_order():
+    api = FakeAuthorizer(delay=0.01)
+    stats = SigningStats()
+    payloads = ({"data": str(i)} for i in range(50))
+
+    responses = list(
+        api.sign_batch_with_principal_key("g1", "k1", payloads, workers=4, stats=stats)
+    )
+
+    assert [r.data["signature"] for r in responses] == [f"k1:{i}" for i in range(50)]
+    assert api.max_in_flight["all"] == 4
+    assert stats.count == stats.signed == 50
+    assert stats.failures == 0
+    assert stats.signatures_per_second > 0
+    assert 0 < stats.percentile(50) <= stats.percentile(99) <= 0.05
+    assert "50 signed (0 failed)" in str(stats)
+
+
+def test_reads_payloads_lazily():
+    api = FakeAuthorizer()
+    read = []
+
+    def payloads():
+        for i in range(1000):
+            read.append(i)
+            yield {"data": str(i)}
+
+    batch = api.sign_batch_with_principal_key(
+        "g1", "k1", payloads(), workers=2, window=4
+    )
+    assert next(batch).data["signature"] == "k1:0"
+    batch.close()
+
+    assert len(read) <= 6
+
+
+def test_per_payload_failures():
+    api = FakeAuthorizer()
+    stats = SigningStats()
+    payloads = [{"data": "a"}, {"data": "denied"}, {"data": "broken"}]
+
+    responses = list(
+        api.sign_batch_with_principal_key("g1", "k1", payloads, stats=stats)
+    )
+
+    assert responses[0].ok
+    assert responses[1].status == HTTPStatus.FORBIDDEN
+    assert responses[2].status == 0
+    assert responses[2].data["details"] == {"error": "connection reset"}
+    assert (stats.count, stats.signed, stats.failures) == (3, 1, 2)
+    assert "1 signed (2 failed)" in str(stats)
+
+
+def test_percentile_nearest_rank():
+    stats = SigningStats()
+    assert stats.percentile(50) == 0.0
+    for latency in (0.4, 0.1, 0.3, 0.2):
+        stats.record(latency, True)
+
+    assert stats.percentile(50) == 0.2
+    assert stats.percentile(75) == 0.3
+    assert stats.percentile(100) == 0.4
+
+
+def test_latency_sample_is_bounded():
+    stats = SigningStats(max_samples=100)
+    for i in range(10000):
+        stats.record(i / 10000, True)
+
+    assert len(stats.latencies) == 100
+    assert stats.count == 10000
+    assert 0.3 < stats.percentile(50) < 0.7
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+from privx_api.utils import format_time
+
+
+class FakeAuthorizer(FakePrivXAPI):
+    def __init__(self, lifetime=900, delay=0.0):
+        super().__init__()
+        self.lifetime = lifetime
+        self.delay = delay
+        self.checkouts = []
+        self.released = []
+
+    def checkout_account_secrets(self, checkout_params):
+        with self.lock:
+            checkout_id = f"c{len(self.checkouts) + 1}"
+            self.checkouts.append(checkout_params)
+        time.sleep(self.delay)
+        expires = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        body = {
+            "count": 1,
+            "items": [
+                {
+                    "id": checkout_id,
+                    "path": checkout_params["path"],
+                    "expires": format_time(expires),
+                    "secrets": [{"password": "hunter2"}],
+                }
+            ],
+        }
+        return json_response(HTTPStatus.OK, body)
+
+    def release_account_secret_checkout(self, id):
+        with self.lock:
+            self.released.append(id)
+        return json_response(HTTPStatus.OK, {})
+
+
+def test_reuses_active_checkout():
+    api = FakeAuthorizer()
+    with api.account_secret_checkout_pool(release_at_exit=False) as pool:
+        for _ in range(3):
+            with pool.lease({"path": "db/admin"}) as checkout:
+                assert checkout["secrets"][0]["password"] == "hunter2"
+        with pool.lease({"path": "db/report"}) as checkout:
+            assert checkout["id"] == "c2"
+
+        assert (pool.checkouts, pool.reused) == (2, 2)
+        assert pool.reuse_ratio == 0.5
+        assert api.released == []
+
+    assert sorted(api.released) == ["c1", "c2"]
+    assert pool.released == 2
+
+
+def test_concurrent_workers_share_one_checkout():
+    api = FakeAuthorizer(delay=0.05)
+    pool = api.account_secret_checkout_pool(release_at_exit=False)
+    ids = []
+
+    def work():
+        with pool.lease({"path": "db/admin"}) as checkout:
+            ids.append(checkout["id"])
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert len(api.checkouts) == 1
+    assert ids == ["c1"] * 8
+
+
+def test_idle_checkouts_released_by_timer():
+    api = FakeAuthorizer()
+    pool = api.account_secret_checkout_pool(idle_release=0.05, release_at_exit=False)
+
+    with pool.lease({"path": "db/admin"}):
+        time.sleep(0.15)
+        # leased checkouts are never released
+        assert api.released == []
+    deadline = time.monotonic() + 2
+    while not api.released and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert api.released == ["c1"]
+
+    with pool.lease({"path": "db/admin"}) as checkout:
+        assert checkout["id"] == "c2"
+    pool.close()
+
+
+def test_expired_checkout_replaced():
+    api = FakeAuthorizer(lifetime=10)
+    pool = api.account_secret_checkout_pool(expiry_margin=30, release_at_exit=False)
+
+    with pool.lease({"path": "db/admin"}) as first:
+        pass
+    with pool.lease({"path": "db/admin"}) as second:
+        pass
+    pool.release_idle()
+
+    assert (first["id"], second["id"]) == ("c1", "c2")
+    assert sorted(api.released) == ["c1", "c2"]
+    pool.close()
@@ -0,0 +1,178 @@
+import socket
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeSecretsManager(FakePrivXAPI):
+    def __init__(self, max_chunk=None, bad=(), flaky=0, status=None, error=None):
+        super().__init__()
+        self.max_chunk = max_chunk
+        self.bad = set(bad)
+        self.flaky = flaky
+        self.status = status
+        self.error = error
+        self.bodies = []
+
+    def _batch(self, td_params, expected):
+        with self.lock:
+            self.bodies.append(td_params)
+            flaky = self.flaky > 0
+            self.flaky -= 1
+        if self.error:
+            raise InternalAPIException(self.error)
+        ids = td_params.get("ids") or td_params["data"]
+        if self.status:
+            status = self.status
+        elif flaky:
+            status = HTTPStatus.SERVICE_UNAVAILABLE
+        elif self.max_chunk and len(ids) > self.max_chunk:
+            status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        elif self.bad & set(map(str, ids)):
+            status = HTTPStatus.BAD_REQUEST
+        else:
+            status = expected
+        return json_response(status, {"count": len(ids)}, expected)
+
+    def batch_create_target_domain_managed_account(self, target_domain_id, td_params):
+        return self._batch(td_params, HTTPStatus.CREATED)
+
+    def batch_rotate_target_domain_managed_account(self, target_domain_id, td_params):
+        return self._batch(td_params, HTTPStatus.OK)
+
+    def batch_update_target_domain_managed_account(self, target_domain_id, td_params):
+        return self._batch(td_params, HTTPStatus.OK)
+
+
+def rotate(api, items, **kwargs):
+    kwargs.setdefault("retries", 2)
+    kwargs.setdefault("backoff", 0)
+    return api.batch_target_domain_managed_accounts_chunked(
+        "rotate", "td1", items, **kwargs
+    )
+
+
+def test_chunks_in_order():
+    api = FakeSecretsManager()
+
+    report = rotate(api, (f"a{i}" for i in range(250)), chunk_size=100)
+
+    assert [item for item, _ in report.results] == [f"a{i}" for i in range(250)]
+    assert report.succeeded == [f"a{i}" for i in range(250)]
+    assert sorted(len(body["ids"]) for body in api.bodies) == [50, 100, 100]
+    assert report.calls == 3
+
+
+def test_update_keeps_params():
+    api = FakeSecretsManager()
+
+    api.batch_target_domain_managed_accounts_chunked(
+        "update", "td1", ["a1", "a2"], td_params={"changes": {"enabled": False}}
+    )
+
+    assert api.bodies == [{"changes": {"enabled": False}, "ids": ["a1", "a2"]}]
+
+
+def test_failed_items_isolated():
+    api = FakeSecretsManager(bad={"a5"})
+
+    report = rotate(api, [f"a{i}" for i in range(8)], chunk_size=8, workers=1)
+
+    assert [item for item, _ in report.failed] == ["a5"]
+    assert report.failed[0][1].status == HTTPStatus.BAD_REQUEST
+    assert len(report.succeeded) == 7
+    # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1, the good halves are not resent
+    assert report.calls == 7
+    assert report.splits == 3
+
+
+def test_discovers_chunk_size():
+    api = FakeSecretsManager(max_chunk=30)
+
+    report = rotate(api, [f"a{i}" for i in range(300)], chunk_size=100, workers=1)
+
+    assert not report.failed
+    assert report.chunk_size == 25
+    assert max(len(body["ids"]) for body in api.bodies[-3:]) <= 25
+
+
+def test_transient_errors_retried():
+    api = FakeSecretsManager(flaky=2)
+
+    report = rotate(api, ["a1", "a2"], workers=1)
+
+    assert not report.failed
+    assert (report.calls, report.retries, report.splits) == (3, 2, 0)
+
+
+def test_fatal_errors_not_split():
+    api = FakeSecretsManager(status=HTTPStatus.FORBIDDEN)
+
+    report = rotate(api, [f"a{i}" for i in range(10)])
+
+    assert len(report.failed) == 10
+    assert report.calls == 1
+
+
+def test_refused_connection_fails_fast():
+    api = FakeSecretsManager(error=ConnectionRefusedError("refused"))
+
+    report = rotate(api, [f"a{i}" for i in range(400)], chunk_size=100)
+
+    assert len(report.failed) == 400
+    assert (report.calls, report.retries, report.splits) == (4, 0, 0)
+    assert report.chunk_size == 100
+
+
+def test_timeout_lowers_chunk_size():
+    api = FakeSecretsManager(error=socket.timeout("timed out"))
+
+    report = rotate(api, [f"a{i}" for i in range(4)], chunk_size=4, workers=1)
+
+    assert len(report.failed) == 4
+    assert report.chunk_size == 1
+    # 4 -> 2 + 2 -> 1 + 1 + 1 + 1, only the single items are retried
+    assert (report.calls, report.retries, report.splits) == (15, 8, 3)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"status": HTTPStatus.GATEWAY_TIMEOUT},
+        {"status": HTTPStatus.BAD_GATEWAY},
+        {"status": HTTPStatus.INTERNAL_SERVER_ERROR},
+        {"flaky": 1},
+        {"error": socket.timeout("timed out")},
+        {"error": ConnectionResetError("reset")},
+    ],
+)
+def test_ambiguous_create_not_resent(kwargs):
+    api = FakeSecretsManager(**kwargs)
+
+    report = api.batch_target_domain_managed_accounts_chunked(
+        "create", "td1", [{"username": f"u{i}"} for i in range(10)], backoff=0
+    )
+
+    assert len(report.failed) == 10
+    assert (report.calls, report.retries, report.splits) == (1, 0, 0)
+
+
+def test_create_split_on_rejected_items():
+    api = FakeSecretsManager(max_chunk=4)
+
+    report = api.batch_target_domain_managed_accounts_chunked(
+        "create", "td1", [{"username": f"u{i}"} for i in range(8)], chunk_size=8
+    )
+
+    assert not report.failed
+    assert report.chunk_size == 4
+
+
+def test_unknown_operation():
+    with pytest.raises(InternalAPIException):
+        FakeSecretsManager().batch_target_domain_managed_accounts_chunked(
+            "enable", "td1", ["a1"]
+        )
@@ -0,0 +1,178 @@
+from http import HTTPStatus
+from http.client import HTTPMessage
+from unittest import mock
+
+import pytest
+
+from privx_api.enums import UrlEnum
+from privx_api.exceptions import InternalAPIException
+from privx_api.hooks import HookEnum, RequestHooks
+from privx_api.privx_api import PrivXAPI
+
+
+class FakeResponse:
+    def __init__(self, status=HTTPStatus.OK, body=b"{}", headers=None):
+        self.status = status
+        self.headers = HTTPMessage()
+        for key, value in (headers or {}).items():
+            self.headers[key] = value
+        self._body = body
+
+    def getheaders(self):
+        return list(self.headers.items())
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def read(self, *args):
+        return self._body
+
+
+class FakeConnection:
+    def __init__(self, response=None, error=None):
+        self.response = response or FakeResponse()
+        self.error = error
+
+    def request(self, **kwargs):
+        if self.error:
+            raise self.error
+
+    def getresponse(self):
+        return self.response
+
+
+def make_api():
+    api = PrivXAPI("", 0, "", "", "")
+    api._re_auth_deadline = float("inf")
+    return api
+
+
+def test_registry_is_falsy_until_a_hook_is_registered():
+    hooks = RequestHooks()
+    callback = mock.Mock()
+
+    assert not hooks
+    hooks.register(HookEnum.BEFORE_REQUEST, callback)
+    assert hooks
+    hooks.unregister(HookEnum.BEFORE_REQUEST, callback)
+    assert not hooks
+
+
+@pytest.mark.parametrize("event", ["", "before", None])
+def test_register_unknown_event(event):
+    with pytest.raises(InternalAPIException):
+        RequestHooks().register(event, mock.Mock())
+
+
+def test_register_non_callable():
+    with pytest.raises(InternalAPIException):
+        RequestHooks().register(HookEnum.ON_ERROR, "not callable")
+
+
+def test_hooks_run_around_request():
+    api = make_api()
+    calls = []
+    api.add_hook(HookEnum.BEFORE_REQUEST, lambda req: calls.append(("before", req)))
+    api.add_hook(
+        HookEnum.AFTER_RESPONSE,
+        lambda req, status, headers, elapsed: calls.append(("after", status, headers)),
+    )
+    conn = FakeConnection(FakeResponse(headers={"X-Request-Id": "abc"}))
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = conn
+        status, data = api._http_get(UrlEnum.HOST_STORE.HOSTS)
+
+    assert status == HTTPStatus.OK
+    assert [c[0] for c in calls] == ["before", "after"]
+    assert calls[0][1]["url"] == "/host-store/api/v1/hosts"
+    assert calls[1][1:] == (HTTPStatus.OK, {"x-request-id": "abc"})
+
+
+def test_before_request_hook_can_add_headers():
+    api = make_api()
+    api.add_hook(
+        HookEnum.BEFORE_REQUEST,
+        lambda req: req["headers"].update({"traceparent": "00-trace"}),
+    )
+    conn = FakeConnection()
+    conn.request = mock.Mock()
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = conn
+        api._http_post(UrlEnum.HOST_STORE.SEARCH, body={})
+
+    assert conn.request.call_args.kwargs["headers"]["traceparent"] == "00-trace"
+
+
+def test_on_error_hook_receives_original_exception():
+    api = make_api()
+    on_error = mock.Mock()
+    after = mock.Mock()
+    api.add_hook(HookEnum.ON_ERROR, on_error)
+    api.add_hook(HookEnum.AFTER_RESPONSE, after)
+    error = ConnectionRefusedError("refused")
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = FakeConnection(error=error)
+        with pytest.raises(InternalAPIException):
+            api._http_delete(UrlEnum.HOST_STORE.HOSTS)
+
+    assert on_error.call_args.args[1] is error
+    after.assert_not_called()
+
+
+def test_removed_hook_is_not_called():
+    api = make_api()
+    callback = mock.Mock()
+    api.add_hook(HookEnum.BEFORE_REQUEST, callback)
+    api.remove_hook(HookEnum.BEFORE_REQUEST, callback)
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = FakeConnection()
+        api._http_get(UrlEnum.HOST_STORE.HOSTS)
+
+    callback.assert_not_called()
+
+
+def test_hook_added_during_a_request_waits_for_the_next_one():
+    api = make_api()
+    after = mock.Mock()
+    conn = FakeConnection()
+
+    def add_hook_meanwhile(**kwargs):
+        api.add_hook(HookEnum.AFTER_RESPONSE, after)
+
+    conn.request = add_hook_meanwhile
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = conn
+        status, _ = api._http_get(UrlEnum.HOST_STORE.HOSTS)
+        assert status == HTTPStatus.OK
+        after.assert_not_called()
+
+        conn.request = mock.Mock()
+        api._http_get(UrlEnum.HOST_STORE.HOSTS)
+
+    after.assert_called_once()
+
+
+def test_hooks_do_not_see_token_request_credentials():
+    api = PrivXAPI("", 0, "", "client-id", "client-secret")
+    before = mock.Mock()
+    api.add_hook(HookEnum.BEFORE_REQUEST, before)
+    conn = FakeConnection(
+        FakeResponse(body=b'{"access_token": "token", "expires_in": 300}')
+    )
+    conn.request = mock.Mock()
+
+    with mock.patch("privx_api.transport.Connection") as connection:
+        connection.return_value.__enter__.return_value = conn
+        api._authenticate("alice", "s3cret")
+
+    traced = before.call_args.args[0]
+    assert "s3cret" not in str(traced)
+    assert "client-secret" not in str(traced)
+    assert traced["url"] == conn.request.call_args.kwargs["url"]
+    assert "s3cret" in conn.request.call_args.kwargs["body"]
+    assert conn.request.call_args.kwargs["headers"]["Authorization"] != "<redacted>"
@@ -0,0 +1,159 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.host_mirror import HostStoreMirror
+from privx_api.response import PrivXAPIResponse
+from privx_api.tests.helpers import json_response
+from privx_api.utils import parse_time
+
+
+def make_host(index, updated="2021-01-01T00:00:00.000Z", **kwargs):
+    host = {
+        "id": f"host-{index}",
+        "common_name": f"Host-{index}",
+        "addresses": [f"10.0.0.{index}"],
+        "services": [{"service": "SSH", "address": f"srv-{index}.example.com"}],
+        "principals": [{"principal": "root"}, {"principal": f"user{index}"}],
+        "tags": [f"zone-{index % 2}"],
+        "updated": updated,
+    }
+    host.update(kwargs)
+    return host
+
+
+class FakeHostStore:
+    def __init__(self, hosts, max_limit=None):
+        self.hosts = {h["id"]: h for h in hosts}
+        self.max_limit = max_limit
+        self.calls = []
+        self.fail = False
+
+    def get_hosts(self, offset=0, limit=50, sort_key=None, sort_dir=None, **kwargs):
+        self.calls.append((offset, limit, sort_key, sort_dir))
+        if self.fail:
+            return PrivXAPIResponse(HTTPStatus.BAD_GATEWAY, HTTPStatus.OK, b"{}")
+        hosts = list(self.hosts.values())
+        if sort_key:
+            hosts.sort(
+                key=lambda h: parse_time(h[sort_key]), reverse=sort_dir == "desc"
+            )
+        limit = min(limit, self.max_limit or limit)
+        body = {"count": len(hosts), "items": hosts[offset : offset + limit]}
+        return json_response(HTTPStatus.OK, body)
+
+
+def test_snapshot_pages_through_hosts_and_indexes_them():
+    api = FakeHostStore([make_host(i) for i in range(5)])
+    mirror = HostStoreMirror(api, page_size=2)
+
+    assert mirror.sync() == 5
+    assert len(api.calls) == 3
+    assert mirror.get("host-3")["common_name"] == "Host-3"
+    assert [h["id"] for h in mirror.by_address("10.0.0.1")] == ["host-1"]
+    assert [h["id"] for h in mirror.by_address("SRV-2.example.com")] == ["host-2"]
+    assert [h["id"] for h in mirror.by_common_name("host-4")] == ["host-4"]
+    assert [h["id"] for h in mirror.by_tag("zone-1")] == ["host-1", "host-3"]
+    assert len(mirror.by_principal("root")) == 5
+    assert mirror.by_principal("nobody") == []
+
+
+def test_snapshot_with_clamped_limit():
+    api = FakeHostStore([make_host(i) for i in range(25)], max_limit=4)
+    mirror = HostStoreMirror(api, page_size=10)
+
+    assert mirror.sync() == 25
+    assert [offset for offset, *_ in api.calls] == list(range(0, 25, 4))
+    api.calls.clear()
+
+    assert mirror.sync() == 0
+    assert len(api.calls) == 1
+
+
+def test_incremental_sync_compares_parsed_times():
+    api = FakeHostStore([make_host(1, updated="2021-01-01T00:00:00Z")])
+    mirror = HostStoreMirror(api)
+    mirror.sync()
+    # sorts before the high water mark as a string, but is half a second later
+    api.hosts["host-1"] = make_host(1, updated="2021-01-01T00:00:00.5Z", tags=["x"])
+
+    assert mirror.sync() == 1
+    assert mirror.get("host-1")["tags"] == ["x"]
+
+
+def test_incremental_sync_fetches_only_changed_hosts():
+    api = FakeHostStore([make_host(i) for i in range(10)])
+    mirror = HostStoreMirror(api, page_size=3)
+    mirror.sync()
+    api.hosts["host-4"] = make_host(
+        4, updated="2021-02-01T00:00:00.000Z", tags=["moved"]
+    )
+    api.calls.clear()
+
+    assert mirror.sync() == 1
+    assert api.calls == [(0, 3, "updated", "desc")]
+    assert [h["id"] for h in mirror.by_tag("moved")] == ["host-4"]
+    assert "host-4" not in [h["id"] for h in mirror.by_tag("zone-0")]
+
+
+def test_count_mismatch_triggers_snapshot():
+    api = FakeHostStore([make_host(i) for i in range(4)])
+    mirror = HostStoreMirror(api)
+    mirror.sync()
+    del api.hosts["host-2"]
+
+    mirror.sync()
+
+    assert mirror.get("host-2") is None
+    assert mirror.by_address("10.0.0.2") == []
+    assert len(mirror) == 3
+
+
+def test_deletion_offset_by_missed_create_is_fixed_by_periodic_snapshot(tmp_path):
+    path = str(tmp_path / "hosts.sqlite")
+    api = FakeHostStore([make_host(i) for i in range(4)])
+    with HostStoreMirror(api, path=path, snapshot_interval=60) as mirror:
+        mirror.sync()
+    # the count stays 4 and the create ties with the high water mark
+    del api.hosts["host-2"]
+    api.hosts["host-7"] = make_host(7)
+    started = time.time()
+
+    with HostStoreMirror(api, path=path, snapshot_interval=60) as mirror:
+        with mock.patch("time.time", return_value=started + 30):
+            mirror.sync()
+        assert mirror.get("host-2") is not None
+        with mock.patch("time.time", return_value=started + 61):
+            assert mirror.sync() == 4
+
+        assert mirror.get("host-2") is None
+        assert mirror.get("host-7")["common_name"] == "Host-7"
+
+
+def test_failed_page_raises():
+    api = FakeHostStore([make_host(1)])
+    api.fail = True
+
+    with pytest.raises(InternalAPIException):
+        HostStoreMirror(api).sync()
+
+
+def test_persisted_mirror_resumes_with_incremental_sync(tmp_path):
+    path = str(tmp_path / "hosts.sqlite")
+    api = FakeHostStore([make_host(i) for i in range(3)])
+    with HostStoreMirror(api, path=path) as mirror:
+        mirror.sync()
+    api.hosts["host-9"] = make_host(9, updated="2021-03-01T00:00:00.000Z")
+    api.calls.clear()
+
+    with HostStoreMirror(api, path=path) as mirror:
+        assert len(mirror) == 3
+        assert mirror.sync() == 1
+        assert mirror.get("host-9")["common_name"] == "Host-9"
+    with HostStoreMirror(api, path=path) as mirror:
+        assert len(mirror) == 4
+
+    assert all(call[2] == "updated" for call in api.calls)
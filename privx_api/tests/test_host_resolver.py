@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from privx_api.host_mirror import HostStoreMirror
+from privx_api.host_resolver import HostResolver, ResolveIndex
+from privx_api.tests.helpers import json_response
+from privx_api.tests.test_host_mirror import FakeHostStore, make_host
+
+
+def host(host_id, addresses, services=()):
+    return {
+        "id": host_id,
+        "addresses": addresses,
+        "services": [
+            {"service": service, "address": address, "port": port}
+            for service, address, port in services
+        ],
+    }
+
+
+@pytest.fixture
+def index():
+    index = ResolveIndex()
+    for h in (
+        host("web", ["10.0.0.5", "web.example.com"]),
+        host(
+            "db",
+            ["10.0.0.6"],
+            [("SSH", "db.example.com", 22), ("RDP", "db.example.com", 3389)],
+        ),
+        host("db-replica", [], [("SSH", "db.example.com", 2222)]),
+        host("jump", [], [("SSH", "jump.example.com", None)]),
+        host("lan", ["10.0.0.0/16"]),
+        host("subnet", ["10.0.3.0/24"]),
+        host("v6", ["2001:db8::/32"]),
+        host("wild", ["*.lab.example.com"]),
+        host("pattern", ["node-??.example.org"]),
+    ):
+        index.put(h)
+    return index
+
+
+@pytest.mark.parametrize(
+    "address, service, port, expected",
+    [
+        ("10.0.0.5", "", 0, {"web"}),
+        ("WEB.example.com", "ssh", 22, {"web"}),
+        ("db.example.com", "SSH", 22, {"db"}),
+        ("db.example.com", "SSH", 2222, {"db-replica"}),
+        ("db.example.com", "rdp", 0, {"db"}),
+        ("db.example.com", "SSH", 0, {"db", "db-replica"}),
+        ("db.example.com", "SSH", 2200, set()),
+        ("db.example.com", "RDP", 3390, set()),
+        ("jump.example.com", "SSH", 2222, {"jump"}),
+        ("10.0.9.9", "", 0, {"lan"}),
+        ("10.0.3.7", "", 0, {"subnet"}),
+        ("2001:db8::1", "", 0, {"v6"}),
+        ("a.b.lab.example.com", "", 0, {"wild"}),
+        ("node-12.example.org", "", 0, {"pattern"}),
+        ("node-123.example.org", "", 0, set()),
+        ("192.168.0.1", "", 0, set()),
+    ],
+)
+def test_lookup(index, address, service, port, expected):
+    assert index.lookup(address, service, port) == expected
+
+
+def test_removed_host_is_not_found(index):
+    index.remove("subnet")
+    index.remove("wild")
+
+    assert index.lookup("10.0.3.7") == {"lan"}
+    assert index.lookup("x.lab.example.com") == set()
+
+
+def resolved(host):
+    return json_response(HTTPStatus.OK, host)
+
+
+def test_resolver_answers_locally_and_falls_back_on_miss():
+    api = FakeHostStore([make_host(i) for i in range(3)])
+    api.resolve_host = mock.Mock(return_value=resolved({"id": "remote"}))
+    mirror = HostStoreMirror(api)
+    mirror.sync()
+    resolver = HostResolver(api, mirror)
+
+    assert resolver.resolve({"address": "10.0.0.1"})["id"] == "host-1"
+    assert resolver.resolve({"service": "SSH", "address": "srv-2.example.com"})[
+        "id"
+    ] == ("host-2")
+    assert resolver.resolve({"address": "192.168.1.1"}) == {"id": "remote"}
+    api.resolve_host.assert_called_once_with({"address": "192.168.1.1"})
+    assert (resolver.hits, resolver.misses) == (2, 1)
+
+
+def test_resolver_follows_mirror_sync():
+    api = FakeHostStore([make_host(i) for i in range(3)])
+    mirror = HostStoreMirror(api)
+    resolver = HostResolver(api, mirror, fallback=False)
+    assert resolver.resolve({"address": "10.0.0.1"}) is None
+
+    mirror.sync()
+    api.hosts["host-1"] = make_host(
+        1, updated="2021-02-01T00:00:00.000Z", addresses=["10.1.0.1"]
+    )
+    mirror.sync()
+
+    assert resolver.resolve({"address": "10.0.0.1"}) is None
+    assert resolver.resolve({"address": "10.1.0.1"})["id"] == "host-1"
+
+
+def test_resolver_counts_from_many_threads():
+    api = FakeHostStore([make_host(i) for i in range(3)])
+    mirror = HostStoreMirror(api)
+    mirror.sync()
+    resolver = HostResolver(api, mirror, fallback=False)
+    addresses = ["10.0.0.1", "192.168.1.1"] * 2000
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda a: resolver.resolve({"address": a}), addresses))
+
+    assert (resolver.hits, resolver.misses) == (2000, 2000)
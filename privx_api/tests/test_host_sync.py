@@ -0,0 +1,158 @@
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.host_sync import diff_hosts
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+def make_host(index, **kwargs):
+    host = {
+        "id": f"host-{index}",
+        "common_name": f"host-{index}",
+        "addresses": [f"10.0.0.{index}"],
+        "principals": [
+            {"principal": "root", "roles": [{"id": "r1", "name": "admins"}]}
+        ],
+        "created": "2021-01-01T00:00:00.000Z",
+    }
+    host.update(kwargs)
+    return host
+
+
+class FakeHostStore(FakePrivXAPI):
+    def __init__(self, hosts, fail=()):
+        super().__init__()
+        self.hosts = {h["id"]: h for h in hosts}
+        self.fail = set(fail)
+        self.calls = []
+
+    def get_hosts(self, offset=0, limit=50, **kwargs):
+        hosts = list(self.hosts.values())
+        body = {"count": len(hosts), "items": hosts[offset : offset + limit]}
+        return json_response(HTTPStatus.OK, body)
+
+    def _call(self, name, host_id, host=None, expected=HTTPStatus.OK):
+        with self.lock:
+            self.calls.append((name, host_id))
+            if host_id in self.fail:
+                return json_response(HTTPStatus.BAD_REQUEST, {"error": "BAD"}, expected)
+            if host is None:
+                del self.hosts[host_id]
+            else:
+                self.hosts[host_id] = dict(host, id=host_id)
+        return json_response(expected, {"id": host_id}, expected)
+
+    def create_host(self, host):
+        return self._call("create", host["common_name"], host, HTTPStatus.CREATED)
+
+    def update_host(self, host_id, host):
+        return self._call("update", host_id, host)
+
+    def delete_host(self, host_id):
+        return self._call("delete", host_id)
+
+
+def desired(index, **kwargs):
+    host = {
+        "common_name": f"host-{index}",
+        "addresses": [f"10.0.0.{index}"],
+        "principals": [{"principal": "root", "roles": [{"id": "r1"}]}],
+    }
+    host.update(kwargs)
+    return host
+
+
+def test_diff_matches_by_external_id_address_and_common_name():
+    current = [
+        make_host(1, external_id="ext-1", common_name="old-name"),
+        make_host(2),
+        make_host(3, addresses=["db.example.com"]),
+        make_host(4),
+    ]
+    hosts = [
+        desired(1, external_id="ext-1", addresses=["10.0.0.9"]),
+        desired(2, addresses=["10.0.0.2", "10.0.1.2"]),
+        desired(3, addresses=["DB.example.com"]),
+        desired(5),
+        desired(6, addresses=["10.0.0.2"]),
+    ]
+
+    plan = diff_hosts(hosts, current, prune=True)
+
+    assert [h["common_name"] for h in plan.creates] == ["host-5"]
+    assert [host_id for host_id, _ in plan.updates] == ["host-1", "host-2", "host-3"]
+    assert plan.updates[0][1]["created"] == "2021-01-01T00:00:00.000Z"
+    assert plan.unchanged == 0
+    assert plan.deletes == ["host-4"]
+    assert [h["common_name"] for h in plan.duplicates] == ["host-6"]
+
+
+def test_unchanged_ignores_order_server_fields_and_passphrases():
+    current = [make_host(1, addresses=["10.0.0.1", "h1.example.com"])]
+    host = desired(1, addresses=["h1.example.com", "10.0.0.1"])
+    host["principals"][0]["passphrase"] = "secret"
+
+    plan = diff_hosts([host], current)
+
+    assert len(plan) == 0
+    assert plan.unchanged == 1
+
+
+def test_sync_applies_only_needed_calls():
+    api = FakeHostStore([make_host(i) for i in range(1, 5)], fail={"host-3"})
+    hosts = [desired(1), desired(2, tags=["new"]), desired(5)]
+
+    report = api.sync_hosts(hosts, prune=True, workers=3)
+
+    assert sorted(api.calls) == [
+        ("create", "host-5"),
+        ("delete", "host-3"),
+        ("delete", "host-4"),
+        ("update", "host-2"),
+    ]
+    assert report.counts == {
+        "created": 1,
+        "updated": 1,
+        "deleted": 1,
+        "unchanged": 1,
+        "failed": 1,
+        "duplicate": 0,
+    }
+    assert report.failures == [
+        {
+            "operation": "delete",
+            "host_id": "host-3",
+            "common_name": None,
+            "error": {"status": HTTPStatus.BAD_REQUEST, "details": {"error": "BAD"}},
+        }
+    ]
+    assert api.hosts["host-2"]["tags"] == ["new"]
+    assert report.operations_per_second > 0
+
+
+def test_dry_run_makes_no_calls():
+    api = FakeHostStore([make_host(1), make_host(2)])
+
+    report = api.sync_hosts([desired(1, tags=["x"]), desired(3)], dry_run=True)
+
+    assert api.calls == []
+    assert report.counts["updated"] == 1
+    assert report.counts["created"] == 1
+    assert str(report).startswith("dry run, ")
+
+
+def test_incomplete_listing_aborts_sync():
+    api = FakeHostStore([make_host(i) for i in range(1, 5)])
+    get_hosts = api.get_hosts
+
+    def partial(offset=0, limit=50, **kwargs):
+        # the server reports every host but drops the last one
+        return get_hosts(offset=offset, limit=min(limit, 3 - offset))
+
+    api.get_hosts = partial
+
+    with pytest.raises(InternalAPIException):
+        api.sync_hosts([desired(1)], prune=True)
+    assert api.calls == []
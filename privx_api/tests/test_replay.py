@@ -0,0 +1,206 @@
+import json
+import time
+from http import HTTPStatus
+from http.client import HTTPMessage
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.privx_api import PrivXAPI
+from privx_api.replay import (
+    REDACTED_TOKEN,
+    ExchangeWriter,
+    _RecordingResponse,
+    record_exchanges,
+    replay_exchanges,
+)
+from privx_api.transport import Transport
+
+TOKEN_EXCHANGE = {
+    "method": "POST",
+    "url": "/auth/api/v1/oauth/token",
+    "request_body": None,
+    "status": 200,
+    "headers": [["Content-Type", "application/json"]],
+    "body": json.dumps({"access_token": REDACTED_TOKEN, "expires_in": 300}),
+}
+
+
+def host_exchange(host_id, name):
+    return {
+        "method": "GET",
+        "url": f"/host-store/api/v1/hosts/{host_id}",
+        "request_body": None,
+        "status": 200,
+        "headers": [
+            ["Content-Type", "application/json"],
+            ["Set-Cookie", "ROUTE=node-1; Path=/"],
+        ],
+        "body": json.dumps({"id": host_id, "common_name": name}),
+    }
+
+
+def write_recording(path, exchanges):
+    writer = ExchangeWriter(str(path))
+    for exchange in exchanges:
+        writer.write(exchange)
+    writer.close()
+
+
+@pytest.mark.parametrize("filename", ["exchanges.jsonl", "exchanges.jsonl.gz"])
+def test_replay_serves_recorded_responses(tmp_path, filename):
+    path = tmp_path / filename
+    write_recording(
+        path, [TOKEN_EXCHANGE, host_exchange("1", "one"), host_exchange("2", "two")]
+    )
+    api = PrivXAPI("privx.example.com", 443, "", "", "", use_cookies=True)
+    transport = api._transport
+
+    with replay_exchanges(api, str(path)):
+        api.authenticate("client", "secret")
+        second = api.get_host("2")
+        first = api.get_host("1")
+
+    assert first.data == {"id": "1", "common_name": "one"}
+    assert second.data == {"id": "2", "common_name": "two"}
+    assert second.headers["content-type"] == "application/json"
+    assert api._cookie_jar.get_header("privx.example.com", "/") == "ROUTE=node-1"
+    assert api._transport is transport
+
+
+def test_replay_unknown_request(tmp_path):
+    path = tmp_path / "exchanges.jsonl"
+    write_recording(path, [TOKEN_EXCHANGE])
+    api = PrivXAPI("privx.example.com", 443, "", "", "")
+
+    with replay_exchanges(api, str(path)):
+        api.authenticate("client", "secret")
+        with pytest.raises(InternalAPIException):
+            api.get_host("1")
+
+
+def test_replay_stream_with_original_timing(tmp_path):
+    path = tmp_path / "exchanges.jsonl"
+    trail = {
+        "method": "GET",
+        "url": "/connection-manager/api/v1/connections/c/channel/1/file/f/s",
+        "request_body": None,
+        "status": 200,
+        "headers": [["Content-Type", "application/octet-stream"]],
+        "body": "abcdef",
+        "elapsed": 0.02,
+        "chunks": [[0.02, 3], [0.06, 3]],
+    }
+    write_recording(path, [TOKEN_EXCHANGE, trail])
+    api = PrivXAPI("privx.example.com", 443, "", "", "")
+
+    with replay_exchanges(api, str(path), original_timing=True):
+        api.authenticate("client", "secret")
+        started = time.monotonic()
+        response = api.download_trail("c", "1", "f", "s")
+        chunks = list(response.iter_content(chunk_size=3))
+        elapsed = time.monotonic() - started
+
+    assert response.status == HTTPStatus.OK
+    assert chunks == [b"abc", b"def"]
+    assert elapsed >= 0.06
+
+
+class FakeResponse:
+    status = 200
+    reason = "OK"
+
+    def __init__(self, body):
+        self._body = body
+        self.headers = self.msg = HTTPMessage()
+
+    def read(self, amt=None):
+        if amt is None:
+            amt = len(self._body)
+        data, self._body = self._body[:amt], self._body[amt:]
+        return data
+
+    def getheader(self, name, default=None):
+        return default
+
+    def getheaders(self):
+        return []
+
+    def close(self):
+        return None
+
+
+def read_recording(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_recording_captures_chunks_and_binary_body(tmp_path):
+    path = str(tmp_path / "exchanges.jsonl")
+    writer = ExchangeWriter(path)
+    exchange = {"method": "GET", "url": "/x", "url_name": None}
+    response = _RecordingResponse(
+        FakeResponse(b"\xff\xfe\x00\x01"), exchange, writer, time.monotonic()
+    )
+
+    assert response.read(2) + response.read(2) + response.read(2) == (
+        b"\xff\xfe\x00\x01"
+    )
+    response.close()
+    writer.close()
+
+    [recorded] = read_recording(path)
+    assert recorded["encoding"] == "base64"
+    assert [size for _, size in recorded["chunks"]] == [2, 2]
+    assert "url_name" not in recorded
+
+
+def test_recording_redacts_access_token(tmp_path):
+    path = str(tmp_path / "exchanges.jsonl")
+    writer = ExchangeWriter(path)
+    exchange = {"method": "POST", "url": "/token", "url_name": "AUTH.TOKEN"}
+    body = json.dumps({"access_token": "real-token", "expires_in": 300})
+    response = _RecordingResponse(
+        FakeResponse(body.encode("utf-8")), exchange, writer, time.monotonic()
+    )
+
+    response.read()
+    writer.close()
+
+    [recorded] = read_recording(path)
+    assert "real-token" not in recorded["body"]
+    assert json.loads(recorded["body"])["access_token"] == REDACTED_TOKEN
+
+
+class StaticTransport(Transport):
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def send(self, request, on_retry=None):
+        body = self.bodies[request["url"].split("?", 1)[0]]
+        return FakeResponse(body), body
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "exchanges.jsonl")
+    token = json.dumps({"access_token": "real-token", "expires_in": 300})
+    transport = StaticTransport(
+        {
+            "/auth/api/v1/oauth/token": token.encode("utf-8"),
+            "/host-store/api/v1/hosts/1": b'{"id": "1"}',
+        }
+    )
+    api = PrivXAPI("privx.example.com", 443, "", "", "", transport=transport)
+
+    with record_exchanges(api, path):
+        api.authenticate("client", "secret")
+        recorded = api.get_host("1")
+
+    assert api._transport is transport
+    assert "real-token" not in open(path).read()
+    offline = PrivXAPI("privx.example.com", 443, "", "", "")
+    with replay_exchanges(offline, path):
+        offline.authenticate("client", "secret")
+        replayed = offline.get_host("1")
+
+    assert replayed.data == recorded.data == {"id": "1"}
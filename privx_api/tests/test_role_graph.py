@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.role_graph import RoleGraph
+from privx_api.tests.helpers import json_response
+from privx_api.utils import fetch_all_items
+
+
+def page(items, offset, limit, status=HTTPStatus.OK):
+    body = {"count": len(items), "items": items[offset : offset + limit]}
+    return json_response(status, body)
+
+
+class FakeRoleStore:
+    def __init__(self):
+        self.roles = [{"id": "admins"}, {"id": "devs"}, {"id": "empty"}]
+        self.members = {
+            "admins": [{"id": "u1", "principal": "Alice"}],
+            "devs": [
+                {"id": "u1", "principal": "Alice"},
+                {"id": "u2", "principal": "bob"},
+                {"id": "u3", "principal": "carol"},
+            ],
+            "empty": [],
+        }
+        self.hosts = [
+            {
+                "id": "db",
+                "principals": [
+                    {"principal": "root", "roles": [{"id": "admins"}]},
+                    {"principal": "app", "roles": [{"id": "devs"}]},
+                ],
+            },
+            {
+                "id": "web",
+                "principals": [{"principal": "deploy", "roles": [{"id": "devs"}]}],
+            },
+            {"id": "orphan", "principals": []},
+        ]
+
+    def get_roles(self, offset=0, limit=50):
+        return page(self.roles, offset, limit)
+
+    def get_role_members(self, role_id, offset=0, limit=50):
+        return page(self.members[role_id], offset, limit)
+
+    def get_hosts(self, offset=0, limit=50):
+        return page(self.hosts, offset, limit)
+
+
+@pytest.fixture
+def graph():
+    return RoleGraph.load(FakeRoleStore(), workers=2, page_size=2)
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+def test_adjacency(graph):
+    assert ids(graph.user_roles("u1")) == ["admins", "devs"]
+    assert ids(graph.role_users("devs")) == ["u1", "u2", "u3"]
+    assert ids(graph.role_users("empty")) == []
+    assert ids(graph.role_hosts("devs")) == ["db", "web"]
+    assert ids(graph.user_hosts("u2")) == ["db", "web"]
+    assert graph.user_id("alice") == "u1"
+    assert "orphan" not in graph.hosts
+
+
+def test_host_access(graph):
+    assert graph.host_access("db") == {
+        "u1": {"root", "app"},
+        "u2": {"app"},
+        "u3": {"app"},
+    }
+    assert ids(graph.host_users("web")) == ["u1", "u2", "u3"]
+    assert graph.host_access("missing") == {}
+
+
+def test_load_with_given_hosts():
+    api = FakeRoleStore()
+    hosts = api.hosts[1:]
+    api.get_hosts = None
+
+    graph = RoleGraph.load(api, hosts=hosts)
+
+    assert ids(graph.user_hosts("u1")) == ["web"]
+
+
+@pytest.mark.parametrize("workers", [0, 3])
+def test_fetch_all_items(workers):
+    items = list(range(10))
+    calls = []
+
+    def fetch(offset, limit):
+        calls.append(offset)
+        return page(items, offset, limit)
+
+    if workers:
+        with ThreadPoolExecutor(workers) as executor:
+            assert fetch_all_items(fetch, 3, executor) == items
+    else:
+        assert fetch_all_items(fetch, 3) == items
+    assert sorted(calls) == [0, 3, 6, 9]
+
+
+def test_fetch_all_items_failed_page():
+    with pytest.raises(InternalAPIException):
+        fetch_all_items(lambda o, l: page([], o, l, HTTPStatus.FORBIDDEN))
+
+
+@pytest.mark.parametrize("workers", [0, 3])
+def test_fetch_all_items_clamped_limit(workers):
+    # the server returns at most 4 items, one page only 2
+    items = list(range(23))
+
+    def fetch(offset, limit):
+        limit = min(limit, 2 if offset == 8 else 4)
+        return page(items, offset, limit)
+
+    if workers:
+        with ThreadPoolExecutor(workers) as executor:
+            assert fetch_all_items(fetch, 10, executor) == items
+    else:
+        assert fetch_all_items(fetch, 10) == items
+
+
+def test_fetch_all_items_clamped_without_count():
+    # without a count a short page can only be taken as the last one
+    items = list(range(10))
+
+    def fetch(offset, limit):
+        body = {"items": items[offset : offset + min(limit, 4)]}
+        return json_response(HTTPStatus.OK, body)
+
+    assert fetch_all_items(fetch, 4) == items
+    assert fetch_all_items(fetch, 5) == items[:4]
+
+
+def test_load_with_clamped_limit():
+    api = FakeRoleStore()
+    api.hosts = [
+        dict(host, id=f"{host['id']}{i}") for i in range(5) for host in api.hosts
+    ]
+    get_hosts = api.get_hosts
+    api.get_hosts = lambda offset=0, limit=50: get_hosts(offset, min(limit, 2))
+
+    graph = RoleGraph.load(api, page_size=10)
+
+    assert len(graph.role_hosts("devs")) == 10
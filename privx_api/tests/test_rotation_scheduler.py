@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import Counter
+from http import HTTPStatus
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.rotation_scheduler import ROTATED, RotationScheduler
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeSecretsManager(FakePrivXAPI):
+    def __init__(self, delay=0.0, failing=()):
+        super().__init__()
+        self.delay = delay
+        self.failing = set(failing)
+        self.calls = []
+        self.started = []
+
+    def _rotate(self, groups, target):
+        with self.lock:
+            self.calls.append(target)
+            self.started.append(time.monotonic())
+        with self.tracked(*groups):
+            time.sleep(self.delay)
+            if target in self.failing:
+                raise InternalAPIException("connection reset")
+            return json_response(HTTPStatus.OK, {})
+
+    def rotate_host_password(self, host_id, account):
+        return self._rotate(("hosts", host_id), host_id)
+
+    def rotate_target_domain_managed_account(self, target_domain_id, account_id):
+        return self._rotate((target_domain_id,), account_id)
+
+
+def accounts(domain, count):
+    return [(domain, f"{domain}-a{i}") for i in range(count)]
+
+
+def test_caps_concurrency_per_domain():
+    api = FakeSecretsManager(delay=0.02)
+    managed = accounts("td1", 12) + accounts("td2", 4)
+
+    report = api.rotate_passwords(
+        hosts=[("h1", "root"), ("h2", "root")],
+        managed_accounts=managed,
+        per_domain=2,
+        workers=6,
+    )
+
+    assert report.counts == Counter(rotated=18)
+    assert report.rotations_per_second > 0
+    assert api.max_in_flight["td1"] == 2
+    assert max(api.max_in_flight.values()) <= 2
+    # interleaved, the small domains are not left to the end
+    assert api.calls[:3] == ["h1", "td1-a0", "td2-a0"]
+
+
+def test_caps_host_accounts_per_host():
+    api = FakeSecretsManager(delay=0.05)
+    hosts = [(f"h{i}", "root") for i in range(4)] + [("h0", f"u{i}") for i in range(3)]
+
+    report = api.rotate_passwords(hosts=hosts, per_domain=2, workers=8)
+
+    assert report.counts == Counter(rotated=7)
+    # hosts do not share one domain limit, every host gets its own
+    assert api.max_in_flight["hosts"] > 2
+    assert api.max_in_flight["h0"] == 2
+
+
+def test_spreads_over_window():
+    api = FakeSecretsManager()
+
+    report = api.rotate_passwords(managed_accounts=accounts("td1", 5), window=0.2)
+
+    gaps = [b - a for a, b in zip(api.started, api.started[1:])]
+    assert min(gaps) >= 0.03
+    assert report.elapsed >= 0.16
+
+
+def test_resumes_failed_rotations(tmp_path):
+    log_path = str(tmp_path / "rotation.jsonl")
+    api = FakeSecretsManager(failing={"td1-a1"})
+
+    report = api.rotate_passwords(
+        managed_accounts=accounts("td1", 3) * 2, log_path=log_path
+    )
+    assert report.counts == Counter(rotated=2, failed=1, duplicate=3)
+    assert report.failures[0]["key"] == "managed:td1:td1-a1"
+
+    api.failing.clear()
+    api.calls.clear()
+    report = api.rotate_passwords(
+        managed_accounts=accounts("td1", 3), log_path=log_path
+    )
+
+    assert api.calls == ["td1-a1"]
+    assert report.counts == Counter(rotated=1, skipped=2)
+
+
+def test_stop_interrupts_run():
+    api = FakeSecretsManager()
+    scheduler = RotationScheduler(
+        api.rotate_host_password,
+        api.rotate_target_domain_managed_account,
+        window=10,
+    )
+    threading.Timer(0.1, scheduler.stop).start()
+
+    report = scheduler.run(managed_accounts=accounts("td1", 100))
+
+    assert report.interrupted
+    assert report.counts[ROTATED] == len(api.calls) < 100
+    assert report.elapsed < 1
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeVault(FakePrivXAPI):
+    def __init__(self):
+        super().__init__()
+        self.secrets = {}
+        self.calls = []
+
+    def put(self, name, password, version=1, user_id=""):
+        self.secrets[(user_id, name)] = {
+            "name": name,
+            "data": {"password": password},
+            "version": version,
+            "updated": f"2021-01-0{version}T00:00:00Z",
+        }
+
+    def _lookup(self, kind, user_id, name, metadata):
+        self.calls.append((kind, name))
+        secret = self.secrets.get((user_id, name))
+        if secret is None:
+            return json_response(HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"})
+        if metadata:
+            secret = {k: v for k, v in secret.items() if k != "data"}
+        return json_response(HTTPStatus.OK, secret)
+
+    def get_secret(self, name):
+        return self._lookup("secret", "", name, False)
+
+    def get_secret_metadata(self, name):
+        return self._lookup("metadata", "", name, True)
+
+    def get_user_secret(self, user_id, name):
+        return self._lookup("secret", user_id, name, False)
+
+    def get_user_secret_metadata(self, user_id, name):
+        return self._lookup("metadata", user_id, name, True)
+
+
+@pytest.fixture
+def vault():
+    vault = FakeVault()
+    vault.put("db", "one")
+    vault.put("web", "two")
+    return vault
+
+
+def test_serves_from_cache_within_ttl(vault):
+    cache = vault.secret_cache(ttl=60)
+
+    assert cache.get("db")["data"] == {"password": "one"}
+    cache.get("db")["data"]["password"] = "changed by caller"
+
+    assert cache.get("db")["data"] == {"password": "one"}
+    assert vault.calls == [("secret", "db")]
+    assert cache.hits == 2
+
+
+def test_revalidates_with_metadata_after_ttl(vault):
+    cache = vault.secret_cache(ttl=0)
+    cache.get("db")
+
+    assert cache.get("db")["data"] == {"password": "one"}
+    vault.put("db", "rotated", version=2)
+    assert cache.get("db")["data"] == {"password": "rotated"}
+
+    assert vault.calls == [
+        ("secret", "db"),
+        ("metadata", "db"),
+        ("metadata", "db"),
+        ("secret", "db"),
+    ]
+    assert (cache.revalidations, cache.fetches) == (1, 2)
+
+
+def test_refetches_when_metadata_has_no_version(vault):
+    for secret in vault.secrets.values():
+        del secret["version"], secret["updated"]
+    cache = vault.secret_cache(ttl=0)
+    cache.get("db")
+
+    assert cache.get("db")["data"] == {"password": "one"}
+    assert vault.calls[1:] == [("metadata", "db"), ("secret", "db")]
+    assert (cache.revalidations, cache.fetches) == (0, 2)
+
+
+def test_user_secrets_are_cached_separately(vault):
+    vault.put("db", "mine", user_id="u1")
+    cache = vault.secret_cache()
+
+    assert cache.get_user_secret("u1", "db")["data"] == {"password": "mine"}
+    assert cache.get("db")["data"] == {"password": "one"}
+    assert len(cache) == 2
+
+
+def test_eviction_zeroes_buffers(vault):
+    cache = vault.secret_cache(max_entries=1)
+    cache.get("db")
+    (entry,) = cache._entries.values()
+    buffer = entry.buffer
+
+    cache.get("web")
+
+    assert len(cache) == 1
+    assert buffer == bytearray(len(buffer))
+    (entry,) = cache._entries.values()
+    buffer = entry.buffer
+    cache.clear()
+    assert not any(buffer)
+
+
+def test_max_bytes_bounds_the_cache(vault):
+    cache = vault.secret_cache(max_bytes=150)
+
+    cache.get("db")
+    cache.get("web")
+
+    assert len(cache) == 1
+    assert cache._bytes <= 150
+
+
+def test_deleted_secret_is_evicted(vault):
+    cache = vault.secret_cache(ttl=0)
+    cache.get("db")
+    del vault.secrets[("", "db")]
+
+    with pytest.raises(InternalAPIException):
+        cache.get("db")
+    assert len(cache) == 0
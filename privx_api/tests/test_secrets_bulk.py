@@ -0,0 +1,53 @@
+import time
+from http import HTTPStatus
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeVault(FakePrivXAPI):
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+
+    def get_user_secret(self, user_id, name):
+        with self.tracked():
+            time.sleep(self.delay)
+            if name == "broken":
+                raise InternalAPIException("connection reset")
+            if name == "missing":
+                return json_response(HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"})
+            return json_response(HTTPStatus.OK, {"name": name, "owner": user_id})
+
+    def get_secret(self, name):
+        return self.get_user_secret(None, name)
+
+
+def test_bulk_fetch_is_bounded_and_concurrent():
+    api = FakeVault(delay=0.02)
+    names = [f"secret-{i}" for i in range(16)]
+
+    start = time.perf_counter()
+    responses = api.get_secrets_bulk(names + names[:4], workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert list(responses) == names
+    assert all(r.ok for r in responses.values())
+    assert api.max_in_flight["all"] == 4
+    assert elapsed < 16 * 0.02 / 2
+
+
+def test_per_item_errors():
+    api = FakeVault()
+
+    responses = api.get_user_secrets_bulk("u1", ["ok", "missing", "broken"])
+
+    assert responses["ok"].data == {"name": "ok", "owner": "u1"}
+    assert responses["missing"].status == HTTPStatus.NOT_FOUND
+    assert not responses["broken"].ok
+    assert responses["broken"].status == 0
+    assert responses["broken"].data["details"] == {"error": "connection reset"}
+
+
+def test_empty_batch():
+    assert FakeVault().get_secrets_bulk([]) == {}
@@ -0,0 +1,168 @@
+import base64
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+
+from privx_api import certificates
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+def ssh_string(value):
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return struct.pack(">I", len(value)) + value
+
+
+def ssh_cert(valid_after, valid_before):
+    cert_type = "ssh-ed25519-cert-v01@openssh.com"
+    blob = (
+        ssh_string(cert_type)
+        + ssh_string(b"nonce")
+        + ssh_string(b"k" * 32)
+        + struct.pack(">QI", 7, 1)
+        + ssh_string("alice@example.com")
+        + ssh_string(ssh_string("alice"))
+        + struct.pack(">QQ", int(valid_after), int(valid_before))
+        + ssh_string(b"")
+        + ssh_string(b"")
+    )
+    return f"{cert_type} {base64.b64encode(blob).decode('ascii')} alice"
+
+
+def der(tag, content):
+    if len(content) < 0x80:
+        return bytes([tag, len(content)]) + content
+    size = (len(content).bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + len(content).to_bytes(size, "big") + content
+
+
+def x509_pem(not_before, not_after):
+    name = der(0x30, b"x" * 200)
+    tbs = der(
+        0x30,
+        der(0xA0, der(0x02, b"\x02"))
+        + der(0x02, b"\x01")
+        + der(0x30, b"")
+        + name
+        + der(
+            0x30,
+            der(0x17, not_before.strftime("%y%m%d%H%M%SZ").encode("ascii"))
+            + der(0x18, not_after.strftime("%Y%m%d%H%M%SZ").encode("ascii")),
+        ),
+    )
+    body = base64.encodebytes(der(0x30, tbs)).decode("ascii")
+    return f"-----BEGIN CERTIFICATE-----\n{body}-----END CERTIFICATE-----\n"
+
+
+class FakeAuthorizer(FakePrivXAPI):
+    def __init__(self, lifetime=3600, delay=0.0, status=HTTPStatus.OK):
+        super().__init__()
+        self.lifetime = lifetime
+        self.delay = delay
+        self.status = status
+        self.calls = []
+
+    def get_target_host_credentials(self, target_params):
+        with self.lock:
+            self.calls.append(target_params)
+            serial = len(self.calls)
+        time.sleep(self.delay)
+        now = time.time()
+        body = {
+            "serial": serial,
+            "certificates": [{"data": ssh_cert(now - 60, now + self.lifetime)}],
+        }
+        return json_response(self.status, body)
+
+
+def test_ssh_cert_validity():
+    assert certificates.ssh_cert_validity(ssh_cert(100, 200)) == (100, 200)
+    assert certificates.ssh_cert_validity(ssh_cert(0, 2**64 - 1)) == (
+        0,
+        float("inf"),
+    )
+    with pytest.raises(InternalAPIException):
+        certificates.ssh_cert_validity(ssh_cert(0, 1)[:60])
+
+
+def test_earliest_expiry_finds_nested_certificates():
+    not_after = datetime(2031, 5, 1, 12, 0, tzinfo=timezone.utc)
+    pem = x509_pem(datetime(2021, 5, 1, tzinfo=timezone.utc), not_after)
+    data = {
+        "ssh": [{"data": ssh_cert(0, not_after.timestamp() + 10)}],
+        "chain": pem + pem,
+        "other": 42,
+    }
+
+    assert certificates.earliest_expiry(data) == not_after.timestamp()
+    assert certificates.earliest_expiry({"password": "secret"}) is None
+
+
+def test_reuses_credentials_per_target():
+    api = FakeAuthorizer()
+    cache = api.target_credential_cache()
+
+    assert cache.get({"host": "a", "user": "root"})["serial"] == 1
+    assert cache.get({"user": "root", "host": "a"})["serial"] == 1
+    assert cache.get({"host": "b", "user": "root"})["serial"] == 2
+
+    assert len(api.calls) == 2
+    assert cache.hits == 1
+
+
+def test_expires_with_certificate():
+    api = FakeAuthorizer(lifetime=20)
+    cache = api.target_credential_cache(expiry_margin=30)
+
+    cache.get({"host": "a"})
+    cache.get({"host": "a"})
+
+    assert len(api.calls) == 2
+
+
+def test_refreshes_in_background_before_expiry():
+    api = FakeAuthorizer(delay=0.05)
+    cache = api.target_credential_cache(refresh_ahead=0)
+    cache.get({"host": "a"})
+
+    assert cache.get({"host": "a"})["serial"] == 1
+    assert cache.get({"host": "a"})["serial"] == 1
+    deadline = time.monotonic() + 2
+    while cache.fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(api.calls) == 2
+    assert cache.get({"host": "a"})["serial"] == 2
+
+
+def test_concurrent_misses_share_one_request():
+    api = FakeAuthorizer(delay=0.05)
+    cache = api.target_credential_cache()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get({"host": "a"})))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(api.calls) == 1
+    assert [r["serial"] for r in results] == [1] * 8
+
+
+def test_failed_fetch_raises_and_is_not_cached():
+    api = FakeAuthorizer(status=HTTPStatus.FORBIDDEN)
+    cache = api.target_credential_cache()
+
+    with pytest.raises(InternalAPIException):
+        cache.get({"host": "a"})
+    api.status = HTTPStatus.OK
+    assert cache.get({"host": "a"})["serial"] == 2
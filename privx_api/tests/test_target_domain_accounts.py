@@ -0,0 +1,113 @@
+import tracemalloc
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+def account(i):
+    return {
+        "id": f"acc-{i}",
+        "username": f"user{i}",
+        "email": f"user{i}@example.com",
+        "full_name": f"User {i}",
+        "state": "NEW",
+        "source_data": {"dn": f"CN=user{i},OU=People,DC=example,DC=com"},
+        "target_domain": {"id": "td1", "name": "example"},
+    }
+
+
+class FakeSecretsManager(FakePrivXAPI):
+    def __init__(self, total=2500, failing_offset=None):
+        super().__init__()
+        self.total = total
+        self.failing_offset = failing_offset
+        self.calls = []
+
+    def _page(self, name, offset, limit, **kwargs):
+        with self.lock:
+            self.calls.append((name, offset, limit, kwargs))
+        if offset == self.failing_offset:
+            return json_response(HTTPStatus.BAD_GATEWAY, {})
+        items = [account(i) for i in range(offset, min(offset + limit, self.total))]
+        return json_response(HTTPStatus.OK, {"count": self.total, "items": items})
+
+    def get_target_domain_accounts(self, target_domain_id, offset, limit, **kwargs):
+        return self._page("get", offset, limit, **kwargs)
+
+    def search_target_domain_accounts(self, target_domain_id, offset, limit, **kwargs):
+        return self._page("search", offset, limit, **kwargs)
+
+    def get_target_domain_managed_accounts(
+        self, target_domain_id, offset, limit, **kwargs
+    ):
+        return self._page("managed", offset, limit, **kwargs)
+
+
+def test_yields_compact_records_in_order():
+    api = FakeSecretsManager()
+
+    accounts = list(api.iter_target_domain_accounts("td1", page_size=1000))
+
+    assert [a.id for a in accounts] == [f"acc-{i}" for i in range(2500)]
+    assert accounts[7].username == "user7"
+    assert accounts[7].updated is None
+    assert isinstance(accounts[7], tuple)
+    assert not hasattr(accounts[7], "__dict__")
+    assert [offset for _, offset, _, _ in sorted(api.calls)] == [0, 1000, 2000]
+
+
+def test_search_and_selected_fields():
+    api = FakeSecretsManager(total=10)
+
+    accounts = list(
+        api.iter_target_domain_accounts(
+            "td1",
+            search_payload={"keywords": "user"},
+            fields=["id", "email"],
+            sort_key="username",
+        )
+    )
+
+    assert accounts[0]._fields == ("id", "email")
+    assert api.calls[0][0] == "search"
+    assert api.calls[0][3] == {
+        "sort_key": "username",
+        "sort_dir": None,
+        "search_payload": {"keywords": "user"},
+    }
+
+
+def test_managed_accounts():
+    api = FakeSecretsManager(total=3)
+
+    accounts = list(api.iter_target_domain_managed_accounts("td1"))
+
+    assert type(accounts[0]).__name__ == "ManagedAccount"
+    assert [a.enabled for a in accounts] == [None] * 3
+    assert api.calls[0][0] == "managed"
+
+
+def test_failed_page_raises():
+    api = FakeSecretsManager(failing_offset=1000)
+
+    with pytest.raises(InternalAPIException):
+        list(api.iter_target_domain_accounts("td1", page_size=1000))
+
+
+def streaming_peak(total):
+    api = FakeSecretsManager(total=total)
+    tracemalloc.start()
+    try:
+        for _ in api.iter_target_domain_accounts("td1", page_size=250, prefetch=2):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_stays_flat():
+    # the peak depends on the page size, not on the number of accounts
+    assert streaming_peak(6000) < streaming_peak(1500) * 1.5
@@ -0,0 +1,137 @@
+from http import HTTPStatus
+from unittest import mock
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+class FakeTrailIndex(FakePrivXAPI):
+    """
+    Connection i is indexed after i % 3 status polls, ids ending in "x" fail.
+    """
+
+    def __init__(self, reject=()):
+        super().__init__()
+        self.reject = set(reject)
+        self.started = []
+        self.polls = {}
+        self.status_calls = []
+        self.status = HTTPStatus.OK
+
+    def start_indexing(self, conn_ids):
+        if self.reject & set(conn_ids):
+            return json_response(HTTPStatus.BAD_REQUEST, {"error": "BAD"})
+        with self.lock:
+            self.started.append(list(conn_ids))
+        return json_response(HTTPStatus.OK, {})
+
+    def resolve_indexing_statuses(self, conn_ids):
+        items = []
+        with self.lock:
+            self.status_calls.append(len(conn_ids))
+            for conn_id in conn_ids:
+                polls = self.polls[conn_id] = self.polls.get(conn_id, 0) + 1
+                if polls <= int(conn_id.rstrip("x").split("-")[1]) % 3:
+                    status = "INDEXING"
+                else:
+                    status = "FAILED" if conn_id.endswith("x") else "INDEXED"
+                items.append({"id": conn_id, "status": status})
+        return json_response(self.status, items)
+
+
+def conn_ids(count):
+    return [f"conn-{i}" for i in range(count)]
+
+
+def test_submits_in_chunks_and_yields_as_connections_finish():
+    api = FakeTrailIndex()
+    ids = conn_ids(10) + ["conn-4", "conn-10x"]
+
+    events = list(
+        api.index_connections(
+            ids, chunk_size=4, poll_chunk_size=5, workers=2, min_interval=0
+        )
+    )
+
+    assert sorted(len(chunk) for chunk in api.started) == [3, 4, 4]
+    assert [e["id"] for e in events[:4]] == ["conn-0", "conn-3", "conn-6", "conn-9"]
+    assert {e["id"]: e["status"] for e in events} == dict(
+        {i: "INDEXED" for i in conn_ids(10)}, **{"conn-10x": "FAILED"}
+    )
+    # finished connections are no longer polled
+    assert sorted(api.status_calls) == [1, 2, 3, 5, 5, 5]
+
+
+def test_failed_submit_and_timeout():
+    api = FakeTrailIndex(reject={"conn-5"})
+
+    events = list(
+        api.index_connections(
+            conn_ids(6), chunk_size=3, min_interval=0.01, max_interval=0.01, timeout=0
+        )
+    )
+
+    assert {e["id"]: e["status"] for e in events} == {
+        "conn-0": "INDEXED",
+        "conn-1": "TIMEOUT",
+        "conn-2": "TIMEOUT",
+        "conn-3": "SUBMIT_FAILED",
+        "conn-4": "SUBMIT_FAILED",
+        "conn-5": "SUBMIT_FAILED",
+    }
+    assert events[0]["error"] == {
+        "status": HTTPStatus.BAD_REQUEST,
+        "details": {"error": "BAD"},
+    }
+
+
+def test_failed_status_poll_backs_off_and_retries():
+    api = FakeTrailIndex()
+    api.status = HTTPStatus.BAD_GATEWAY
+    resolve = api.resolve_indexing_statuses
+    calls = []
+
+    def flaky(conn_ids):
+        calls.append(list(conn_ids))
+        if len(calls) == 2:
+            raise InternalAPIException("connection reset")
+        if len(calls) == 3:
+            api.status = HTTPStatus.OK
+        return resolve(conn_ids)
+
+    api.resolve_indexing_statuses = flaky
+
+    with mock.patch("time.sleep") as sleep:
+        events = list(api.index_connections(conn_ids(2), min_interval=1))
+
+    assert {e["id"]: e["status"] for e in events} == {
+        "conn-0": "INDEXED",
+        "conn-1": "INDEXED",
+    }
+    assert [c.args[0] for c in sleep.call_args_list] == [2, 4]
+
+
+def test_failing_status_poll_times_out():
+    api = FakeTrailIndex()
+    api.status = HTTPStatus.SERVICE_UNAVAILABLE
+
+    events = list(
+        api.index_connections(
+            conn_ids(2), min_interval=0.01, max_interval=0.01, timeout=0.05
+        )
+    )
+
+    assert [e["status"] for e in events] == ["TIMEOUT", "TIMEOUT"]
+
+
+def test_forbidden_status_poll_ends_without_timeout():
+    api = FakeTrailIndex()
+    api.status = HTTPStatus.FORBIDDEN
+
+    with mock.patch("time.sleep") as sleep:
+        events = list(api.index_connections(conn_ids(2)))
+
+    assert [e["status"] for e in events] == ["POLL_FAILED", "POLL_FAILED"]
+    assert events[0]["error"]["status"] == HTTPStatus.FORBIDDEN
+    assert len(api.status_calls) == 1
+    sleep.assert_not_called()
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+from privx_api.trail_search import ConnectionCache
+
+
+class FakeTrailSearch(FakePrivXAPI):
+    def __init__(self, hits=25):
+        super().__init__()
+        self.hits = [
+            {"connection_id": f"conn-{i % 4}", "keyword": "sudo", "offset": i}
+            for i in range(hits)
+        ]
+        self.offsets = []
+        self.connection_calls = []
+
+    def search_index(self, trails_params, offset=None, limit=None, sort_dir=None):
+        with self.lock:
+            self.offsets.append(offset)
+        items = self.hits[offset : offset + limit]
+        return json_response(HTTPStatus.OK, {"count": len(self.hits), "items": items})
+
+    def get_connection(self, connection_id, verbose=False):
+        with self.lock:
+            self.connection_calls.append(connection_id)
+        if connection_id == "conn-3":
+            return json_response(HTTPStatus.NOT_FOUND, {"error": "NOT_FOUND"})
+        return json_response(HTTPStatus.OK, {"id": connection_id, "type": "SSH"})
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_pages_through_all_hits(prefetch):
+    api = FakeTrailSearch()
+
+    hits = list(
+        api.iter_search_index({"keywords": "sudo"}, page_size=10, prefetch=prefetch)
+    )
+
+    assert [h["offset"] for h in hits] == list(range(25))
+    assert sorted(api.offsets) == [0, 10, 20]
+
+
+def test_stops_after_max_hits():
+    api = FakeTrailSearch(hits=100)
+
+    hits = list(api.iter_search_index({}, page_size=10, max_hits=12, prefetch=False))
+
+    assert len(hits) == 12
+    assert api.offsets == [0, 10]
+
+
+def test_joins_connections_with_cached_lookups():
+    api = FakeTrailSearch()
+    cache = ConnectionCache(api.get_connection)
+
+    hits = list(api.iter_search_index({}, page_size=10, connection_cache=cache))
+    list(api.iter_search_index({}, page_size=10, connection_cache=cache))
+
+    assert hits[1]["connection"] == {"id": "conn-1", "type": "SSH"}
+    assert hits[3]["connection"] is None
+    assert sorted(api.connection_calls) == ["conn-0", "conn-1", "conn-2", "conn-3"]
+    assert cache.misses == 4
+
+
+def test_join_connections_creates_a_cache():
+    api = FakeTrailSearch(hits=8)
+
+    hits = list(api.iter_search_index({}, join_connections=True))
+
+    assert all("connection" in hit for hit in hits)
+    assert len(api.connection_calls) == 4
+
+
+def test_connection_cache_is_bounded():
+    api = FakeTrailSearch()
+    cache = ConnectionCache(api.get_connection, size=2)
+
+    cache.get_many(["conn-0", "conn-1", "conn-2"])
+    cache.get_many(["conn-2", "conn-0"])
+
+    assert api.connection_calls == ["conn-0", "conn-1", "conn-2", "conn-0"]
+    assert cache.hits == 1
+
+
+def test_failed_page_raises():
+    api = FakeTrailSearch()
+    api.search_index = lambda *args, **kwargs: json_response(HTTPStatus.FORBIDDEN, {})
+
+    with pytest.raises(InternalAPIException):
+        list(api.iter_search_index({}))
@@ -0,0 +1,264 @@
+from http import HTTPStatus
+from http.client import HTTPMessage, RemoteDisconnected
+from unittest import mock
+
+import pytest
+
+from privx_api.enums import UrlEnum
+from privx_api.exceptions import InternalAPIException
+from privx_api.hooks import HookEnum
+from privx_api.privx_api import PrivXAPI
+from privx_api.transport import HTTPSTransport, Transport
+
+CONNECTION_INFO = {"host": "privx.example.com", "port": 443, "ca_cert": None}
+
+
+class FakeResponse:
+    status = HTTPStatus.OK
+    reason = "OK"
+
+    def __init__(self, body=b"{}", will_close=False):
+        self.headers = self.msg = HTTPMessage()
+        self.will_close = will_close
+        self._body = body
+        self._closed = False
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def getheaders(self):
+        return list(self.headers.items())
+
+    def read(self, amt=None):
+        if amt is None:
+            amt = len(self._body)
+        data, self._body = self._body[:amt], self._body[amt:]
+        if not self._body:
+            self._closed = True
+        return data
+
+    def isclosed(self):
+        return self._closed
+
+    def close(self):
+        self._closed = True
+
+
+class FakeConnection:
+    def __init__(self, error=None, will_close=False, response_error=None):
+        self.error = error
+        self.response_error = response_error
+        self.will_close = will_close
+        self.requests = 0
+        self.closed = False
+
+    def request(self, **kwargs):
+        if self.error:
+            raise self.error
+        self.requests += 1
+
+    def getresponse(self):
+        if self.response_error:
+            raise self.response_error
+        return FakeResponse(will_close=self.will_close)
+
+    def close(self):
+        self.closed = True
+
+
+class CapturingTransport(Transport):
+    def __init__(self):
+        self.calls = []
+
+    def send(self, request, on_retry=None):
+        self.calls.append(("send", request["method"], request["url"]))
+        return FakeResponse(b'{"items": []}'), b'{"items": []}'
+
+    def stream(self, request, on_retry=None):
+        self.calls.append(("stream", request["method"], request["url"]))
+        return FakeResponse(b"trail")
+
+
+def make_api(**kwargs):
+    api = PrivXAPI("privx.example.com", 443, None, "", "", **kwargs)
+    api._re_auth_deadline = float("inf")
+    return api
+
+
+def pooled_transport(connections, pool_size=2):
+    transport = HTTPSTransport(CONNECTION_INFO, pool_size=pool_size)
+    patcher = mock.patch("http.client.HTTPSConnection", side_effect=connections)
+    return transport, patcher
+
+
+def test_every_verb_goes_through_the_transport():
+    transport = CapturingTransport()
+    api = make_api(transport=transport)
+
+    api._http_get(UrlEnum.HOST_STORE.HOSTS)
+    api._http_post(UrlEnum.HOST_STORE.SEARCH, body={})
+    api._http_put(UrlEnum.HOST_STORE.HOST, body={}, path_params={"host_id": "h"})
+    api._http_delete(UrlEnum.HOST_STORE.HOST, path_params={"host_id": "h"})
+    response = api._http_stream(
+        UrlEnum.CONNECTION_MANAGER.TRAIL,
+        path_params={
+            "connection_id": "c",
+            "channel_id": "1",
+            "file_id": "f",
+            "session_id": "s",
+        },
+    )
+
+    assert [call[:2] for call in transport.calls] == [
+        ("send", "GET"),
+        ("send", "POST"),
+        ("send", "PUT"),
+        ("send", "DELETE"),
+        ("stream", "GET"),
+    ]
+    assert response.read() == b"trail"
+
+
+def test_transport_errors_are_wrapped():
+    transport = CapturingTransport()
+    transport.send = mock.Mock(side_effect=ConnectionRefusedError("refused"))
+    api = make_api(transport=transport)
+
+    with pytest.raises(InternalAPIException):
+        api._http_get(UrlEnum.HOST_STORE.HOSTS)
+
+
+def test_api_close_closes_transport():
+    transport = CapturingTransport()
+    transport.close = mock.Mock()
+
+    with make_api(transport=transport):
+        pass
+
+    transport.close.assert_called_once_with()
+
+
+def test_pool_reuses_connections():
+    conn = FakeConnection()
+    transport, patcher = pooled_transport([conn])
+
+    with patcher as new_connection:
+        for _ in range(3):
+            response, body = transport.send({"method": "GET", "url": "/"})
+
+    assert body == b"{}"
+    assert conn.requests == 3
+    assert new_connection.call_count == 1
+    transport.close()
+    assert conn.closed
+
+
+def test_pool_closes_connection_the_server_will_close():
+    first, second = FakeConnection(will_close=True), FakeConnection()
+    transport, patcher = pooled_transport([first, second])
+
+    with patcher:
+        transport.send({"method": "GET", "url": "/"})
+        transport.send({"method": "GET", "url": "/"})
+
+    assert first.closed
+    assert second.requests == 1
+
+
+def test_pool_retries_stale_connection():
+    stale, fresh = FakeConnection(), FakeConnection()
+    api = make_api(pool_size=2)
+    on_retry = mock.Mock()
+    api.add_hook(HookEnum.ON_RETRY, on_retry)
+
+    with mock.patch("http.client.HTTPSConnection", side_effect=[stale, fresh]):
+        api._http_get(UrlEnum.HOST_STORE.HOSTS)
+        stale.error = RemoteDisconnected("closed")
+        status, _ = api._http_get(UrlEnum.HOST_STORE.HOSTS)
+
+    assert status == HTTPStatus.OK
+    assert stale.closed
+    assert fresh.requests == 1
+    request, attempt, error = on_retry.call_args.args
+    assert request["url"] == "/host-store/api/v1/hosts"
+    assert attempt == 1
+    assert error is stale.error
+
+
+def test_pool_does_not_retry_fresh_connection():
+    conn = FakeConnection(error=ConnectionResetError("reset"))
+    transport, patcher = pooled_transport([conn])
+    on_retry = mock.Mock()
+
+    with patcher, pytest.raises(ConnectionResetError):
+        transport.send({"method": "GET", "url": "/"}, on_retry)
+
+    on_retry.assert_not_called()
+    assert conn.closed
+
+
+@pytest.mark.parametrize(
+    "method, error, resent",
+    [
+        ("POST", "response_error", False),
+        ("POST", "error", True),
+        ("PUT", "response_error", True),
+    ],
+)
+def test_pool_resends_post_only_when_sending_failed(method, error, resent):
+    stale, fresh = FakeConnection(), FakeConnection()
+    transport, patcher = pooled_transport([stale, fresh])
+
+    with patcher:
+        transport.send({"method": "GET", "url": "/"})
+        setattr(stale, error, RemoteDisconnected("closed"))
+        if resent:
+            transport.send({"method": method, "url": "/"})
+        else:
+            with pytest.raises(RemoteDisconnected):
+                transport.send({"method": method, "url": "/"})
+
+    assert stale.closed
+    assert fresh.requests == int(resent)
+
+
+def test_pooled_stream_releases_connection_once_read():
+    conn = FakeConnection()
+    transport, patcher = pooled_transport([conn])
+
+    with patcher:
+        response = transport.stream({"method": "GET", "url": "/"})
+        assert response.read() == b"{}"
+        response.close()
+        transport.send({"method": "GET", "url": "/"})
+
+    assert conn.requests == 2
+
+
+def test_pooled_stream_closed_twice_releases_connection_once():
+    first, second = FakeConnection(), FakeConnection()
+    transport, patcher = pooled_transport([first, second])
+
+    with patcher:
+        response = transport.stream({"method": "GET", "url": "/"})
+        response.read()
+        response.close()
+        response.close()
+        transport.stream({"method": "GET", "url": "/"})
+        transport.stream({"method": "GET", "url": "/"})
+
+    assert (first.requests, second.requests) == (2, 1)
+
+
+def test_pooled_stream_closed_early_discards_connection():
+    first, second = FakeConnection(), FakeConnection()
+    transport, patcher = pooled_transport([first, second])
+
+    with patcher:
+        response = transport.stream({"method": "GET", "url": "/"})
+        response.read(1)
+        response.close()
+        transport.send({"method": "GET", "url": "/"})
+
+    assert first.closed
+    assert second.requests == 1
@@ -0,0 +1,185 @@
+import base64
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+
+
+def der(tag, content):
+    if len(content) < 0x80:
+        return bytes([tag, len(content)]) + content
+    size = (len(content).bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + len(content).to_bytes(size, "big") + content
+
+
+def der_time(moment):
+    text = datetime.fromtimestamp(moment, timezone.utc).strftime("%y%m%d%H%M%SZ")
+    return der(0x17, text.encode("ascii"))
+
+
+def crl_pem(this_update, next_update, serials):
+    revoked = b"".join(
+        der(0x30, der(0x02, serial.to_bytes(3, "big")) + der_time(this_update))
+        for serial in serials
+    )
+    tbs = der(
+        0x30,
+        der(0x02, b"\x01")
+        + der(0x30, b"")
+        + der(0x30, b"x" * 150)
+        + der_time(this_update)
+        + der_time(next_update)
+        + (der(0x30, revoked) if serials else b""),
+    )
+    body = base64.encodebytes(der(0x30, tbs + der(0x30, b"") + der(0x03, b"\0")))
+    return b"-----BEGIN X509 CRL-----\n" + body + b"-----END X509 CRL-----\n"
+
+
+def cert_der(not_after):
+    validity = der(0x30, der_time(not_after - 86400) + der_time(not_after))
+    tbs = der(0x30, der(0x02, b"\x01") + der(0x30, b"") + der(0x30, b"") + validity)
+    return der(0x30, tbs)
+
+
+class FakeStream:
+    def __init__(self, status, body):
+        self.status = status
+        self.ok = status == HTTPStatus.OK
+        self.body = body
+        self.read = False
+
+    def iter_content(self, chunk_size=1024 * 1024):
+        self.read = True
+        yield self.body
+
+
+class FakeAuthorizer(FakePrivXAPI):
+    def __init__(self, crl_lifetime=3600, delay=0.0):
+        super().__init__()
+        self.crl_lifetime = crl_lifetime
+        self.delay = delay
+        self.status = HTTPStatus.OK
+        self.revoked = [0x1000, 0xABCDEF]
+        self.calls = []
+        self.streams = []
+
+    def _call(self, name):
+        with self.lock:
+            self.calls.append(name)
+        time.sleep(self.delay)
+
+    def download_cert_revocation_list(self, cert_id):
+        self._call(("crl", cert_id))
+        now = time.time()
+        stream = FakeStream(
+            self.status, crl_pem(now, now + self.crl_lifetime, self.revoked)
+        )
+        self.streams.append(stream)
+        return stream
+
+    def download_authorizer_cert(self, cert_id):
+        self._call(("cert", cert_id))
+        return FakeStream(self.status, cert_der(time.time() + 7 * 86400))
+
+    def get_ssl_trust_anchor(self):
+        self._call("ssl")
+        body = {"subject": "CN=PrivX", "id": str(len(self.calls))}
+        return json_response(self.status, body)
+
+    def get_extender_trust_anchor(self):
+        self._call("extender")
+        body = {"subject": "CN=Extender"}
+        return json_response(self.status, body)
+
+
+def test_revocation_lookups():
+    api = FakeAuthorizer()
+    cache = api.trust_cache()
+
+    assert cache.is_revoked("ca-1", 0x1000)
+    assert cache.is_revoked("ca-1", "AB:CD:EF")
+    assert not cache.is_revoked("ca-1", 0x1001)
+    crl = cache.revocation_list("ca-1")
+    assert crl.next_update - crl.this_update == pytest.approx(3600, abs=1)
+
+    assert api.calls == [("crl", "ca-1")]
+    assert cache.hits == 3
+
+
+def test_entry_expiry():
+    api = FakeAuthorizer(crl_lifetime=-10)
+    cache = api.trust_cache(max_age=60, stale_grace=0)
+
+    cache.revocation_list("ca-1")
+    cache.revocation_list("ca-1")
+    assert cache.authorizer_cert("ca-1").startswith(b"\x30")
+    cache.authorizer_cert("ca-1")
+    cache.ssl_trust_anchor()
+    cache.ssl_trust_anchor()
+
+    # the CRL is past its nextUpdate, the rest is fresh for max_age
+    assert api.calls.count(("crl", "ca-1")) == 2
+    assert api.calls.count(("cert", "ca-1")) == 1
+    assert api.calls.count("ssl") == 1
+
+
+def test_serves_stale_while_refreshing():
+    api = FakeAuthorizer(crl_lifetime=-1, delay=0.05)
+    cache = api.trust_cache(stale_grace=60)
+    cache.revocation_list("ca-1")
+    api.revoked = [0x2000]
+
+    start = time.perf_counter()
+    assert cache.is_revoked("ca-1", 0x1000)
+    assert time.perf_counter() - start < 0.05
+    deadline = time.monotonic() + 2
+    while cache.fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.is_revoked("ca-1", 0x2000)
+    assert not cache.is_revoked("ca-1", 0x1000)
+
+
+def test_concurrent_misses_share_one_request():
+    api = FakeAuthorizer(delay=0.05)
+    cache = api.trust_cache()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.extender_trust_anchor()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert api.calls == ["extender"]
+    assert results == [{"subject": "CN=Extender"}] * 8
+
+
+def test_failed_fetch_raises_and_releases_stream():
+    api = FakeAuthorizer()
+    api.status = HTTPStatus.NOT_FOUND
+    cache = api.trust_cache()
+
+    with pytest.raises(InternalAPIException):
+        cache.revocation_list("ca-1")
+    assert api.streams[0].read
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "trust.json")
+    api = FakeAuthorizer()
+    api.trust_cache(path=path).is_revoked("ca-1", 1)
+    api.trust_cache(path=path).ssl_trust_anchor()
+
+    cache = api.trust_cache(path=path)
+    assert cache.is_revoked("ca-1", 0x1000)
+    assert cache.ssl_trust_anchor()["subject"] == "CN=PrivX"
+    assert api.calls == [("crl", "ca-1"), "ssl"]
@@ -0,0 +1,140 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+from privx_api.user_import import _read_json_array, read_users, validate_user
+
+USERS = [
+    {"username": "alice", "password": {"password": "x"}, "email": "a@example.com"},
+    {"username": "bob"},
+    {"username": "Alice"},
+    {"username": "existing"},
+    {"username": "", "email": "nobody"},
+    {"username": "carol", "full_name": "Carol"},
+]
+
+
+class FakeUserStore(FakePrivXAPI):
+    def __init__(self, fail=(), errors=None):
+        super().__init__()
+        self.fail = set(fail)
+        # username -> exception raised when creating it
+        self.errors = errors or {}
+        self.created = []
+
+    def get_users(self, username=None, user_id=None, offset=0, limit=50):
+        items = [{"id": "u0", "username": "EXISTING"}]
+        return json_response(HTTPStatus.OK, {"count": 1, "items": items[offset:]})
+
+    def create_user(self, user):
+        if user["username"] in self.errors:
+            raise self.errors[user["username"]]
+        if user["username"] in self.fail:
+            return json_response(
+                HTTPStatus.BAD_REQUEST, {"error": "BAD"}, HTTPStatus.CREATED
+            )
+        with self.lock:
+            self.created.append(user["username"])
+        body = {"id": "id-" + user["username"]}
+        return json_response(HTTPStatus.CREATED, body, HTTPStatus.CREATED)
+
+
+def read_log(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_import_classifies_records(tmp_path):
+    api = FakeUserStore()
+
+    counts = api.import_users(USERS, log_path=str(tmp_path / "log.jsonl"))
+
+    assert sorted(api.created) == ["alice", "bob", "carol"]
+    assert counts == {"created": 3, "duplicate": 1, "exists": 1, "invalid": 1}
+    results = {r["index"]: r for r in read_log(tmp_path / "log.jsonl")}
+    assert results[0]["id"] == "id-alice"
+    assert results[4]["error"] == ["username is required", "email is not valid"]
+
+
+def test_unexpected_errors_are_failed_records(tmp_path):
+    api = FakeUserStore(
+        errors={
+            "bob": ConnectionResetError("reset"),
+            "carol": json.JSONDecodeError("Expecting value", "<html>", 0),
+        }
+    )
+
+    counts = api.import_users(USERS, log_path=str(tmp_path / "log.jsonl"))
+
+    assert counts == {
+        "created": 1,
+        "failed": 2,
+        "duplicate": 1,
+        "exists": 1,
+        "invalid": 1,
+    }
+    results = {r["index"]: r for r in read_log(tmp_path / "log.jsonl")}
+    assert results[1]["status"] == results[5]["status"] == "failed"
+    assert results[1]["error"] == "ConnectionResetError: reset"
+    assert results[5]["error"].startswith("JSONDecodeError: Expecting value")
+
+
+def test_resume_retries_only_failed_records(tmp_path):
+    log_path = str(tmp_path / "log.jsonl")
+    first = FakeUserStore(fail={"bob"})
+    assert first.import_users(USERS, log_path=log_path)["failed"] == 1
+
+    second = FakeUserStore()
+    counts = second.import_users(USERS, log_path=log_path, workers=2)
+
+    assert second.created == ["bob"]
+    assert counts == {"created": 1, "skipped": 5}
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("users.json", json.dumps(USERS[:2], indent=2)),
+        ("users.jsonl", "\n".join(json.dumps(u) for u in USERS[:2]) + "\n"),
+        ("users.csv", "username,password,email\nalice,x,a@example.com\nbob,,\n"),
+    ],
+)
+def test_read_users(tmp_path, filename, content):
+    path = tmp_path / filename
+    path.write_text(content)
+
+    assert list(read_users(str(path))) == USERS[:2]
+
+
+def test_read_json_array_across_chunks(tmp_path):
+    path = tmp_path / "users.json"
+    users = [{"username": f"user{i}", "comment": "x" * 100} for i in range(50)]
+    path.write_text(json.dumps(users))
+
+    with open(path) as f:
+        assert list(_read_json_array(f, chunk_size=64)) == users
+
+
+def test_read_users_malformed(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text('[{"username": "alice"}, {"username": ')
+
+    with pytest.raises(InternalAPIException):
+        list(read_users(str(path)))
+
+
+@pytest.mark.parametrize(
+    "user, errors",
+    [
+        ({"username": "a"}, []),
+        ({"username": " "}, ["username is required"]),
+        ({"username": "a", "full_name": 1}, ["full_name must be a string"]),
+        ({"username": "a", "password": "x"}, ['password must be {"password": "..."}']),
+        ([], ["record is not an object"]),
+    ],
+)
+def test_validate_user(user, errors):
+    assert validate_user(user) == errors
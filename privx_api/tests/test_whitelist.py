@@ -0,0 +1,125 @@
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.privx_api import PrivXAPI
+from privx_api.replay import replay_exchanges
+from privx_api.tests.helpers import FakePrivXAPI, json_response
+from privx_api.whitelist import CommandWhitelists, CompiledWhitelist, split_command_line
+
+FIXTURES = Path(__file__).parent / "fixtures"
+# Hand-written in the recording format from the documented server behaviour,
+# not a server answer: it pins the local evaluator but proves nothing about
+# the server. Keep it in line with WHITELIST and COMMANDS.
+SYNTHETIC_FIXTURE = FIXTURES / "whitelist_evaluate_synthetic.jsonl"
+WHITELIST = {
+    "name": "log-readers",
+    "whitelist_patterns": [
+        "ls( .*)?",
+        "cat /var/log/[a-z.]+",
+        "grep .*",
+        "systemctl status [a-z-]+",
+    ],
+}
+COMMANDS = [
+    "ls",
+    "ls -la /tmp",
+    "lsof",
+    "cat /var/log/syslog",
+    "cat /etc/shadow",
+    "cat /var/log/syslog | grep error",
+    "ls; rm -rf /",
+    "ls && reboot",
+    "ls 'a;b'",
+    "systemctl status sshd",
+    "systemctl restart sshd",
+    "ls $(id)",
+    "ls `id`",
+    "ls 2>&1",
+]
+
+
+@pytest.mark.parametrize(
+    "command_line, expected",
+    [
+        ("ls -la; rm -rf /", ["ls -la", "rm -rf /"]),
+        ("cat a 2>&1 | grep x", ["cat a 2>&1", "grep x"]),
+        ("echo 'a;b' && echo \"c|d\"", ["echo 'a;b'", 'echo "c|d"']),
+        ("echo '$(id)'", ["echo '$(id)'"]),
+        ("cmd &> /dev/null", ["cmd &> /dev/null"]),
+        ("a\\;b || c\nd", ["a\\;b", "c", "d"]),
+        ("sleep 1 &", ["sleep 1"]),
+        ("echo $(id)", None),
+        ('echo "`id`"', None),
+        ("diff <(ls) x", None),
+    ],
+)
+def test_split_command_line(command_line, expected):
+    assert split_command_line(command_line) == expected
+
+
+def test_empty_whitelist_allows_nothing():
+    whitelist = CompiledWhitelist({"whitelist_patterns": []})
+
+    assert whitelist.evaluate(["ls", ""]) == [
+        {"command": "ls", "allowed": False},
+        {"command": "", "allowed": False},
+    ]
+
+
+def test_invalid_pattern_and_variant():
+    with pytest.raises(InternalAPIException):
+        CompiledWhitelist({"whitelist_patterns": ["ls ("]})
+    with pytest.raises(InternalAPIException):
+        CompiledWhitelist(WHITELIST).evaluate(["ls"], rshell_variant="zsh")
+    # posix parsing differs from bash, for example on &>, and is not emulated
+    with pytest.raises(InternalAPIException):
+        CompiledWhitelist(WHITELIST).evaluate(["ls"], rshell_variant="posix")
+
+
+def test_whitelists_by_id_and_name():
+    whitelists = CommandWhitelists([dict(WHITELIST, id="w-1")])
+
+    assert whitelists.evaluate("w-1", ["ls"]) == [{"command": "ls", "allowed": True}]
+    assert whitelists["log-readers"] is whitelists["w-1"]
+    with pytest.raises(InternalAPIException):
+        whitelists["missing"]
+
+
+def test_load_pages_until_count_when_limit_is_capped():
+    whitelists = [dict(WHITELIST, id=f"w-{i}", name=f"list-{i}") for i in range(5)]
+    api = FakePrivXAPI()
+    calls = []
+
+    def get_command_restriction_whitelists(offset=None, limit=None):
+        calls.append((offset, limit))
+        # the server caps the limit at 2
+        page = whitelists[offset : offset + min(limit, 2)]
+        return json_response(HTTPStatus.OK, {"count": 5, "items": page})
+
+    api.get_command_restriction_whitelists = get_command_restriction_whitelists
+
+    loaded = CommandWhitelists.load(api, page_size=3)
+
+    assert [loaded[f"w-{i}"] is loaded[f"list-{i}"] for i in range(5)] == [True] * 5
+    assert [offset for offset, _ in calls] == [0, 2, 4]
+
+
+def server_evaluation(fixture):
+    api = PrivXAPI("privx.example.com", 443, "", "", "")
+    with replay_exchanges(api, str(fixture)):
+        api.authenticate("client", "secret")
+        response = api.eval_commands_against_whitelist(WHITELIST, "bash", COMMANDS)
+    assert response.ok
+    return {item["command"]: item["allowed"] for item in response.data["items"]}
+
+
+def local_evaluation():
+    local = CompiledWhitelist(WHITELIST).evaluate(COMMANDS)
+    return {item["command"]: item["allowed"] for item in local}
+
+
+def test_matches_synthetic_server_answers():
+    assert local_evaluation() == server_evaluation(SYNTHETIC_FIXTURE)
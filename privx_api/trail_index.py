@@ -1,6 +1,7 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
+from privx_api import trail_indexing, trail_search
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
@@ -56,6 +57,42 @@ class TrailIndexAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def index_connections(
+        self,
+        conn_ids: Iterable[str],
+        chunk_size: int = 100,
+        poll_chunk_size: int = 500,
+        workers: int = 4,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[dict]:
+        """
+        Index any number of connections. Ids are submitted to start_indexing
+        in chunks of chunk_size with up to `workers` requests in flight, then
+        polled with resolve_indexing_statuses in chunks of poll_chunk_size,
+        backing off from min_interval to max_interval while nothing finishes;
+        a poll that fails with a connection error, 429 or 5xx is retried the
+        same way.
+
+        Returns:
+            Iterator of {"id": ..., "status": ...} status items, one per
+            connection as it reaches INDEXED or a failed status; SUBMIT_FAILED,
+            POLL_FAILED and TIMEOUT events are added for chunks that could not
+            be submitted, for chunks whose status poll failed with any other
+            status and for connections still pending after timeout seconds
+        """
+        return trail_indexing.TrailIndexer(
+            self.start_indexing,
+            self.resolve_indexing_statuses,
+            chunk_size=chunk_size,
+            poll_chunk_size=poll_chunk_size,
+            workers=workers,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            timeout=timeout,
+        ).run(conn_ids)
+
     def search_index(
         self,
         trails_params: dict,
@@ -80,3 +117,36 @@ class TrailIndexAPI(BasePrivXAPI):
             body=trails_params,
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
+
+    def iter_search_index(
+        self,
+        trails_params: dict,
+        page_size: int = 100,
+        sort_dir: Optional[str] = None,
+        max_hits: Optional[int] = None,
+        prefetch: bool = True,
+        join_connections: bool = False,
+        connection_cache: Optional[trail_search.ConnectionCache] = None,
+    ) -> Iterator[dict]:
+        """
+        Iterate the hits of search_index across all pages, stopping after
+        max_hits when given. With prefetch the next page is requested while
+        the current one is consumed. With join_connections every hit gets a
+        "connection" key holding its get_connection data (None when the
+        lookup failed), looked up once per page for all its hits; pass a
+        connection_cache to reuse lookups across searches.
+
+        Returns:
+            Iterator of search hits
+        """
+        if join_connections and connection_cache is None:
+            connection_cache = trail_search.ConnectionCache(self.get_connection)
+        return trail_search.search_trails(
+            self.search_index,
+            trails_params,
+            page_size=page_size,
+            sort_dir=sort_dir,
+            max_hits=max_hits,
+            prefetch=prefetch,
+            connection_cache=connection_cache,
+        )
@@ -0,0 +1,138 @@
+#
+# Bulk trail indexing.
+#
+# Connection ids are submitted to start_indexing in chunks with a bounded
+# number of requests in flight, then the ones still pending are polled with
+# resolve_indexing_statuses, also in chunks. Every connection yields one
+# event when it reaches a final status. The poll interval doubles up to
+# max_interval while a round finishes nothing and resets when one does. A
+# status request that fails transiently (a connection error, 429 or 5xx)
+# counts as nothing finished for its chunk, so it is retried after the
+# backoff; any other failed status ends its chunk with POLL_FAILED events.
+#
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from privx_api.exceptions import InternalAPIException
+
+INDEXED = "INDEXED"
+FAILED_STATUSES = {"INDEXING_FAILED", "FAILED", "ERROR"}
+# reported by the orchestrator itself, never by the trail index service
+SUBMIT_FAILED = "SUBMIT_FAILED"
+POLL_FAILED = "POLL_FAILED"
+TIMEOUT = "TIMEOUT"
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _status_items(data) -> List[dict]:
+    # the status endpoint answers with a list or with a list result object
+    if isinstance(data, dict):
+        data = data.get("items") or []
+    return data
+
+
+def _is_transient(status: int) -> bool:
+    return status == HTTPStatus.TOO_MANY_REQUESTS or status >= 500
+
+
+def _event(conn_id: str, status: str, **details) -> dict:
+    event = {"id": conn_id, "status": status}
+    event.update(details)
+    return event
+
+
+class TrailIndexer:
+    """
+    Submit connections for indexing and follow them until they finish.
+    """
+
+    def __init__(
+        self,
+        start_indexing: Callable,
+        resolve_statuses: Callable,
+        chunk_size: int = 100,
+        poll_chunk_size: int = 500,
+        workers: int = 4,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        failed_statuses: Iterable[str] = FAILED_STATUSES,
+    ) -> None:
+        self._start_indexing = start_indexing
+        self._resolve_statuses = resolve_statuses
+        self._chunk_size = chunk_size
+        self._poll_chunk_size = poll_chunk_size
+        self._workers = workers
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._timeout = timeout
+        self._final = {INDEXED, POLL_FAILED, *failed_statuses}
+
+    def run(self, conn_ids: Iterable[str]) -> Iterator[dict]:
+        """
+        Yield {"id", "status", ...} once per connection as it finishes.
+        """
+        conn_ids = list(dict.fromkeys(conn_ids))
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            pending = set(conn_ids)
+            for chunk, error in zip(
+                _chunks(conn_ids, self._chunk_size),
+                executor.map(self._submit, _chunks(conn_ids, self._chunk_size)),
+            ):
+                if error is not None:
+                    pending.difference_update(chunk)
+                    for conn_id in chunk:
+                        yield _event(conn_id, SUBMIT_FAILED, error=error)
+            yield from self._poll(executor, pending, deadline)
+
+    def _submit(self, chunk: List[str]):
+        try:
+            response = self._start_indexing(chunk)
+        except InternalAPIException as e:
+            return str(e)
+        return None if response.ok else response.data
+
+    def _poll(self, executor, pending: set, deadline: Optional[float]):
+        interval = self._min_interval
+        while pending:
+            finished = []
+            for statuses in executor.map(
+                self._statuses, _chunks(sorted(pending), self._poll_chunk_size)
+            ):
+                for conn_id, item in statuses.items():
+                    if conn_id in pending and item.get("status") in self._final:
+                        finished.append(item)
+            for item in finished:
+                pending.discard(item["id"])
+                yield item
+            if not pending:
+                return
+            interval = self._min_interval if finished else interval * 2
+            interval = min(interval, self._max_interval)
+            if deadline is not None and time.monotonic() + interval > deadline:
+                for conn_id in sorted(pending):
+                    yield _event(conn_id, TIMEOUT)
+                return
+            time.sleep(interval)
+
+    def _statuses(self, chunk: List[str]) -> Dict[str, dict]:
+        try:
+            response = self._resolve_statuses(chunk)
+        except InternalAPIException:
+            return {}
+        if not response.ok:
+            if _is_transient(response.status):
+                return {}
+            return {
+                conn_id: _event(conn_id, POLL_FAILED, error=response.data)
+                for conn_id in chunk
+            }
+        return {item["id"]: item for item in _status_items(response.data)}
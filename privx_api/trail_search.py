@@ -0,0 +1,98 @@
+#
+# Streaming trail index search.
+#
+# Hits of search_index are yielded page by page, optionally with the next
+# page already requested while the current one is consumed. Hits can be
+# joined with their connection: the connections a page refers to are looked
+# up once per page, concurrently, through an LRU cache of get_connection
+# results shared by every page (and by searches given the same cache).
+#
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from privx_api.utils import iter_items
+
+
+class ConnectionCache:
+    """
+    LRU cache of connection metadata, None for connections that failed.
+    """
+
+    def __init__(self, get_connection: Callable, size: int = 10000) -> None:
+        self._get_connection = get_connection
+        self._size = size
+        self._connections: "OrderedDict[str, Optional[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(
+        self, connection_ids: Iterable[str], executor: Optional[Executor] = None
+    ) -> Dict[str, Optional[dict]]:
+        found, missing = {}, []
+        with self._lock:
+            for connection_id in dict.fromkeys(connection_ids):
+                if connection_id in self._connections:
+                    self._connections.move_to_end(connection_id)
+                    found[connection_id] = self._connections[connection_id]
+                    self.hits += 1
+                else:
+                    missing.append(connection_id)
+                    self.misses += 1
+        fetched = (executor.map if executor else map)(self._fetch, missing)
+        with self._lock:
+            for connection_id, connection in zip(missing, fetched):
+                found[connection_id] = connection
+                self._connections[connection_id] = connection
+            while len(self._connections) > self._size:
+                self._connections.popitem(last=False)
+        return found
+
+    def _fetch(self, connection_id: str) -> Optional[dict]:
+        response = self._get_connection(connection_id)
+        return response.data if response.ok else None
+
+
+def search_trails(
+    search_index: Callable,
+    trails_params: dict,
+    page_size: int = 100,
+    sort_dir: Optional[str] = None,
+    max_hits: Optional[int] = None,
+    prefetch: bool = True,
+    connection_cache: Optional[ConnectionCache] = None,
+    workers: int = 4,
+    connection_field: str = "connection_id",
+) -> Iterator[dict]:
+    """
+    Yield the hits of `search_index` (TrailIndexAPI.search_index) across all
+    pages, see TrailIndexAPI.iter_search_index.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hits = iter_items(
+            lambda offset, limit: search_index(
+                trails_params, offset=offset, limit=limit, sort_dir=sort_dir
+            ),
+            page_size,
+            executor if prefetch else None,
+            prefetch=1,
+        )
+        if max_hits is not None:
+            hits = islice(hits, max_hits)
+        if connection_cache is None:
+            yield from hits
+            return
+        while True:
+            page = list(islice(hits, page_size))
+            if not page:
+                return
+            connections = connection_cache.get_many(
+                (hit[connection_field] for hit in page if hit.get(connection_field)),
+                executor,
+            )
+            for hit in page:
+                yield dict(hit, connection=connections.get(hit.get(connection_field)))
@@ -0,0 +1,216 @@
+#
+# HTTP transports used by BasePrivXAPI.
+#
+
+import http.client
+import ssl
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from privx_api.exceptions import InternalAPIException
+
+# errors raised when a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError)
+# methods a server may receive twice without a different outcome
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+
+class Connection:
+    def __init__(self, connection_info) -> None:
+        self.host = connection_info["host"]
+        self.port = connection_info["port"]
+        self.ca_cert = connection_info["ca_cert"]
+        self._connection = None
+
+    def __enter__(self) -> http.client.HTTPSConnection:
+        self._connection = self.connect()
+        return self._connection
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._connection.close()
+
+    def connect(self) -> http.client.HTTPSConnection:
+        return http.client.HTTPSConnection(
+            self.host, port=self.port, context=self.get_context()
+        )
+
+    def get_context(self) -> ssl.SSLContext:
+        try:
+            context = ssl.create_default_context(cadata=self.ca_cert)
+        except ssl.SSLError as e:
+            raise InternalAPIException(e)
+        return context
+
+
+class Transport:
+    """
+    Interface between BasePrivXAPI and the wire.
+
+    `request` is the dict built by BasePrivXAPI._build_request with method, url,
+    headers and an optional body. Responses must behave like
+    http.client.HTTPResponse: status, headers, getheader(s), read and close.
+    Transport failures are raised as OSError or http.client.HTTPException.
+
+    `on_retry(attempt, error)` is called by transports that re-send a request.
+    """
+
+    def send(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> Tuple[http.client.HTTPResponse, bytes]:
+        """
+        Send the request and return the response with its whole body read.
+        """
+        raise NotImplementedError
+
+    def stream(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> http.client.HTTPResponse:
+        """
+        Send the request and return the response with the body unread.
+        Closing the response releases the underlying connection.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Release every connection held by the transport.
+        """
+        return None
+
+
+class HTTPSTransport(Transport):
+    """
+    Default transport on top of http.client.
+
+    With pool_size 0 every request uses its own connection, which is closed
+    once the response is read. With pool_size > 0 up to that many idle
+    keep-alive connections are kept for reuse; the pool is thread-safe and does
+    not cap the number of concurrent requests. A request that fails because a
+    reused connection went stale is re-sent once per stale connection. A POST
+    or PATCH is re-sent only when sending it failed: a failure while waiting
+    for the response may come after the server acted on the request.
+    """
+
+    def __init__(
+        self,
+        connection_info: dict,
+        pool_size: int = 0,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        self._connection_info = connection_info
+        self._pool_size = pool_size
+        self._idle_timeout = idle_timeout
+        # idle connections as (connection, released_at), most recent last
+        self._idle: List[Tuple[http.client.HTTPSConnection, float]] = []
+        self._lock = threading.Lock()
+        self._context = None
+
+    def send(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> Tuple[http.client.HTTPResponse, bytes]:
+        if not self._pool_size:
+            with Connection(self._connection_info) as conn:
+                conn.request(**request)
+                response = conn.getresponse()
+                return response, response.read()
+
+        conn, response = self._exchange(request, on_retry)
+        try:
+            body = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn, response)
+        return response, body
+
+    def stream(
+        self, request: dict, on_retry: Optional[Callable] = None
+    ) -> http.client.HTTPResponse:
+        if not self._pool_size:
+            conn = Connection(self._connection_info).connect()
+            conn.request(**request)
+            return conn.getresponse()
+
+        conn, response = self._exchange(request, on_retry)
+        return _PooledResponse(response, lambda: self._release(conn, response))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def _exchange(
+        self, request: dict, on_retry: Optional[Callable]
+    ) -> Tuple[http.client.HTTPSConnection, http.client.HTTPResponse]:
+        attempt = 0
+        idempotent = request["method"] in IDEMPOTENT_METHODS
+        while True:
+            conn, reused = self._acquire()
+            sent = False
+            try:
+                conn.request(**request)
+                sent = True
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if not reused or (sent and not idempotent):
+                    raise
+                attempt += 1
+                if on_retry:
+                    on_retry(attempt, e)
+            except BaseException:
+                conn.close()
+                raise
+
+    def _acquire(self) -> Tuple[http.client.HTTPSConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, released_at = self._idle.pop()
+                if now - released_at < self._idle_timeout:
+                    return conn, True
+                conn.close()
+            if self._context is None:
+                self._context = Connection(self._connection_info).get_context()
+        conn = http.client.HTTPSConnection(
+            self._connection_info["host"],
+            port=self._connection_info["port"],
+            context=self._context,
+        )
+        return conn, False
+
+    def _release(
+        self, conn: http.client.HTTPSConnection, response: http.client.HTTPResponse
+    ) -> None:
+        if response.will_close or not response.isclosed():
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self._pool_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+
+class _PooledResponse:
+    """
+    Streamed response that hands its connection back to the pool on close.
+    """
+
+    def __init__(self, response: http.client.HTTPResponse, release: Callable):
+        self._response = response
+        self._release = release
+        self._released = False
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+    def close(self) -> None:
+        # a fully read body leaves the connection reusable, see _release; a
+        # second close must not hand the connection to the pool twice
+        if not self._released:
+            self._released = True
+            self._release()
+        self._response.close()
@@ -0,0 +1,204 @@
+#
+# Authorizer trust material cache.
+#
+# CRLs, authorizer CA certificates and the SSL and extender trust anchors are
+# kept in memory, and with a path also in a JSON file so that new processes
+# start warm. An entry is fresh until the CRL nextUpdate or the certificate
+# expiry, but at most `max_age` seconds. Once `refresh_ahead` of that has
+# passed, reads return the cached entry and refresh it in the background; for
+# `stale_grace` seconds after it, a stale entry is still served while it is
+# being refreshed, so that a slow or unreachable authorizer does not hold up
+# validation. Concurrent misses share one request.
+#
+
+import base64
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple, Union
+
+from privx_api import certificates
+from privx_api.exceptions import InternalAPIException
+from privx_api.expiring_cache import ExpiringCache
+
+CRL = "crl"
+AUTHORIZER_CERT = "authorizer_cert"
+SSL_TRUST_ANCHOR = "ssl_trust_anchor"
+EXTENDER_TRUST_ANCHOR = "extender_trust_anchor"
+# entries stored as raw bytes rather than JSON response data
+RAW_KINDS = (CRL, AUTHORIZER_CERT)
+
+
+class RevocationList:
+    """
+    A parsed CRL with in-memory revocation lookups.
+    """
+
+    def __init__(self, raw: bytes) -> None:
+        self.raw = raw
+        self.this_update, self.next_update, self.revoked = certificates.revocation_list(
+            certificates.crl_der(raw)
+        )
+
+    def is_revoked(self, serial: Union[int, str]) -> bool:
+        """
+        Whether the certificate serial number, an int or a hex string with
+        or without colons, is on the list.
+        """
+        if isinstance(serial, str):
+            serial = int(serial.replace(":", ""), 16)
+        return serial in self.revoked
+
+
+class TrustCache:
+    """
+    Thread-safe cache of authorizer trust material, see the module comment.
+    """
+
+    def __init__(
+        self,
+        download_cert_revocation_list: Callable,
+        download_authorizer_cert: Callable,
+        get_ssl_trust_anchor: Callable,
+        get_extender_trust_anchor: Callable,
+        path: Optional[str] = None,
+        max_age: float = 3600.0,
+        refresh_ahead: float = 0.8,
+        stale_grace: float = 300.0,
+    ) -> None:
+        self._fetch = {
+            CRL: download_cert_revocation_list,
+            AUTHORIZER_CERT: download_authorizer_cert,
+            SSL_TRUST_ANCHOR: lambda _: get_ssl_trust_anchor(),
+            EXTENDER_TRUST_ANCHOR: lambda _: get_extender_trust_anchor(),
+        }
+        self._path = path
+        self._max_age = max_age
+        self._refresh_ahead = refresh_ahead
+        self._stale_grace = stale_grace
+        self._save_lock = threading.Lock()
+        self._cache = ExpiringCache(self._load_entry, self._save if path else None)
+        if path:
+            self._load()
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def fetches(self) -> int:
+        return self._cache.loads
+
+    def revocation_list(self, cert_id: str) -> RevocationList:
+        return self._cache.get((CRL, cert_id))
+
+    def is_revoked(self, cert_id: str, serial: Union[int, str]) -> bool:
+        """
+        Whether `serial` is revoked by the CRL of the CA `cert_id`.
+        """
+        return self.revocation_list(cert_id).is_revoked(serial)
+
+    def authorizer_cert(self, cert_id: str) -> bytes:
+        return self._cache.get((AUTHORIZER_CERT, cert_id))
+
+    def ssl_trust_anchor(self) -> dict:
+        return dict(self._cache.get((SSL_TRUST_ANCHOR, None)))
+
+    def extender_trust_anchor(self) -> dict:
+        return dict(self._cache.get((EXTENDER_TRUST_ANCHOR, None)))
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+        if self._path:
+            self._save()
+
+    def _load_entry(self, key: Tuple[str, Optional[str]]) -> Tuple[Any, float, float]:
+        kind, cert_id = key
+        fetched = time.time()
+        response = self._fetch[kind](cert_id)
+        if kind in RAW_KINDS:
+            # read the body in any case so that the connection is released
+            stored = b"".join(response.iter_content())
+        else:
+            stored = response.data
+        if not response.ok:
+            raise InternalAPIException(f"Failed to get {kind}: ", response.status)
+        value = self._parse(kind, stored)
+        return (value, *self._lifetime(kind, value, fetched))
+
+    @staticmethod
+    def _parse(kind: str, stored: Any) -> Any:
+        if kind == CRL:
+            return RevocationList(stored)
+        return stored
+
+    def _lifetime(self, kind: str, value: Any, fetched: float) -> Tuple[float, float]:
+        # (expires, refresh_at) for a value fetched at `fetched`
+        if kind == CRL:
+            valid_until = value.next_update
+        elif kind == AUTHORIZER_CERT:
+            valid_until = _cert_expiry(value)
+        else:
+            valid_until = certificates.earliest_expiry(value)
+        fresh_until = fetched + self._max_age
+        if valid_until is not None:
+            fresh_until = min(fresh_until, valid_until)
+        refresh_at = fetched + max(fresh_until - fetched, 0) * self._refresh_ahead
+        return fresh_until + self._stale_grace, refresh_at
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "r", encoding="utf-8") as f:
+            try:
+                state = json.load(f)
+            except ValueError:
+                # damaged, start over
+                return
+        now = time.time()
+        for item in state:
+            if now >= item["expires"]:
+                continue
+            stored = item["data"]
+            if item["kind"] in RAW_KINDS:
+                stored = base64.b64decode(stored)
+            self._cache.put(
+                (item["kind"], item["cert_id"]),
+                self._parse(item["kind"], stored),
+                item["expires"],
+                item["refresh_at"],
+            )
+
+    def _save(self) -> None:
+        with self._save_lock:
+            # snapshot under the lock, a later save must not lose to an earlier
+            state = [
+                {
+                    "kind": kind,
+                    "cert_id": cert_id,
+                    "data": _stored(kind, value),
+                    "expires": expires,
+                    "refresh_at": refresh_at,
+                }
+                for (kind, cert_id), value, expires, refresh_at in self._cache.items()
+            ]
+            tmp_path = self._path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self._path)
+
+
+def _stored(kind: str, value: Any) -> Any:
+    if kind == CRL:
+        value = value.raw
+    if kind in RAW_KINDS:
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _cert_expiry(raw: bytes) -> Optional[float]:
+    # PEM (possibly a chain) or a single DER certificate
+    if b"-----BEGIN CERTIFICATE-----" in raw:
+        return certificates.earliest_expiry(raw.decode("ascii", "replace"))
+    return certificates.x509_validity(raw)[1]
@@ -0,0 +1,248 @@
+#
+# Bulk import of local users.
+#
+# Users are streamed from a JSON array, JSON lines or CSV file, validated
+# locally, checked against the usernames already in the user store and
+# created with a bounded number of requests in flight. Every record gets a
+# line in a JSON lines result log; a rerun with the same log skips the
+# records that already reached a final state and retries the failed ones.
+#
+
+import csv
+import json
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.utils import fetch_all_items
+
+CREATED = "created"
+EXISTS = "exists"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+FAILED = "failed"
+# statuses that are not retried when a run is resumed
+FINAL_STATUSES = {CREATED, EXISTS, DUPLICATE, INVALID}
+
+EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+STRING_FIELDS = ("username", "given_name", "full_name", "email", "comment")
+
+
+def read_users(path: str, source_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream user records from `path`, the format defaults to the file suffix:
+    .jsonl/.ndjson, .csv, anything else is read as a JSON array.
+    """
+    source_format = source_format or _format_of(path)
+    readers = {"json": _read_json_array, "jsonl": _read_json_lines, "csv": _read_csv}
+    if source_format not in readers:
+        raise InternalAPIException("Unknown user source format: ", source_format)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from readers[source_format](f)
+
+
+def _format_of(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    return {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}.get(suffix, "json")
+
+
+def _read_json_array(f: IO, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    # decode one array element at a time, so the file is never fully loaded
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise InternalAPIException("User source is not a JSON array")
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                raise InternalAPIException("Malformed JSON array in user source")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield record
+        buffer = buffer[end:]
+
+
+def _read_json_lines(f: IO) -> Iterator[dict]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _read_csv(f: IO) -> Iterator[dict]:
+    # a password column is wrapped as the password object the API expects
+    for row in csv.DictReader(f):
+        user = {k: v for k, v in row.items() if k and v not in (None, "")}
+        if "password" in user:
+            user["password"] = {"password": user["password"]}
+        yield user
+
+
+def validate_user(user: dict) -> List[str]:
+    """
+    Problems that would make the user store reject the record.
+    """
+    if not isinstance(user, dict):
+        return ["record is not an object"]
+    errors = []
+    username = user.get("username")
+    if not isinstance(username, str) or not username.strip():
+        errors.append("username is required")
+    for field in STRING_FIELDS:
+        if field in user and not isinstance(user[field], str):
+            errors.append(f"{field} must be a string")
+    email = user.get("email")
+    if isinstance(email, str) and email and not EMAIL.fullmatch(email):
+        errors.append("email is not valid")
+    password = user.get("password")
+    if password is not None and not (
+        isinstance(password, dict) and isinstance(password.get("password"), str)
+    ):
+        errors.append('password must be {"password": "..."}')
+    return errors
+
+
+class ResultLog:
+    """
+    Append-only JSON lines log of per-record results, a log without a path
+    only discards them. Records that reached one of `final_statuses` in an
+    earlier run are in `done`.
+    """
+
+    def __init__(
+        self, path: Optional[str], final_statuses: Set[str] = FINAL_STATUSES
+    ) -> None:
+        self.done: Dict[str, dict] = {}
+        self._file = None
+        self._lock = threading.Lock()
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        # torn last line of a crashed run
+                        continue
+                    if result.get("status") in final_statuses:
+                        self.done[result["key"]] = result
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, result: dict) -> None:
+        if self._file is None:
+            return
+        line = json.dumps(result, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def import_users(
+    create_user: Callable,
+    get_users: Callable,
+    users: Iterator[dict],
+    log_path: Optional[str] = None,
+    workers: int = 8,
+    page_size: int = 1000,
+) -> Counter:
+    """
+    Create `users` with `create_user`, see UserStoreAPI.import_users.
+    """
+    log = ResultLog(log_path)
+    existing = _existing_usernames(get_users, page_size)
+    seen: Set[str] = set()
+    counts = Counter()
+    counts_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(workers * 2)
+
+    def record(result: dict) -> None:
+        with counts_lock:
+            counts[result["status"]] += 1
+        log.write(result)
+
+    def create(index: int, key: str, user: dict) -> None:
+        try:
+            record(_create(create_user, index, key, user))
+        finally:
+            in_flight.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, user in enumerate(users):
+                key, status, error = _classify(index, user, existing, seen)
+                if key in log.done:
+                    with counts_lock:
+                        counts["skipped"] += 1
+                    continue
+                if status:
+                    record(_result(index, key, status, error=error))
+                    continue
+                in_flight.acquire()
+                executor.submit(create, index, key, user)
+    finally:
+        log.close()
+    return counts
+
+
+def _create(create_user: Callable, index: int, key: str, user: dict) -> dict:
+    try:
+        response = create_user(user)
+        if response.ok:
+            return _result(index, key, CREATED, id=response.data.get("id"))
+        return _result(index, key, FAILED, error=response.data)
+    except InternalAPIException as e:
+        return _result(index, key, FAILED, error=str(e))
+    except Exception as e:
+        # anything else, a malformed response for example, must still give
+        # the record its result line instead of dying in the executor
+        return _result(index, key, FAILED, error=f"{type(e).__name__}: {e}")
+
+
+def _existing_usernames(get_users: Callable, page_size: int) -> Set[str]:
+    users = fetch_all_items(
+        lambda offset, limit: get_users(offset=offset, limit=limit), page_size
+    )
+    return {u["username"].lower() for u in users if u.get("username")}
+
+
+def _classify(
+    index: int, user: dict, existing: Set[str], seen: Set[str]
+) -> Tuple[str, Optional[str], Optional[List[str]]]:
+    # returns the record key and, unless it should be created, its final status;
+    # records that are never sent are keyed by position so that they cannot
+    # mask a later record with the same username when a run is resumed
+    errors = validate_user(user)
+    if errors:
+        return f"#{index}", INVALID, errors
+    username = user["username"].strip().lower()
+    if username in existing:
+        return username, EXISTS, None
+    if username in seen:
+        return f"#{index}", DUPLICATE, None
+    seen.add(username)
+    return username, None, None
+
+
+def _result(index: int, key: str, status: str, **details) -> dict:
+    result = {"index": index, "key": key, "status": status}
+    result.update((k, v) for k, v in details.items() if v is not None)
+    return result
@@ -1,6 +1,8 @@
+from collections import Counter
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterable, Optional, Union
 
+from privx_api import user_import
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
@@ -49,6 +51,31 @@ class UserStoreAPI(BasePrivXAPI):
         response_status, data = self._http_post(UrlEnum.USER_STORE.USERS, body=user)
         return self._api_response(response_status, HTTPStatus.CREATED, data)
 
+    def import_users(
+        self,
+        source: Union[str, Iterable[dict]],
+        log_path: Optional[str] = None,
+        workers: int = 8,
+        source_format: Optional[str] = None,
+    ) -> Counter:
+        """
+        Create users from a JSON array, JSON lines or CSV file (or an iterable
+        of user dicts) with up to `workers` concurrent requests. Records are
+        validated locally, usernames already in the user store or repeated in
+        the source are not sent. Per-record results are appended to the JSON
+        lines file at log_path, rerunning with the same log resumes the import.
+
+        Returns:
+            Counter of record statuses: created, exists, duplicate, invalid,
+            failed and skipped (done in an earlier run)
+        """
+        users = source
+        if isinstance(source, str):
+            users = user_import.read_users(source, source_format)
+        return user_import.import_users(
+            self.create_user, self.get_users, users, log_path=log_path, workers=workers
+        )
+
     def get_user(self, user_id: str) -> PrivXAPIResponse:
         """
         Get a user.
@@ -1,5 +1,197 @@
-from typing import Any
+import json
+import re
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.response import PrivXAPIResponse
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+FRACTION = re.compile(r"\.(\d+)")
 
 
 def get_value(obj: Any, default_value: Any) -> Any:
     return obj if obj is not None else default_value
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a UTC RFC 3339 timestamp as PrivX returns them, with any number of
+    fraction digits (strptime only takes 6).
+    """
+    value = FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value)
+    if "." not in value:
+        value = value.replace("Z", ".000000Z")
+    try:
+        return datetime.strptime(value, TIME_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise InternalAPIException("Unsupported time: ", value)
+
+
+def format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+def fetch_all_items(
+    fetch: Callable[[int, int], PrivXAPIResponse],
+    page_size: int = 1000,
+    executor: Optional[Executor] = None,
+) -> List[Any]:
+    """
+    Collect every item of an offset/limit paginated endpoint.
+
+    `fetch(offset, limit)` returns one page. The first page is fetched alone for
+    the total count, with an executor the remaining pages are then fetched
+    concurrently. Pages are read until the count is reached, so a server
+    returning fewer items than asked for does not end the listing early; only
+    without a count a short page ends it.
+    """
+    return list(iter_items(fetch, page_size, executor, prefetch=None))
+
+
+def iter_items(
+    fetch: Callable[[int, int], PrivXAPIResponse],
+    page_size: int = 1000,
+    executor: Optional[Executor] = None,
+    prefetch: Optional[int] = 4,
+    convert: Optional[Callable[[List[Any]], List[Any]]] = None,
+) -> Iterator[Any]:
+    """
+    Yield every item of an offset/limit paginated endpoint in order.
+
+    Like fetch_all_items, but with an executor at most `prefetch` pages (all
+    when None) are requested ahead of the one being consumed, so memory stays
+    bounded however many items there are. `convert` maps the items of each
+    page as soon as it arrives, so that pages waiting to be consumed are only
+    held in converted form.
+    """
+    items, count = _page_items(fetch(0, page_size), convert)
+    yield from items
+    if count is None:
+        offset = len(items)
+        while len(items) == page_size:
+            items, _ = _page_items(fetch(offset, page_size), convert)
+            yield from items
+            offset += len(items)
+        return
+    if executor is None or not items:
+        yield from _read_items(fetch, len(items), count, page_size, convert)
+        return
+
+    # the server may cap the limit, the first page shows the real page size
+    step = len(items)
+
+    def fetch_page(offset: int) -> Tuple[int, List[Any]]:
+        return offset, _page_items(fetch(offset, page_size), convert)[0]
+
+    offsets = iter(range(step, count, step))
+    pending = deque(
+        executor.submit(fetch_page, offset) for offset in islice(offsets, prefetch)
+    )
+    while pending:
+        offset, page = pending.popleft().result()
+        for next_offset in islice(offsets, 1):
+            pending.append(executor.submit(fetch_page, next_offset))
+        yield from page
+        # a page shorter than the first one, read the rest before moving on
+        yield from _read_items(
+            fetch, offset + len(page), min(offset + step, count), page_size, convert
+        )
+
+
+def _read_items(
+    fetch: Callable[[int, int], PrivXAPIResponse],
+    offset: int,
+    end: int,
+    page_size: int,
+    convert: Optional[Callable],
+) -> Iterator[Any]:
+    # items from offset up to end, advancing by what each page returned
+    while offset < end:
+        items, _ = _page_items(fetch(offset, min(page_size, end - offset)), convert)
+        if not items:
+            return
+        yield from items
+        offset += len(items)
+
+
+def call_safely(call: Callable[[Any], PrivXAPIResponse], item: Any) -> PrivXAPIResponse:
+    """
+    `call(item)`, with an InternalAPIException, for example a connection error,
+    turned into a failed response with status 0 and the error as details.
+    """
+    try:
+        return call(item)
+    except InternalAPIException as e:
+        return PrivXAPIResponse(0, HTTPStatus.OK, json.dumps({"error": str(e)}))
+
+
+def call_concurrently(
+    call: Callable[[Any], PrivXAPIResponse],
+    keys: Iterable[Hashable],
+    workers: int = 8,
+) -> Dict[Any, PrivXAPIResponse]:
+    """
+    Call `call(key)` for every distinct key with up to `workers` in flight.
+
+    A call raising InternalAPIException, for example on a connection error,
+    gets a failed response with status 0 and the error as details, so that one
+    failure does not fail the whole batch.
+    """
+    keys = list(dict.fromkeys(keys))
+    return dict(zip(keys, iter_concurrently(call, keys, workers)))
+
+
+def iter_concurrently(
+    call: Callable[[Any], PrivXAPIResponse],
+    items: Iterable[Any],
+    workers: int = 8,
+    window: Optional[int] = None,
+) -> Iterator[PrivXAPIResponse]:
+    """
+    Yield `call(item)` for every item in input order with up to `workers` in
+    flight, like call_concurrently.
+
+    Items are read lazily and at most `window` calls (2 * workers by default)
+    run or wait ahead of the one being consumed, so memory stays bounded
+    however many items there are.
+    """
+    window = window or 2 * workers
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = deque(
+            executor.submit(call_safely, call, item) for item in islice(items, window)
+        )
+        try:
+            while pending:
+                response = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(call_safely, call, item))
+                yield response
+        finally:
+            # a consumer stopping early does not wait for the queued calls
+            for future in pending:
+                future.cancel()
+
+
+def _page_items(
+    response: PrivXAPIResponse, convert: Optional[Callable] = None
+) -> Tuple[List[Any], Optional[int]]:
+    if not response.ok:
+        raise InternalAPIException("Failed to fetch page: ", response.data)
+    items = response.data.get("items") or []
+    return convert(items) if convert else items, response.data.get("count")
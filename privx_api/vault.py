@@ -1,10 +1,11 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
+from privx_api import secret_cache
 from privx_api.base import BasePrivXAPI
 from privx_api.enums import UrlEnum
 from privx_api.response import PrivXAPIResponse
-from privx_api.utils import get_value
+from privx_api.utils import call_concurrently, get_value
 
 
 class VaultAPI(BasePrivXAPI):
@@ -95,6 +96,33 @@ class VaultAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def get_secrets_bulk(
+        self, names: Iterable[str], workers: int = 8
+    ) -> Dict[str, PrivXAPIResponse]:
+        """
+        Get many secrets with up to `workers` requests in flight. Create the
+        client with pool_size >= workers so that the requests reuse pooled
+        connections.
+
+        Returns:
+            dict of secret name -> PrivXAPIResponse, a request that failed
+            without a response has status 0 and the error in its data
+        """
+        return call_concurrently(self.get_secret, names, workers)
+
+    def get_user_secrets_bulk(
+        self, user_id: str, names: Iterable[str], workers: int = 8
+    ) -> Dict[str, PrivXAPIResponse]:
+        """
+        Get many secrets of a user, see get_secrets_bulk.
+
+        Returns:
+            dict of secret name -> PrivXAPIResponse
+        """
+        return call_concurrently(
+            lambda name: self.get_user_secret(user_id, name), names, workers
+        )
+
     def get_user_secret(self, user_id: str, name: str) -> PrivXAPIResponse:
         """
         get a user secret.
@@ -188,6 +216,33 @@ class VaultAPI(BasePrivXAPI):
         )
         return self._api_response(response_status, HTTPStatus.OK, data)
 
+    def secret_cache(
+        self,
+        ttl: float = 30.0,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+    ) -> secret_cache.SecretCache:
+        """
+        Create a cache of secrets and user secrets read through this client.
+        A cached secret is served without a request for ttl seconds, then
+        revalidated with its metadata and refetched only when its version or
+        updated time changed. Least recently used secrets are evicted beyond
+        max_entries or max_bytes of secret bodies, and evicted bodies are
+        zeroed.
+
+        Returns:
+            SecretCache
+        """
+        return secret_cache.SecretCache(
+            self.get_secret,
+            self.get_secret_metadata,
+            self.get_user_secret,
+            self.get_user_secret_metadata,
+            ttl=ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+        )
+
     def search_secrets(
         self,
         offset: Optional[int] = None,
@@ -0,0 +1,134 @@
+#
+# Local evaluation of command restriction whitelists.
+#
+# Mirrors HostStoreAPI.eval_commands_against_whitelist without a round trip:
+#
+# * whitelist patterns are regular expressions matching a whole command
+# * a command line is split on unquoted ;, &, &&, |, || and newlines and is
+#   allowed only when every command in it matches a pattern
+# * command and process substitution ($(...), `...`, <(...), >(...)) outside
+#   single quotes is never allowed
+#
+# Command lines are split the way bash splits them; the posix rshell variant
+# splits some differently (&> is a background & there) and is not supported.
+#
+
+import functools
+import re
+from typing import Dict, Iterable, List, Optional
+
+from privx_api.exceptions import InternalAPIException
+from privx_api.host_store import HostStoreAPI
+from privx_api.utils import fetch_all_items
+
+RSHELL_VARIANTS = ("bash",)
+
+# shell tokens in the order they are tried, unterminated quotes run to the end
+TOKENS = re.compile(
+    r"""
+      (?P<single>'[^']*'?)
+    | (?P<double>"(?:\\.|[^"\\])*"?)
+    | (?P<escape>\\.?)
+    | (?P<redirection>[<>]&|&>|>\|)
+    | (?P<substitution>\$\(|`|[<>]\()
+    | (?P<separator>[;&|\n])
+    | (?P<other>[^'"\\<>&|;\n`$]+|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+DOUBLE_QUOTED_SUBSTITUTION = re.compile(r"(?<!\\)(\$\(|`)")
+
+
+def split_command_line(command_line: str) -> Optional[List[str]]:
+    """
+    Split a command line into its commands, None when it uses command or
+    process substitution. Redirections such as 2>&1, &> and >| do not split.
+    """
+    commands = []
+    start = 0
+    for token in TOKENS.finditer(command_line):
+        kind = token.lastgroup
+        if kind == "substitution" or (
+            kind == "double" and DOUBLE_QUOTED_SUBSTITUTION.search(token.group())
+        ):
+            return None
+        if kind == "separator":
+            commands.append(command_line[start : token.start()])
+            start = token.end()
+    commands.append(command_line[start:])
+    return [c.strip() for c in commands if c.strip()]
+
+
+class CompiledWhitelist:
+    """
+    Whitelist patterns compiled into a single anchored regular expression.
+    Results of single commands are cached, command lines are re-split.
+    """
+
+    def __init__(self, whitelist: dict, cache_size: int = 4096) -> None:
+        self.whitelist = whitelist
+        patterns = whitelist.get("whitelist_patterns") or []
+        try:
+            self._regex = re.compile("|".join(f"(?:{p})" for p in patterns))
+        except re.error as e:
+            raise InternalAPIException("Invalid whitelist pattern: ", e)
+        self._empty = not patterns
+        self._is_allowed = functools.lru_cache(maxsize=cache_size)(self._match)
+
+    def allowed(self, command_line: str) -> bool:
+        commands = split_command_line(command_line)
+        if not commands:
+            return False
+        return all(self._is_allowed(command) for command in commands)
+
+    def evaluate(
+        self, commands: Iterable[str], rshell_variant: str = "bash"
+    ) -> List[dict]:
+        """
+        Evaluate commands, returning one {"command", "allowed"} result per
+        command in the input order. Only the bash rshell variant is
+        evaluated locally, evaluate posix ones with
+        HostStoreAPI.eval_commands_against_whitelist.
+        """
+        if rshell_variant not in RSHELL_VARIANTS:
+            raise InternalAPIException("Unsupported rshell variant: ", rshell_variant)
+        return [{"command": c, "allowed": self.allowed(c)} for c in commands]
+
+    def _match(self, command: str) -> bool:
+        return not self._empty and self._regex.fullmatch(command) is not None
+
+
+class CommandWhitelists:
+    """
+    Every command restriction whitelist fetched once and compiled, addressed
+    by id or name.
+    """
+
+    def __init__(self, whitelists: Iterable[dict]) -> None:
+        self._by_key: Dict[str, CompiledWhitelist] = {}
+        for whitelist in whitelists:
+            compiled = CompiledWhitelist(whitelist)
+            self._by_key[whitelist.get("name")] = compiled
+            self._by_key[whitelist.get("id")] = compiled
+
+    @classmethod
+    def load(cls, api: HostStoreAPI, page_size: int = 100) -> "CommandWhitelists":
+        return cls(
+            fetch_all_items(
+                lambda offset, limit: api.get_command_restriction_whitelists(
+                    offset=offset, limit=limit
+                ),
+                page_size,
+            )
+        )
+
+    def __getitem__(self, id_or_name: str) -> CompiledWhitelist:
+        try:
+            return self._by_key[id_or_name]
+        except KeyError:
+            raise InternalAPIException("Unknown whitelist: ", id_or_name)
+
+    def evaluate(
+        self, id_or_name: str, commands: Iterable[str], rshell_variant: str = "bash"
+    ) -> List[dict]:
+        return self[id_or_name].evaluate(commands, rshell_variant)
@@ -6,6 +6,7 @@ setup(
     name="privx_api",
     version="43.0.0",
     packages=["privx_api"],
+    extras_require={"columnar": ["pyarrow"], "encryption": ["cryptography"]},
     license="Apache Licence 2.0",
     url="https://github.com/SSHcom/privx-sdk-for-python",
     classifiers=[